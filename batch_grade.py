@@ -0,0 +1,178 @@
+# batch_grade.py — grade many submissions / seeds in parallel worker processes
+from __future__ import annotations
+import argparse, csv, hashlib, json, multiprocessing as mp, os, re, sys, time, traceback
+from collections import deque
+from multiprocessing.connection import wait
+from typing import List, Dict, Any, Optional
+
+import runner
+
+# run_suite keyword arguments and runner.OutputOptions fields a manifest entry may set
+_SUITE_KEYS = {"rows", "cols", "density", "layout", "sa_history", "sa_history_size",
+               "dp_table_max", "dp_items", "dp_capacity", "grid_format", "path_encoding", "tiles", "tile_size"}
+_SUMMARY_FIELDS = ["student_id", "seed", "status", "score", "seconds", "out_dir", "error"]
+
+
+def load_manifest(path: str, default_seeds: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Expand a manifest into one task per (submission, seed).
+
+    Accepted formats: a JSON list of entries, JSON Lines (one entry per line)
+    or CSV with a header row. An entry needs "student_id" and may set "dir"
+    (folder holding that submission's student_*.py / heuristics.py; default
+    the current directory), "seed" or "seeds" (list, or ';'-separated in CSV),
+    and any run_suite option such as "rows" or "layout".
+    """
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    if path.lower().endswith(".csv"):
+        entries = [{k: v for k, v in row.items() if v not in (None, "")}
+                   for row in csv.DictReader(text.splitlines())]
+        for e in entries:
+            if "seeds" in e:
+                e["seeds"] = [s for s in e["seeds"].split(";") if s]
+            for k in ("rows", "cols", "sa_history_size", "dp_table_max", "dp_items", "dp_capacity", "tile_size"):
+                if k in e:
+                    e[k] = int(e[k])
+            if "tiles" in e:
+                e["tiles"] = e["tiles"].strip().lower() in ("1", "true", "yes")
+            if "density" in e:
+                e["density"] = float(e["density"])
+    elif text.lstrip().startswith("["):
+        entries = json.loads(text)
+    else:
+        entries = [json.loads(line) for line in text.splitlines() if line.strip()]
+
+    tasks: List[Dict[str, Any]] = []
+    for e in entries:
+        if "student_id" not in e:
+            raise ValueError(f"manifest entry without student_id: {e}")
+        unknown = set(e) - _SUITE_KEYS - {"student_id", "dir", "seed", "seeds"}
+        if unknown:
+            raise ValueError(f"unknown manifest keys for {e['student_id']}: {sorted(unknown)}")
+        seeds = e.get("seeds") or ([e["seed"]] if "seed" in e else None) or default_seeds or [None]
+        opts = {k: e[k] for k in _SUITE_KEYS if k in e}
+        for seed in seeds:
+            tasks.append({"student_id": str(e["student_id"]), "seed": seed,
+                          "dir": os.path.abspath(e.get("dir", ".")), "opts": opts})
+    # two tasks writing one output folder would overwrite each other's results
+    seen: Dict[str, Dict[str, Any]] = {}
+    for t in tasks:
+        key = _task_dir("", t).casefold()  # case-insensitive filesystems fold these together
+        if key in seen:
+            raise ValueError(f"manifest tasks {seen[key]['student_id']!r} seed={seen[key]['seed']!r} and "
+                             f"{t['student_id']!r} seed={t['seed']!r} share the output folder {_task_dir('', t)}")
+        seen[key] = t
+    return tasks
+
+
+def _safe(name: str) -> str:
+    """Folder name for an id; ids that had to be rewritten get a short hash of the original."""
+    safe = re.sub(r"[^A-Za-z0-9._-]", "_", name)
+    if safe == name and name not in ("", ".", ".."):
+        return safe
+    return f"{safe}-{hashlib.sha1(name.encode('utf-8')).hexdigest()[:8]}"
+
+
+def _task_dir(out_root: str, task: Dict[str, Any]) -> str:
+    seed = runner._normalize_seed(task["student_id"], task["seed"])
+    return os.path.join(out_root, _safe(task["student_id"]), _safe(seed))
+
+
+def _worker(task: Dict[str, Any], out_dir: str) -> None:
+    """Child process: grade one task with the submission's folder first on sys.path."""
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "grade.log"), "w", encoding="utf-8") as log:
+        sys.stdout = sys.stderr = log
+        sys.path.insert(0, task["dir"])
+        try:
+            output, opts = runner.OutputOptions.split(task["opts"])
+            runner.run_suite(task["student_id"], seed=task["seed"], out_dir=out_dir, output=output, **opts)
+        except BaseException:
+            traceback.print_exc()
+            log.flush()
+            os._exit(1)
+        log.flush()
+    os._exit(0)
+
+
+def _total_score(out_dir: str) -> Optional[float]:
+    try:
+        with open(os.path.join(out_dir, "results.json"), encoding="utf-8") as f:
+            res = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return round(sum(v.get("score") or 0 for v in res.values() if isinstance(v, dict)), 6)
+
+
+def run_batch(tasks: List[Dict[str, Any]], out_root: str, jobs: int, timeout: float) -> List[Dict[str, Any]]:
+    """
+    Grade tasks with at most `jobs` worker processes. Each task gets a fresh
+    process (so every submission's modules are imported on their own) and is
+    terminated after `timeout` seconds. Returns one summary row per task, in
+    manifest order.
+    """
+    ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+    pending = deque(enumerate(tasks))
+    running: Dict[int, tuple] = {}  # sentinel -> (index, process, start time)
+    rows: List[Optional[Dict[str, Any]]] = [None] * len(tasks)
+
+    def finish(idx: int, status: str, t0: float, error: str = "") -> None:
+        task = tasks[idx]
+        out_dir = _task_dir(out_root, task)
+        rows[idx] = {"student_id": task["student_id"],
+                     "seed": runner._normalize_seed(task["student_id"], task["seed"]),
+                     "status": status, "score": _total_score(out_dir) if status == "ok" else None,
+                     "seconds": round(time.perf_counter() - t0, 3), "out_dir": out_dir, "error": error}
+        print(f"[{sum(r is not None for r in rows)}/{len(tasks)}] {task['student_id']} "
+              f"seed={rows[idx]['seed']}: {status}", flush=True)
+
+    while pending or running:
+        while pending and len(running) < jobs:
+            idx, task = pending.popleft()
+            proc = ctx.Process(target=_worker, args=(task, _task_dir(out_root, task)), daemon=True)
+            proc.start()
+            running[proc.sentinel] = (idx, proc, time.perf_counter())
+        now = time.perf_counter()
+        next_deadline = min(t0 + timeout for _, _, t0 in running.values())
+        for sentinel in wait(list(running), timeout=max(0.0, next_deadline - now)):
+            idx, proc, t0 = running.pop(sentinel)
+            proc.join()
+            if proc.exitcode == 0:
+                finish(idx, "ok", t0)
+            else:
+                finish(idx, "error", t0, f"exit code {proc.exitcode}; see grade.log")
+        now = time.perf_counter()
+        for sentinel, (idx, proc, t0) in list(running.items()):
+            if now - t0 >= timeout:
+                proc.terminate()
+                proc.join()
+                del running[sentinel]
+                finish(idx, "timeout", t0, f"killed after {timeout:g}s")
+    return rows  # type: ignore[return-value]
+
+
+def write_summary(rows: List[Dict[str, Any]], out_root: str) -> None:
+    os.makedirs(out_root, exist_ok=True)
+    with open(os.path.join(out_root, "summary.json"), "w", encoding="utf-8") as f:
+        json.dump(rows, f, indent=2)
+    with open(os.path.join(out_root, "summary.csv"), "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=_SUMMARY_FIELDS)
+        w.writeheader()
+        w.writerows(rows)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Grade a manifest of submissions/seeds in parallel")
+    ap.add_argument("manifest", help="JSON list, JSON Lines or CSV manifest (see load_manifest)")
+    ap.add_argument("--out", default="batch_results", help="Output root; one <student_id>/<seed>/ folder per task")
+    ap.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    ap.add_argument("--timeout", type=float, default=120.0, help="Per-task wall-clock limit in seconds")
+    ap.add_argument("--seeds", default="", help="Comma-separated seeds for entries that set none")
+    args = ap.parse_args()
+    tasks = load_manifest(args.manifest, [s for s in args.seeds.split(",") if s] or None)
+    t0 = time.perf_counter()
+    summary = run_batch(tasks, args.out, max(1, args.jobs), args.timeout)
+    write_summary(summary, args.out)
+    n_ok = sum(r["status"] == "ok" for r in summary)
+    print(f"Graded {n_ok}/{len(summary)} tasks in {time.perf_counter() - t0:.1f}s; summary in {args.out}")
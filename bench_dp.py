@@ -0,0 +1,87 @@
+# bench_dp.py — knapsack DP engines on large capacities
+from __future__ import annotations
+import argparse, random, time
+from typing import List, Callable
+
+import common
+import student_lp_dp as DP
+
+def _timed(fn: Callable[[], object]):
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+def crosscheck(seed: str, count: int = 12) -> None:
+    """Small instances through every timed engine against knapsack_top_down; aborts on a mismatch."""
+    rng = random.Random(f"check{seed}")
+    for k in range(count):
+        n = rng.randint(1, 16)
+        items, cap = common.gen_knapsack_large(f"{seed}{k}", n, rng.randint(0, 80), w_max=rng.randint(1, 30))
+        values = [v for _, _, v in items]
+        weights = [w for _, w, _ in items]
+        ref = DP.knapsack_top_down(values, weights, cap)
+        got = {e: DP.knapsack_bottom_up(values, weights, cap, engine=e) for e in ("python", "numpy")}
+        best, chosen = DP.knapsack_bottom_up_items(values, weights, cap)
+        got["items"] = best if (sum(weights[i] for i in chosen) <= cap
+                                and sum(values[i] for i in chosen) == best) else None
+        got["table"] = DP.KnapsackTable(values, weights, cap).best_value(cap)
+        bad = {e: v for e, v in got.items() if v != ref}
+        if bad:
+            raise SystemExit(f"engine mismatch on n={n} C={cap}: top_down={ref}, {bad}")
+    print(f"cross-check: {count} small instances agree with knapsack_top_down")
+
+def run(shapes: List[str], seed: str, max_python: int) -> None:
+    print(f"{'n x C':>14} {'python_s':>10} {'numpy_s':>10} {'speedup':>9}  match")
+    for shape in shapes:
+        n, cap = (int(float(v)) for v in shape.lower().split("x"))
+        items, cap = common.gen_knapsack_large(seed, n, cap)
+        values = [v for _, _, v in items]
+        weights = [w for _, w, _ in items]
+        fast, t_np = _timed(lambda: DP.knapsack_bottom_up(values, weights, cap, engine="numpy"))
+        if n * cap <= max_python:
+            ref, t_py = _timed(lambda: DP.knapsack_bottom_up(values, weights, cap, engine="python"))
+            match = "yes" if ref == fast else "NO"
+            print(f"{shape:>14} {t_py:>10.3f} {t_np:>10.4f} {t_py / t_np:>8.1f}x  {match}")
+        else:
+            print(f"{shape:>14} {'-':>10} {t_np:>10.4f} {'-':>9}  -")
+
+def run_sparse(shapes: List[str], seed: str) -> None:
+    """Few items, huge capacity: states touched by the top-down memo vs. n*(C+1) table cells."""
+    print(f"{'n x C x Wmax':>20} {'states':>10} {'cells':>14} {'top_down_s':>11}")
+    for shape in shapes:
+        n, cap, w_max = (int(float(v)) for v in shape.lower().split("x"))
+        items, cap = common.gen_knapsack_large(seed, n, cap, w_max=w_max)
+        values = [v for _, _, v in items]
+        weights = [w for _, w, _ in items]
+        stats: dict = {}
+        _, t_td = _timed(lambda: DP.knapsack_top_down(values, weights, cap, stats))
+        print(f"{shape:>20} {stats['states']:>10} {n * (cap + 1):>14} {t_td:>11.3f}")
+
+def run_queries(shape: str, n_queries: int, seed: str) -> None:
+    """Q capacities priced against one item set: one KnapsackTable vs. Q knapsack_bottom_up calls."""
+    n, cap = (int(float(v)) for v in shape.lower().split("x"))
+    items, cap = common.gen_knapsack_large(seed, n, cap)
+    values = [v for _, _, v in items]
+    weights = [w for _, w, _ in items]
+    rng = random.Random(seed)
+    caps = [rng.randint(0, cap) for _ in range(n_queries)]
+    table, t_build = _timed(lambda: DP.KnapsackTable(values, weights, cap))
+    fast, t_query = _timed(lambda: table.best_values(caps))
+    ref, t_ref = _timed(lambda: [DP.knapsack_bottom_up(values, weights, c) for c in caps])
+    print(f"{shape} x {n_queries} queries: per-call {t_ref:.3f}s, table build {t_build:.4f}s + "
+          f"queries {t_query:.5f}s, match {'yes' if ref == fast else 'NO'}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--shapes", default="50x1e4,100x1e5,200x1e6", help="Comma-separated NxC (items x capacity)")
+    ap.add_argument("--seed", default="bench")
+    ap.add_argument("--max_python", type=float, default=5e7, help="Skip the pure-Python engine above n*C cells")
+    ap.add_argument("--sparse", default="", help="Comma-separated NxCxWmax for the top-down state count, e.g. 16x1e7x1e6")
+    ap.add_argument("--queries", type=int, default=0, help="Also price this many capacities against the first shape")
+    args = ap.parse_args()
+    crosscheck(args.seed)
+    run([x for x in args.shapes.split(",") if x], args.seed, int(args.max_python))
+    if args.sparse:
+        run_sparse([x for x in args.sparse.split(",") if x], args.seed)
+    if args.queries:
+        run_queries(args.shapes.split(",")[0], args.queries, args.seed)
@@ -0,0 +1,80 @@
+# bench_lp.py — half-plane intersection vs. pairwise vertex enumeration (and Seidel's LP)
+from __future__ import annotations
+import argparse, random, time
+from typing import List, Callable
+
+import common
+import student_lp_dp as LP
+
+NONNEG = [(-1.0, 0.0, 0.0), (0.0, -1.0, 0.0)]
+
+def _best_time(fn: Callable[[], object], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def run(sizes: List[int], seed: str, repeat: int, max_enum: int) -> None:
+    print(f"{'m':>7} {'|V|':>6} {'hpi_s':>10} {'enum_s':>10} {'speedup':>9} {'seidel_s':>10}  match")
+    for m in sizes:
+        cons, (c1, c2) = common.gen_lp_large(seed, m)
+        verts = LP.feasible_vertices(cons)
+        t_hpi = _best_time(lambda: LP.feasible_vertices(cons), repeat)
+        t_seidel = _best_time(lambda: LP.solve_lp_seidel(cons, c1, c2), repeat)
+        ok = LP.solve_lp_seidel(cons, c1, c2)[1:] == LP.maximize_objective(verts, c1, c2)
+        if m <= max_enum:
+            ref = LP._enumerate_vertices(cons + NONNEG)
+            t_enum = _best_time(lambda: LP._enumerate_vertices(cons + NONNEG), 1)
+            match = "yes" if ok and set(ref) == set(verts) else "NO"
+            print(f"{m:>7} {len(verts):>6} {t_hpi:>10.4f} {t_enum:>10.4f} {t_enum / t_hpi:>8.1f}x {t_seidel:>10.4f}  {match}")
+        else:
+            match = "yes" if ok else "NO"
+            print(f"{m:>7} {len(verts):>6} {t_hpi:>10.4f} {'-':>10} {'-':>9} {t_seidel:>10.4f}  {match}")
+
+def run_queries(sizes: List[int], seed: str, queries: int) -> None:
+    """Many objectives against one constraint set: vertex scan vs. LPPolygon."""
+    rng = random.Random(seed)
+    print(f"{'m':>7} {'queries':>8} {'scan_s':>10} {'poly_s':>10} {'speedup':>9}  match")
+    for m in sizes:
+        cons, _ = common.gen_lp_large(seed, m)
+        cs = [(rng.uniform(-5, 5), rng.uniform(-5, 5)) for _ in range(queries)]
+        t0 = time.perf_counter()
+        verts = LP.feasible_vertices(cons)
+        ref = [LP.maximize_objective(verts, c1, c2) for c1, c2 in cs]
+        t_scan = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        pts, vals = LP.LPPolygon(cons).maximize_batch([c[0] for c in cs], [c[1] for c in cs])
+        t_poly = time.perf_counter() - t0
+        match = "yes" if ref == list(zip(pts, vals)) else "NO"
+        print(f"{m:>7} {queries:>8} {t_scan:>10.4f} {t_poly:>10.4f} {t_scan / t_poly:>8.1f}x  {match}")
+
+def run_nd(shapes: List[str], seed: str) -> None:
+    """n-variable instances from common.gen_lp_nd through both simplex pricing rules."""
+    print(f"{'n x m':>11} {'pricing':>9} {'status':>10} {'value':>14} {'time_s':>10}")
+    for shape in shapes:
+        n, m = (int(v) for v in shape.lower().split("x"))
+        A, b, c = common.gen_lp_nd(seed, n, m, density=0.3)
+        for pricing in ("steepest", "bland"):
+            t0 = time.perf_counter()
+            status, _, value = LP.solve_lp_simplex(A, b, c, pricing=pricing)
+            dt = time.perf_counter() - t0
+            shown = f"{value:.6f}" if value is not None else "-"
+            print(f"{shape:>11} {pricing:>9} {status:>10} {shown:>14} {dt:>10.4f}")
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default="25,50,100,200,400,2000,10000", help="Comma-separated constraint counts")
+    ap.add_argument("--seed", default="bench")
+    ap.add_argument("--repeat", type=int, default=3, help="Timing repeats (best of) for the fast engine")
+    ap.add_argument("--max_enum", type=int, default=400, help="Skip the O(m^3) enumeration above this size")
+    ap.add_argument("--queries", type=int, default=0, help="Also time this many objective queries per size")
+    ap.add_argument("--nd", default="", help="Comma-separated NxM shapes for the n-variable simplex, e.g. 100x80,300x200")
+    args = ap.parse_args()
+    sizes = [int(x) for x in args.sizes.split(",") if x]
+    run(sizes, args.seed, args.repeat, args.max_enum)
+    if args.queries > 0:
+        run_queries(sizes, args.seed, args.queries)
+    if args.nd:
+        run_nd([x for x in args.nd.split(",") if x], args.seed)
@@ -0,0 +1,148 @@
+# bench_search.py — scaling sweep of the graded search algorithms (BFS, A*, IDS, SA)
+from __future__ import annotations
+import argparse, csv, importlib, json, statistics, time, tracemalloc
+from typing import Any, Callable, Dict, List
+
+import runner
+
+ALGOS = ("bfs", "astar", "ids", "sa")
+_CSV_FIELDS = ["algo", "rows", "cols", "density", "layout", "seed", "obstacles", "repeat",
+               "wall_s", "peak_kb", "expansions", "ok", "capped", "path_len", "best_len", "quality"]
+
+
+def _graders(algos: List[str]) -> Dict[str, Callable[..., Dict[str, Any]]]:
+    """grade_* calls with the student modules bound: f(rows, cols, obstacles, seed)."""
+    heur = importlib.import_module("heuristics")
+    table = {
+        "bfs": lambda m: lambda r, c, o, s: runner.grade_bfs(m, r, c, o),
+        "astar": lambda m: lambda r, c, o, s: runner.grade_astar(m, heur, r, c, o),
+        "ids": lambda m: lambda r, c, o, s: runner.grade_ids(m, r, c, o),
+        "sa": lambda m: lambda r, c, o, s: runner.grade_sa(m, r, c, o, s, "minmax", 256),
+    }
+    modules = {"bfs": "student_bfs", "astar": "student_astar", "ids": "student_ids", "sa": "student_sa"}
+    return {a: table[a](importlib.import_module(modules[a])) for a in algos}
+
+
+def _quality(algo: str, out: Dict[str, Any]) -> float | None:
+    """Path length over the BFS optimum (1.0 = optimal); SA uses final cost over the BFS path cost."""
+    if not out.get("ok"):
+        return None
+    if algo == "sa":
+        base, cost = out.get("bfs0_cost"), out.get("final_cost")
+        return round(cost / base, 6) if base and cost is not None else None
+    return round(out["path_len"] / out["best_len"], 6) if out.get("best_len") else None
+
+
+def sweep(sizes: List[str], densities: List[float], layouts: List[str], seeds: List[str],
+          algos: List[str], repeat: int, max_expansions: int, ids_max_cells: int) -> List[Dict[str, Any]]:
+    """
+    One row per (algorithm, grid, seed, repeat). Wall time comes from untraced
+    runs; the tracemalloc peak from one extra traced run per configuration,
+    since tracing slows allocation-heavy code several-fold.
+    """
+    graders = _graders(algos)
+    runner.Trace.default_cap = max_expansions
+    rows_out: List[Dict[str, Any]] = []
+    for size in sizes:
+        rows, cols = (int(v) for v in size.lower().split("x"))
+        for layout in layouts:
+            for density in (densities if layout == "random" else [0.0]):
+                for seed in seeds:
+                    obstacles = runner.GridObstacles(
+                        runner.build_grid(rows, cols, density, runner.set_seed_from_any(seed), layout),
+                        (seed, rows, cols, density, layout))
+                    for algo in algos:
+                        if algo == "ids" and rows * cols > ids_max_cells:
+                            continue
+                        grade = graders[algo]
+                        tracemalloc.start()
+                        grade(rows, cols, obstacles, seed)
+                        peak = tracemalloc.get_traced_memory()[1]
+                        tracemalloc.stop()
+                        for rep in range(repeat):
+                            t0 = time.perf_counter()
+                            out = grade(rows, cols, obstacles, seed)
+                            wall = time.perf_counter() - t0
+                            exp = out.get("expansions")
+                            rows_out.append({
+                                "algo": algo, "rows": rows, "cols": cols, "density": density,
+                                "layout": layout, "seed": seed, "obstacles": len(obstacles), "repeat": rep,
+                                "wall_s": round(wall, 6), "peak_kb": round(peak / 1024, 1),
+                                "expansions": exp, "ok": bool(out.get("ok")),
+                                "capped": bool(max_expansions) and exp is not None and exp > max_expansions,
+                                "path_len": out.get("path_len"), "best_len": out.get("best_len"),
+                                "quality": _quality(algo, out),
+                            })
+                        print(f"{algo:>5} {rows}x{cols} {layout:<12} d={density:<5} seed={seed}: "
+                              f"{statistics.median(r['wall_s'] for r in rows_out[-repeat:]):.4f}s "
+                              f"exp={rows_out[-1]['expansions']} peak={rows_out[-1]['peak_kb']}KB", flush=True)
+    return rows_out
+
+
+def _stats(xs: List[float]) -> Dict[str, float]:
+    mean = statistics.fmean(xs)
+    sd = statistics.stdev(xs) if len(xs) > 1 else 0.0
+    return {"mean": round(mean, 6), "median": round(statistics.median(xs), 6), "stdev": round(sd, 6),
+            "cv": round(sd / mean, 4) if mean else 0.0, "min": round(min(xs), 6), "max": round(max(xs), 6)}
+
+
+def summarize(rows_out: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Per (algorithm, grid, layout, density): timing stats over all seeds and
+    repeats, the worst per-seed timing cv across repeats (repeatability), and
+    stats of expansions, peak memory and path quality over seeds.
+    """
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for r in rows_out:
+        groups.setdefault((r["algo"], r["rows"], r["cols"], r["layout"], r["density"]), []).append(r)
+    summary = []
+    for (algo, rows, cols, layout, density), rs in groups.items():
+        per_seed: Dict[str, List[float]] = {}
+        for r in rs:
+            per_seed.setdefault(r["seed"], []).append(r["wall_s"])
+        first = [r for r in rs if r["repeat"] == 0]
+        quality = [r["quality"] for r in first if r["quality"] is not None]
+        summary.append({
+            "algo": algo, "rows": rows, "cols": cols, "layout": layout, "density": density,
+            "runs": len(rs), "seeds": len(per_seed),
+            "ok_rate": round(sum(r["ok"] for r in first) / len(first), 4),
+            "capped": sum(r["capped"] for r in first),
+            "wall_s": _stats([r["wall_s"] for r in rs]),
+            "repeat_cv_max": max(_stats(v)["cv"] for v in per_seed.values()),
+            "expansions": _stats([r["expansions"] for r in first]) if first[0]["expansions"] is not None else None,
+            "peak_kb": _stats([r["peak_kb"] for r in first]),
+            "quality": _stats(quality) if quality else None,
+        })
+    return summary
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Scaling sweep over grid size, density, layout and seeds")
+    ap.add_argument("--sizes", default="6x6,12x12,24x24,48x48", help="Comma-separated ROWSxCOLS")
+    ap.add_argument("--densities", default="0.1,0.22,0.3", help="Comma-separated densities (random layout only)")
+    ap.add_argument("--layouts", default="random,none", help="Comma-separated --layout values")
+    ap.add_argument("--seeds", default="s1,s2,s3", help="Comma-separated seeds")
+    ap.add_argument("--algos", default=",".join(ALGOS), help="Subset of " + ",".join(ALGOS))
+    ap.add_argument("--repeat", type=int, default=3, help="Timed runs per configuration")
+    ap.add_argument("--max_expansions", type=int, default=2_000_000,
+                    help="Trace cap so IDS cannot run away; 0 = unlimited (not allowed with ids)")
+    ap.add_argument("--ids_max_cells", type=int, default=100, help="Skip IDS on grids larger than this")
+    ap.add_argument("--out", default="bench_search", help="Writes OUT.csv (every run) and OUT.json (summary)")
+    args = ap.parse_args()
+    algos = [a for a in args.algos.split(",") if a]
+    unknown = set(algos) - set(ALGOS)
+    if unknown:
+        ap.error(f"unknown algorithms: {sorted(unknown)}")
+    if args.max_expansions == 0 and "ids" in algos:
+        ap.error("--max_expansions 0 leaves IDS uncapped, and it may never finish; "
+                 "give a cap or drop ids from --algos")
+    runs = sweep([s for s in args.sizes.split(",") if s], [float(d) for d in args.densities.split(",") if d],
+                 [l for l in args.layouts.split(",") if l], [s for s in args.seeds.split(",") if s],
+                 algos, max(1, args.repeat), args.max_expansions, args.ids_max_cells)
+    with open(args.out + ".csv", "w", encoding="utf-8", newline="") as f:
+        w = csv.DictWriter(f, fieldnames=_CSV_FIELDS)
+        w.writeheader()
+        w.writerows(runs)
+    with open(args.out + ".json", "w", encoding="utf-8") as f:
+        json.dump({"config": vars(args), "summary": summarize(runs)}, f, indent=2)
+    print(f"Wrote {args.out}.csv ({len(runs)} runs) and {args.out}.json")
@@ -12,6 +12,10 @@ ROWS = COLS = 6  # a bit larger than 5x5 for variability
 START: Coord = (0, 0)
 GOAL:  Coord = (ROWS-1, COLS-1)
 
+# n x (capacity+1) knapsack table cells above which the pseudo-polynomial DPs
+# are not worth running (student_lp_dp.choose_knapsack_engine and the grader)
+DP_CELL_LIMIT = 20_000_000
+
 # ---------------- Seeding & obstacle/weight generation ----------------
 # Default number of obstacles
 DEFAULT_OBS = 4
@@ -123,6 +127,50 @@ def gen_lp(seed: str) -> Tuple[List[Constraint], Tuple[float,float]]:
     constraints = [(2,1,B1), (1,2,B2), (1,0,U1), (0,1,U2)]
     return constraints, (float(c1), float(c2))
 
+def gen_lp_large(seed: str, m: int) -> Tuple[List[Constraint], Tuple[float,float]]:
+    # m constraints for benchmarks: about half are tangent to a circle in the
+    # positive quadrant (each one a polygon edge), the rest are loose/redundant
+    r = rng_from("LPL"+seed)
+    cx, cy, rad = 50.0, 50.0, 40.0
+    constraints: List[Constraint] = []
+    for k in range(m):
+        t = r.uniform(0.0, 2*math.pi)
+        a1, a2 = math.cos(t), math.sin(t)
+        slack = 0.0 if k % 2 == 0 else r.uniform(1.0, 20.0)
+        constraints.append((a1, a2, a1*cx + a2*cy + rad + slack))
+    return constraints, (float(r.randint(1, 9)), float(r.randint(1, 9)))
+
+def gen_lp_nd(seed: str, n_vars: int = 2, n_cons: int = 4, density: float = 1.0,
+              cover_frac: float = 0.2) -> Tuple[List[List[float]], List[float], List[float]]:
+    # n-variable benchmark LP: maximize c.x s.t. A x <= b, x >= 0, returned as
+    # (A rows, b, c). Most rows are packing rows (a >= 0); about cover_frac of
+    # them are covering rows written as -a.x <= -beta. A hidden point x0
+    # satisfies every row, so instances are feasible; every variable appears
+    # in some packing row, so they are bounded.
+    r = rng_from("LPN"+seed)
+    x0 = [r.uniform(0.0, 1.0) for _ in range(n_vars)]
+    n_cover = min(int(cover_frac * n_cons), max(0, n_cons - 1))
+    A: List[List[float]] = []
+    b: List[float] = []
+    for i in range(n_cons):
+        row = [r.uniform(0.1, 1.0) if r.random() < density else 0.0 for _ in range(n_vars)]
+        if not any(row):
+            row[r.randrange(n_vars)] = r.uniform(0.1, 1.0)
+        lhs = sum(a*x for a, x in zip(row, x0))
+        if i < n_cover:
+            A.append([-a for a in row]); b.append(-(lhs - r.uniform(0.0, 0.5)*lhs))
+        else:
+            A.append(row); b.append(lhs + r.uniform(0.1, 1.0))
+    packing = A[n_cover:]
+    for j in range(n_vars):
+        if packing and not any(row[j] > 0 for row in packing):
+            row = packing[r.randrange(len(packing))]
+            row[j] = r.uniform(0.1, 1.0)
+            i = A.index(row)
+            b[i] = sum(a*x for a, x in zip(row, x0)) + r.uniform(0.1, 1.0)
+    c = [float(r.randint(1, 10)) for _ in range(n_vars)]
+    return A, b, c
+
 # ---------------- DP (0/1 knapsack) data ----------------
 def gen_knapsack(seed: str):
     r = rng_from("DP"+seed)
@@ -136,6 +184,14 @@ def gen_knapsack(seed: str):
     capacity = r.randint(9, 12)
     return items, capacity
 
+def gen_knapsack_large(seed: str, n: int, capacity: int, w_max: Optional[int] = None, v_max: int = 1000):
+    # benchmark instance in the gen_knapsack item format; weights 1..w_max
+    # (default ~capacity/4 so a handful of items fit), values 1..v_max
+    r = rng_from("DPL"+seed)
+    w_max = w_max or max(1, capacity // 4)
+    items = [(f"I{i+1}", r.randint(1, w_max), r.randint(1, v_max)) for i in range(n)]
+    return items, capacity
+
 # ---------------- scoring utils ----------------
 def pct(points, total) -> float:
     return 100.0 * (points / total)
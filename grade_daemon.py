@@ -0,0 +1,246 @@
+# grade_daemon.py — warm grading service on a Unix socket or localhost HTTP
+from __future__ import annotations
+import argparse, asyncio, importlib, json, os, socket, sys, time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+
+import common
+import runner
+
+STUDENT_MODULES = ("student_bfs", "student_ids", "student_astar", "student_sa", "student_lp_dp", "heuristics")
+# request keys passed through to runner.run_suite (OutputOptions fields among them)
+_SUITE_KEYS = {"seed", "rows", "cols", "density", "layout", "sa_history", "sa_history_size", "dp_table_max",
+               "dp_items", "dp_capacity", "grid_format", "path_encoding", "tiles", "tile_size",
+               "max_expansions", "metrics", "metrics_alloc", "only"}
+
+# ---------------- worker side (one copy per pool process) ----------------
+_DIR = "."                                  # submission folder, set by _worker_init
+_MODULES: Dict[str, Tuple[tuple, str, Any]] = {}   # name -> ((mtime_ns, size), fingerprint, module)
+_GRIDS: "OrderedDict[tuple, Any]" = OrderedDict()    # run_suite grid_cache, least recently used first
+_GRIDS_MAX = 256
+
+
+def _worker_init(submission_dir: str) -> None:
+    global _DIR
+    _DIR = submission_dir
+    sys.path.insert(0, submission_dir)
+
+
+def _fresh_modules() -> Dict[str, Any]:
+    """
+    Student modules, re-imported only when common.sha_code_fingerprint of
+    their file changed. The file is hashed only when its mtime or size moved.
+    """
+    out = {}
+    for name in STUDENT_MODULES:
+        path = os.path.join(_DIR, name + ".py")
+        try:
+            st = os.stat(path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        cached = _MODULES.get(name)
+        if cached is not None and stamp is not None and cached[0] == stamp:
+            out[name] = cached[2]
+            continue
+        fp = common.sha_code_fingerprint([path])
+        if cached is None:
+            mod = importlib.import_module(name)
+        elif cached[1] != fp:
+            mod = importlib.reload(cached[2])
+        else:
+            mod = cached[2]
+        _MODULES[name] = (stamp, fp, mod)
+        out[name] = mod
+    return out
+
+
+def _grade(req: Dict[str, Any]) -> Dict[str, Any]:
+    """Grade one request in a pool process; returns results plus the worker's timing."""
+    t0 = time.perf_counter()
+    mods = _fresh_modules()
+    output, opts = runner.OutputOptions.split({k: req[k] for k in _SUITE_KEYS if k in req})
+    out_dir = req.get("out_dir")
+    results = runner.run_suite(str(req.get("student_id", "TEST")), modules=mods, grid_cache=_GRIDS,
+                               write=bool(out_dir), out_dir=out_dir or ".", output=output, **opts)
+    while len(_GRIDS) > _GRIDS_MAX:
+        _GRIDS.popitem(last=False)
+    return {"ok": True, "results": results, "worker_ms": round((time.perf_counter() - t0) * 1000, 3),
+            "pid": os.getpid()}
+
+
+def _warm() -> int:
+    _fresh_modules()
+    return os.getpid()
+
+# ---------------- server side ----------------
+class GradingDaemon:
+    """
+    asyncio front end: accepts requests concurrently and grades them on a
+    ProcessPoolExecutor whose workers keep the runner, the student modules,
+    generated grids and reference BFS paths loaded between requests.
+
+    A request's out_dir must resolve inside out_root. A request that runs
+    past `timeout` seconds gets an error, and the pool is replaced so the
+    stuck worker is killed; requests that were running next to it are
+    retried once on the new pool.
+    """
+
+    def __init__(self, submission_dir: str, workers: int, out_root: str = ".",
+                 timeout: Optional[float] = 120.0):
+        self.submission_dir = os.path.abspath(submission_dir)
+        self.workers = workers
+        self.out_root = os.path.realpath(out_root)
+        self.timeout = timeout or None
+        self.pool = self._new_pool()
+        self.served = 0
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_worker_init,
+                                   initargs=(self.submission_dir,))
+
+    def _replace_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Kill every worker of `pool` (one of them is stuck) and grade on a fresh pool from now on."""
+        if pool is not self.pool:
+            return
+        self.pool = self._new_pool()
+        for proc in list((pool._processes or {}).values()):
+            proc.kill()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _out_dir(self, out_dir: Any) -> str:
+        """out_dir resolved under out_root; ValueError if it is not a string or escapes the root."""
+        if not isinstance(out_dir, str) or not out_dir:
+            raise ValueError("out_dir must be a non-empty path")
+        target = os.path.realpath(os.path.join(self.out_root, out_dir))
+        if os.path.commonpath([self.out_root, target]) != self.out_root:
+            raise ValueError(f"out_dir must stay inside {self.out_root}")
+        return target
+
+    async def warm_up(self) -> None:
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, _warm) for _ in range(self.workers)))
+
+    async def handle(self, req: Dict[str, Any]) -> Dict[str, Any]:
+        if req.get("op") == "ping":
+            return {"ok": True, "served": self.served, "workers": self.workers}
+        unknown = set(req) - _SUITE_KEYS - {"student_id", "out_dir", "op"}
+        if unknown:
+            return {"ok": False, "error": f"unknown keys: {sorted(unknown)}"}
+        if "out_dir" in req:
+            try:
+                req = {**req, "out_dir": self._out_dir(req["out_dir"])}
+            except ValueError as e:
+                return {"ok": False, "error": str(e)}
+        t0 = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        for attempt in (0, 1):
+            pool = self.pool
+            try:
+                resp = await asyncio.wait_for(loop.run_in_executor(pool, _grade, req), self.timeout)
+                break
+            except asyncio.TimeoutError:
+                self._replace_pool(pool)
+                return {"ok": False, "error": f"timed out after {self.timeout:g}s"}
+            except BrokenProcessPool as e:
+                if attempt or pool is self.pool:  # not a pool we replaced: a worker really died
+                    self._replace_pool(pool)
+                    return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            except Exception as e:
+                return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        self.served += 1
+        resp["ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        return resp
+
+    async def serve_lines(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Unix-socket protocol: one JSON request per line, one JSON response per line."""
+        try:
+            while line := await reader.readline():
+                try:
+                    resp = await self.handle(json.loads(line))
+                except ValueError as e:
+                    resp = {"ok": False, "error": f"bad JSON: {e}"}
+                writer.write(json.dumps(resp).encode() + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve_http(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Minimal HTTP/1.1: POST /grade with a JSON body, GET /ping; one request per connection."""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            method, path = lines[0].split(" ")[:2]
+            headers = {k.strip().lower(): v.strip() for k, _, v in (l.partition(":") for l in lines[1:] if l)}
+            body = await reader.readexactly(int(headers.get("content-length", 0)))
+            if method == "GET" and path == "/ping":
+                status, resp = 200, await self.handle({"op": "ping"})
+            elif method == "POST" and path == "/grade":
+                try:
+                    resp = await self.handle(json.loads(body or b"{}"))
+                    status = 200 if resp.get("ok") else 400
+                except ValueError as e:
+                    status, resp = 400, {"ok": False, "error": f"bad JSON: {e}"}
+            else:
+                status, resp = 404, {"ok": False, "error": "use POST /grade or GET /ping"}
+            data = json.dumps(resp).encode()
+            writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                         f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                         f"Connection: close\r\n\r\n".encode() + data)
+            await writer.drain()
+        except (asyncio.IncompleteReadError, ValueError, IndexError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _main(args) -> None:
+    daemon = GradingDaemon(args.dir, args.workers, args.out_root, args.timeout)
+    await daemon.warm_up()
+    if args.port:
+        server = await asyncio.start_server(daemon.serve_http, "127.0.0.1", args.port)
+        where = f"http://127.0.0.1:{args.port}"
+    else:
+        if os.path.exists(args.socket):
+            os.unlink(args.socket)
+        server = await asyncio.start_unix_server(daemon.serve_lines, args.socket)
+        where = args.socket
+    print(f"Grading daemon on {where} with {args.workers} warm workers", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def request(payload: Dict[str, Any], socket_path: str = "grade.sock") -> Dict[str, Any]:
+    """Send one request to a daemon on a Unix socket and return its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.connect(socket_path)
+        s.sendall(json.dumps(payload).encode() + b"\n")
+        buf = b""
+        while not buf.endswith(b"\n"):
+            chunk = s.recv(1 << 16)
+            if not chunk:
+                break
+            buf += chunk
+    return json.loads(buf)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Warm grading daemon (JSON lines on a Unix socket, or HTTP)")
+    ap.add_argument("--socket", default="grade.sock", help="Unix socket path (default transport)")
+    ap.add_argument("--port", type=int, default=0, help="Serve HTTP on 127.0.0.1:PORT instead of a Unix socket")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Grading processes")
+    ap.add_argument("--dir", default=".", help="Folder with the student_*.py / heuristics.py to grade")
+    ap.add_argument("--out_root", default=".", help="Requests' out_dir must resolve inside this folder")
+    ap.add_argument("--timeout", type=float, default=120.0,
+                    help="Seconds per request before its worker is killed (0 = no limit)")
+    ap.add_argument("--send", default=None, metavar="JSON", help="Client mode: send one request to --socket and print")
+    args = ap.parse_args()
+    if args.send:
+        print(json.dumps(request(json.loads(args.send), args.socket), indent=2))
+    else:
+        try:
+            asyncio.run(_main(args))
+        except KeyboardInterrupt:
+            pass
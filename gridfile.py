@@ -0,0 +1,154 @@
+# gridfile.py — compact binary grid: fixed header + bit-packed occupancy plane
+from __future__ import annotations
+import hashlib, mmap, struct
+from collections.abc import Set as AbstractSet
+from typing import Iterable, Iterator, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; bit plane packing falls back to Python
+    np = None
+
+Coord = Tuple[int, int]
+
+MAGIC = b"GRDB"
+VERSION = 1
+FORMAT_NAME = "bitplane-v1"
+# magic, version, flags, rows, cols, start r/c, goal r/c -> 32 bytes, little endian
+HEADER = struct.Struct("<4sHHIIIIII")
+
+
+def row_bytes(cols: int) -> int:
+    return (cols + 7) // 8
+
+
+def pack_obstacles(rows: int, cols: int, obstacles: Iterable[Coord]) -> bytes:
+    """Occupancy plane: row-major, row_bytes(cols) per row, cell (r, c) is bit c & 7 of byte c >> 3."""
+    rb = row_bytes(cols)
+    if np is not None:
+        cells = np.array(list(obstacles), dtype=np.int64).reshape(-1, 2)
+        plane = np.zeros((rows, rb * 8), dtype=bool)
+        plane[cells[:, 0], cells[:, 1]] = True
+        return np.packbits(plane, axis=1, bitorder="little").tobytes()
+    buf = bytearray(rows * rb)
+    for r, c in obstacles:
+        buf[r * rb + (c >> 3)] |= 1 << (c & 7)
+    return bytes(buf)
+
+
+def write_grid(path: str, rows: int, cols: int, obstacles: Iterable[Coord],
+               start: Coord = (0, 0), goal: Optional[Coord] = None) -> str:
+    """Write the grid file; returns the sha256 of its occupancy plane."""
+    goal = goal if goal is not None else (rows - 1, cols - 1)
+    plane = pack_obstacles(rows, cols, obstacles)
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, 0, rows, cols, start[0], start[1], goal[0], goal[1]))
+        f.write(plane)
+    return hashlib.sha256(plane).hexdigest()
+
+
+class GridFile:
+    """
+    Read-only, memory-mapped grid file. Nothing is copied on open: `plane` is
+    a memoryview over the mapping, `bits()` a (rows, row_bytes) uint8 array on
+    the same memory, and `obstacles` a set-like view that tests cells
+    straight from the mapped bytes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _flags, rows, cols, sr, sc, gr, gc = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a {FORMAT_NAME} grid file")
+        self.rows, self.cols = rows, cols
+        self.start: Coord = (sr, sc)
+        self.goal: Coord = (gr, gc)
+        self.row_bytes = row_bytes(cols)
+        if len(self._mm) != HEADER.size + rows * self.row_bytes:
+            raise ValueError(f"{path}: truncated occupancy plane")
+        self.plane = memoryview(self._mm)[HEADER.size:]
+        self.obstacles = ObstacleSet(self)
+
+    def bits(self):
+        """Zero-copy (rows, row_bytes) uint8 numpy view of the packed plane."""
+        if np is None:
+            raise RuntimeError("numpy is required for GridFile.bits()")
+        return np.frombuffer(self._mm, dtype=np.uint8, count=self.rows * self.row_bytes,
+                             offset=HEADER.size).reshape(self.rows, self.row_bytes)
+
+    def blocked(self, r: int, c: int) -> bool:
+        return bool(self._mm[HEADER.size + r * self.row_bytes + (c >> 3)] >> (c & 7) & 1)
+
+    def sha256(self) -> str:
+        return hashlib.sha256(self.plane).hexdigest()
+
+    def close(self) -> None:
+        self.plane.release()
+        self._mm.close()
+
+
+def _open_obstacles(path: str) -> "ObstacleSet":
+    return GridFile(path).obstacles
+
+
+class ObstacleSet(AbstractSet):
+    """
+    Set of blocked (r, c) cells backed by a GridFile. Membership reads one
+    mapped byte; iteration and len() scan the plane (numpy when available).
+    Pickles by path, so worker processes map the same file.
+    """
+
+    def __init__(self, grid: GridFile):
+        self._grid = grid
+        self._len: Optional[int] = None
+        self._key: Optional[tuple] = None
+
+    @property
+    def grid_key(self) -> tuple:
+        """Cheap grid identity for per-grid caches (see runner.GridObstacles): the plane's digest."""
+        if self._key is None:
+            g = self._grid
+            self._key = ("file", g.rows, g.cols, g.sha256())
+        return self._key
+
+    @classmethod
+    def _from_iterable(cls, it):
+        return set(it)  # results of |, &, - are plain sets
+
+    def __contains__(self, rc) -> bool:
+        try:
+            r, c = rc
+        except (TypeError, ValueError):
+            return False
+        g = self._grid
+        if not (0 <= r < g.rows and 0 <= c < g.cols):
+            return False
+        return g.blocked(r, c)
+
+    def coords(self):
+        """(rows, cols) index arrays of the blocked cells, in row-major order (needs numpy)."""
+        g = self._grid
+        return np.nonzero(np.unpackbits(g.bits(), axis=1, bitorder="little")[:, :g.cols])
+
+    def __iter__(self) -> Iterator[Coord]:
+        g = self._grid
+        if np is not None:
+            rs, cs = self.coords()
+            return iter(zip(rs.tolist(), cs.tolist()))
+        return ((r, c) for r in range(g.rows) for c in range(g.cols) if g.blocked(r, c))
+
+    def __len__(self) -> int:
+        if self._len is None:
+            if np is not None:
+                self._len = int(np.unpackbits(self._grid.bits(), axis=1, bitorder="little").sum())
+            else:
+                self._len = sum(bin(b).count("1") for b in self._grid.plane)
+        return self._len
+
+    def __hash__(self) -> int:
+        return self._hash()
+
+    def __reduce__(self):
+        return (_open_obstacles, (self._grid.path,))
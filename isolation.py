@@ -0,0 +1,162 @@
+# isolation.py — run runner.grade_* calls in watchdog-supervised worker processes
+from __future__ import annotations
+import importlib, multiprocessing as mp, os, sys, time, traceback
+from multiprocessing.connection import wait
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    import resource
+except ImportError:  # not available on Windows: the watchdog still enforces time / RSS
+    resource = None
+
+import runner
+
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def _rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process from /proc (Linux), else None."""
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * _PAGE
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _worker_main(conn, max_expansions: Optional[int], max_rss_mb: Optional[int], sys_path: Optional[str]) -> None:
+    """
+    Worker loop: receive (grader, module names, args), import the modules,
+    call runner.<grader>(*modules, *args) and send back ("ok", result) or
+    ("error", traceback). A None message ends the worker.
+    """
+    if resource is not None and max_rss_mb:
+        # RLIMIT_RSS is not enforced by Linux; the address-space limit is, and
+        # turns a runaway allocation into a MemoryError inside the student code
+        limit = int(max_rss_mb) * 2 * 1024 * 1024
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ValueError, OSError):
+            pass
+    if sys_path:
+        sys.path.insert(0, sys_path)
+    runner.Trace.default_cap = max_expansions
+    while True:
+        try:
+            msg = conn.recv()
+        except EOFError:
+            return
+        if msg is None:
+            return
+        grader, module_names, args = msg
+        try:
+            mods = [importlib.import_module(m) for m in module_names]
+            conn.send(("ok", getattr(runner, grader)(*mods, *args)))
+        except BaseException:
+            conn.send(("error", traceback.format_exc(limit=5)))
+
+
+class _Worker:
+    def __init__(self, ctx, limits: tuple):
+        self.conn, child = ctx.Pipe()
+        self.proc = ctx.Process(target=_worker_main, args=(child, *limits), daemon=True)
+        self.proc.start()
+        child.close()
+
+    def kill(self) -> None:
+        self.proc.kill()
+        self.proc.join()
+        self.conn.close()
+
+    def stop(self) -> None:
+        try:
+            self.conn.send(None)
+        except (OSError, BrokenPipeError):
+            pass
+        self.proc.join(1.0)
+        if self.proc.is_alive():
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class WorkerPool:
+    """
+    Reusable worker processes for runner.grade_* calls.
+
+    Each call is watched by the parent: the worker is killed (and replaced on
+    the next call) when it exceeds `timeout` seconds of wall clock (None for
+    no limit) or `max_rss_mb` of resident memory. `max_expansions` caps every runner.Trace
+    in the workers, and the RSS limit is also applied as RLIMIT_AS inside
+    them. Workers are reused while they stay healthy, so student modules are
+    imported once per worker; use one pool per submission.
+    """
+
+    def __init__(self, workers: int = 1, timeout: Optional[float] = 30.0, max_expansions: Optional[int] = None,
+                 max_rss_mb: Optional[int] = None, sys_path: Optional[str] = None, poll: float = 0.05):
+        self._ctx = mp.get_context("fork" if "fork" in mp.get_all_start_methods() else "spawn")
+        self._limits = (max_expansions, max_rss_mb, sys_path)
+        self._idle: List[_Worker] = []
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.max_rss = max_rss_mb * 1024 * 1024 if max_rss_mb else None
+        self.poll = poll
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        for w in self._idle:
+            w.stop()
+        self._idle = []
+
+    def _take(self) -> _Worker:
+        return self._idle.pop() if self._idle else _Worker(self._ctx, self._limits)
+
+    def map(self, calls: Sequence[Tuple[str, Sequence[str], tuple]]) -> List[Tuple[str, Any]]:
+        """
+        Run (grader, module names, args) calls on up to `workers` processes.
+        Returns (status, payload) per call in order: ("ok", result),
+        ("error", traceback), ("timeout", seconds) or ("memory", rss_mb).
+        """
+        out: List[Optional[Tuple[str, Any]]] = [None] * len(calls)
+        queue = list(enumerate(calls))[::-1]
+        busy: Dict[int, Tuple[_Worker, float]] = {}
+        while queue or busy:
+            while queue and len(busy) < self.workers:
+                idx, (grader, module_names, args) = queue.pop()
+                w = self._take()
+                try:
+                    w.conn.send((grader, tuple(module_names), tuple(args)))
+                except (OSError, BrokenPipeError):
+                    w.kill()
+                    queue.append((idx, calls[idx]))
+                    continue
+                busy[idx] = (w, time.perf_counter())
+            ready = wait([w.conn for w, _ in busy.values()], timeout=self.poll)
+            for idx, (w, t0) in list(busy.items()):
+                if w.conn in ready:
+                    try:
+                        out[idx] = w.conn.recv()
+                        self._idle.append(w)
+                    except (EOFError, OSError):
+                        out[idx] = ("error", f"worker exited with code {w.proc.exitcode}")
+                        w.kill()
+                    del busy[idx]
+                    continue
+                elapsed = time.perf_counter() - t0
+                rss = _rss_bytes(w.proc.pid) if self.max_rss else None
+                if self.timeout is not None and elapsed > self.timeout:
+                    out[idx] = ("timeout", round(elapsed, 3))
+                elif rss is not None and rss > self.max_rss:
+                    out[idx] = ("memory", round(rss / 2**20, 1))
+                else:
+                    continue
+                w.kill()
+                del busy[idx]
+        return out  # type: ignore[return-value]
+
+    def run(self, grader: str, module_names: Sequence[str], *args) -> Tuple[str, Any]:
+        return self.map([(grader, module_names, args)])[0]
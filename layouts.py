@@ -0,0 +1,181 @@
+# layouts.py — structured obstacle layouts (mazes, caves, rooms, spirals) for runner.build_grid
+from __future__ import annotations
+import itertools, random
+from typing import Callable, Dict, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional for grading; the structured layouts need it
+    np = None
+
+Coord = Tuple[int, int]
+
+_PERMS = list(itertools.permutations(range(4)))
+
+
+def _open_goal(g, rows: int, cols: int) -> None:
+    """Maze cells sit on even (r, c); link a goal on an odd row / column to the nearest one."""
+    g[rows - 1, cols - 1] = False
+    if rows % 2 == 0 and rows > 1:
+        g[rows - 2, cols - 1] = False
+
+
+def maze(rows: int, cols: int, nrng) -> "np.ndarray":
+    """
+    Perfect maze by the recursive backtracker: maze cells on even (r, c),
+    walls between them removed along the depth-first spanning tree. The walk
+    itself is an explicit stack over a flat visited bytearray (each cell
+    tries its four moves once, in an order drawn up front); the carving is
+    vectorized. One path between any two cells: long corridors, many dead ends.
+    """
+    h, w = (rows + 1) // 2, (cols + 1) // 2
+    n = h * w
+    order = nrng.integers(0, len(_PERMS), n).tolist()
+    tried = bytearray(n)
+    visited = bytearray(n)
+    parent = [-1] * n
+    visited[0] = 1
+    stack = [0]
+    while stack:
+        u = stack[-1]
+        k = tried[u]
+        if k == 4:
+            stack.pop()
+            continue
+        tried[u] = k + 1
+        d = _PERMS[order[u]][k]
+        if d == 0:
+            if u < w:
+                continue
+            v = u - w
+        elif d == 1:
+            if u % w == w - 1:
+                continue
+            v = u + 1
+        elif d == 2:
+            v = u + w
+            if v >= n:
+                continue
+        else:
+            if u % w == 0:
+                continue
+            v = u - 1
+        if not visited[v]:
+            visited[v] = 1
+            parent[v] = u
+            stack.append(v)
+
+    g = np.ones((rows, cols), dtype=bool)
+    g[0::2, 0::2] = False
+    par = np.array(parent, dtype=np.int64)
+    v = np.nonzero(par >= 0)[0]
+    p = par[v]
+    g[(v // w) + (p // w), (v % w) + (p % w)] = False  # wall cell between (2*rv, 2*cv) and (2*rp, 2*cp)
+    _open_goal(g, rows, cols)
+    return g
+
+
+def caves(rows: int, cols: int, nrng, fill: float = 0.45, steps: int = 4) -> "np.ndarray":
+    """
+    Cellular-automata caves: random fill, then `steps` rounds of the 4-5 rule
+    (a wall stays with >= 4 wall neighbours of 8, an open cell closes with
+    >= 5; the border counts as wall). A random monotone passage from start to
+    goal is carved afterwards so the two are always connected.
+    """
+    g = nrng.random((rows, cols)) < fill
+    for _ in range(steps):
+        p = np.pad(g, 1, constant_values=True).astype(np.uint8)
+        nb = sum(p[1 + dr:rows + 1 + dr, 1 + dc:cols + 1 + dc]
+                 for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc)
+        g = np.where(g, nb >= 4, nb >= 5)
+    moves = np.zeros(rows + cols - 2, dtype=bool)
+    moves[:cols - 1] = True  # True = step right, False = step down
+    nrng.shuffle(moves)
+    rs = np.concatenate(([0], np.cumsum(~moves)))
+    cs = np.concatenate(([0], np.cumsum(moves)))
+    g[rs, cs] = False
+    return g
+
+
+def rooms(rows: int, cols: int, nrng, cells_per_room: int = 150) -> "np.ndarray":
+    """
+    Rooms and corridors: random rectangular rooms (about one per
+    `cells_per_room` cells) joined by L-shaped corridors in serpentine
+    order of their centres, plus a few extra corridors that close loops.
+    The start and goal cells are rooms at the two ends of the chain.
+    """
+    n = max(2, rows * cols // cells_per_room)
+    hs = np.minimum(nrng.integers(2, 8, n), rows)
+    ws = np.minimum(nrng.integers(2, 12, n), cols)
+    r0 = (nrng.random(n) * (rows - hs + 1)).astype(np.int64)
+    c0 = (nrng.random(n) * (cols - ws + 1)).astype(np.int64)
+    cr, cc = r0 + hs // 2, c0 + ws // 2
+    band = max(8, int(cells_per_room ** 0.5) * 2)
+    row_band = cr // band
+    order = np.lexsort((np.where(row_band % 2, -cc, cc), row_band))
+    centres = [(0, 0)] + list(zip(cr[order].tolist(), cc[order].tolist())) + [(rows - 1, cols - 1)]
+
+    g = np.ones((rows, cols), dtype=bool)
+    for a, b, h, w in zip(r0.tolist(), c0.tolist(), hs.tolist(), ws.tolist()):
+        g[a:a + h, b:b + w] = False
+
+    def corridor(p, q):
+        (r1, c1), (r2, c2) = p, q
+        g[r1, min(c1, c2):max(c1, c2) + 1] = False
+        g[min(r1, r2):max(r1, r2) + 1, c2] = False
+
+    for p, q in zip(centres, centres[1:]):
+        corridor(p, q)
+    for i in nrng.integers(0, len(centres) - 1, max(1, n // 20)).tolist():
+        corridor(centres[i], centres[min(len(centres) - 1, i + 1 + int(nrng.integers(1, 6)))])
+    return g
+
+
+def spiral(rows: int, cols: int, nrng=None) -> "np.ndarray":
+    """
+    Worst case for A*: concentric wall rings with corridor rings between
+    them. Each corridor ring is cut at its top-right and bottom-left corners,
+    so the start half and the goal half only meet in the innermost ring. The
+    gaps through the walls sit on the long sides and alternate ends. The only
+    route therefore zigzags from the start into the centre and back out to
+    the goal, covering most corridor cells, while Manhattan distance keeps
+    pointing at the goal half. Grids narrower than 6 cells get no obstacles.
+    """
+    if min(rows, cols) < 6:
+        return np.zeros((rows, cols), dtype=bool)
+    if rows > cols:
+        return spiral(cols, rows).T.copy()
+    r = np.arange(rows)[:, None]
+    c = np.arange(cols)[None, :]
+    ring = np.minimum(np.minimum(r, rows - 1 - r), np.minimum(c, cols - 1 - c))
+    g = ring % 2 == 1
+    kmax = (rows - 1) // 2
+    inner = kmax - kmax % 2  # innermost corridor ring, where the two halves join
+    for k in range(0, inner, 2):
+        g[k, cols - 1 - k] = g[rows - 1 - k, k] = True
+    for j, k in enumerate(range(1, inner, 2)):
+        cut = k + 1 < inner  # the next corridor ring has its corners blocked
+        left, right = k + 1, cols - 2 - k - cut
+        # start half crosses on the top side, goal half on the bottom side
+        g[k, right if j % 2 == 0 else left] = False
+        g[rows - 1 - k, left + cut if j % 2 == 0 else cols - 2 - k] = False
+    return g
+
+
+LAYOUTS: Dict[str, Callable[..., "np.ndarray"]] = {
+    "maze": maze, "caves": caves, "rooms": rooms, "spiral": spiral,
+}
+
+
+def generate_array(layout: str, rows: int, cols: int, rng: random.Random) -> "np.ndarray":
+    """(rows, cols) bool array, True = obstacle; start and goal are always open."""
+    if np is None:
+        raise RuntimeError(f"numpy is required for the {layout!r} layout")
+    g = LAYOUTS[layout](rows, cols, np.random.default_rng(rng.getrandbits(64)))
+    g[0, 0] = g[rows - 1, cols - 1] = False
+    return g
+
+
+def generate(layout: str, rows: int, cols: int, rng: random.Random) -> Set[Coord]:
+    rs, cs = np.nonzero(generate_array(layout, rows, cols, rng))
+    return set(zip(rs.tolist(), cs.tolist()))
@@ -0,0 +1,146 @@
+# pathcodec.py — compact grid path encoding and a streaming JSON writer for results.json
+from __future__ import annotations
+import base64, json, re
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Union
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; encoding falls back to plain Python
+    np = None
+
+Coord = Tuple[int, int]
+
+# move codes: 0 up, 1 right, 2 down, 3 left (the letters used by the "rle" encoding)
+DIRS = "URDL"
+_DELTAS = ((-1, 0), (0, 1), (1, 0), (0, -1))
+_CODE = {d: i for i, d in enumerate(_DELTAS)}
+ENCODINGS = ("list", "dir2", "rle", "auto")
+_RUN = re.compile(r"([URDL])(\d*)")
+
+
+def _move_codes(path: Sequence[Coord]) -> List[int] | None:
+    """Per-step move codes, or None if some step is not a single 4-neighbour move."""
+    if np is not None and len(path) > 64:
+        d = np.diff(np.asarray(path, dtype=np.int64).reshape(-1, 2), axis=0)
+        unit = np.abs(d).sum(axis=1) == 1
+        if not unit.all():
+            return None
+        # (dr, dc) -> code via (dr + 1) * 3 + (dc + 1): up 1, right 5, down 7, left 3
+        lut = np.array([-1, 0, -1, 3, -1, 1, -1, 2, -1])
+        return lut[(d[:, 0] + 1) * 3 + (d[:, 1] + 1)].tolist()
+    codes = []
+    for (r0, c0), (r1, c1) in zip(path, path[1:]):
+        code = _CODE.get((r1 - r0, c1 - c0))
+        if code is None:
+            return None
+        codes.append(code)
+    return codes
+
+
+def _pack2(codes: List[int]) -> str:
+    """Four moves per byte, first move in the low bits, base64 text."""
+    buf = bytearray((len(codes) + 3) // 4)
+    for i, code in enumerate(codes):
+        buf[i >> 2] |= code << ((i & 3) * 2)
+    return base64.b64encode(bytes(buf)).decode("ascii")
+
+
+def _rle(codes: List[int]) -> str:
+    out, i, n = [], 0, len(codes)
+    while i < n:
+        j = i
+        while j < n and codes[j] == codes[i]:
+            j += 1
+        out.append(DIRS[codes[i]] + (str(j - i) if j - i > 1 else ""))
+        i = j
+    return "".join(out)
+
+
+def encode_path(path: Sequence[Coord], encoding: str = "auto") -> Union[List[Coord], Dict[str, Any]]:
+    """
+    {"enc", "start", "steps", "moves"} for a path of 4-neighbour moves.
+    "dir2" packs each move in 2 bits (base64), "rle" writes runs such as
+    "R12D3L", "auto" keeps the shorter of the two. Empty paths, paths with
+    any other step, and encoding="list" are returned unchanged.
+    """
+    if encoding not in ENCODINGS:
+        raise ValueError(f"encoding must be one of {ENCODINGS}, not {encoding!r}")
+    if encoding == "list" or not path:
+        return path
+    codes = _move_codes(path)
+    if codes is None:
+        return path
+    moves = {}
+    if encoding in ("dir2", "auto"):
+        moves["dir2"] = _pack2(codes)
+    if encoding in ("rle", "auto"):
+        moves["rle"] = _rle(codes)
+    enc = min(moves, key=lambda k: len(moves[k]))
+    return {"enc": enc, "start": list(path[0]), "steps": len(codes), "moves": moves[enc]}
+
+
+def decode_path(obj: Any) -> List[Coord]:
+    """Inverse of encode_path; a plain list of cells comes back as (r, c) tuples."""
+    if not isinstance(obj, dict):
+        return [tuple(p) for p in obj or []]
+    if obj["enc"] == "dir2":
+        raw = base64.b64decode(obj["moves"])
+        codes = [raw[i >> 2] >> ((i & 3) * 2) & 3 for i in range(obj["steps"])]
+    elif obj["enc"] == "rle":
+        codes = [DIRS.index(d) for d, k in _RUN.findall(obj["moves"]) for _ in range(int(k or 1))]
+    else:
+        raise ValueError(f"unknown path encoding {obj['enc']!r}")
+    r, c = obj["start"]
+    path = [(r, c)]
+    for code in codes:
+        dr, dc = _DELTAS[code]
+        r, c = r + dr, c + dc
+        path.append((r, c))
+    return path
+
+
+def _is_flat(v: list) -> bool:
+    """Numbers, strings, or short lists of them (cells, vertices): written on one line."""
+    return all(not isinstance(x, (dict, list, tuple)) or
+               (not isinstance(x, dict) and len(x) <= 4
+                and not any(isinstance(y, (dict, list, tuple)) for y in x)) for x in v)
+
+
+def iter_json(obj: Any, indent: int = 2, _level: int = 0) -> Iterator[str]:
+    """
+    json.dump(indent=indent) layout for objects, but flat arrays (SA history,
+    obstacle cells, vertices) are emitted on one line by the C encoder. Yields
+    chunks so the document is never held in memory as one string.
+    """
+    if isinstance(obj, dict):
+        if not obj:
+            yield "{}"
+            return
+        pad = "\n" + " " * (indent * (_level + 1))
+        yield "{"
+        for i, (k, v) in enumerate(obj.items()):
+            yield ("," if i else "") + pad + json.dumps(str(k)) + ": "
+            yield from iter_json(v, indent, _level + 1)
+        yield "\n" + " " * (indent * _level) + "}"
+    elif isinstance(obj, (list, tuple)) and not _is_flat(obj):
+        pad = "\n" + " " * (indent * (_level + 1))
+        yield "["
+        for i, v in enumerate(obj):
+            yield ("," if i else "") + pad
+            yield from iter_json(v, indent, _level + 1)
+        yield "\n" + " " * (indent * _level) + "]"
+    else:
+        yield json.dumps(obj)
+
+
+def write_json(path: str, obj: Any, indent: int = 2, chunk: int = 1 << 16) -> None:
+    """Stream iter_json(obj) to path, writing in chunks of about `chunk` characters."""
+    with open(path, "w", encoding="utf-8") as f:
+        buf, size = [], 0
+        for part in iter_json(obj, indent):
+            buf.append(part)
+            size += len(part)
+            if size >= chunk:
+                f.write("".join(buf))
+                buf, size = [], 0
+        f.write("".join(buf))
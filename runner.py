@@ -1,14 +1,21 @@
 # runner.py (MSc version, fixed & robust)
 from __future__ import annotations
-import json, math, random, argparse, importlib
+import hashlib, json, math, os, random, sys, time, argparse, importlib, inspect
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, fields
 from typing import List, Tuple, Set, Callable, Dict, Any, Optional
-from collections import deque
+from collections import deque, OrderedDict
+
+from common import DP_CELL_LIMIT
+from sahistory import SAHistory
 
 # --------------------------
 # Types & global config
 # --------------------------
 Coord = Tuple[int, int]
 START: Coord = (0, 0)
+# build_grid layouts generated by layouts.py
+STRUCTURED_LAYOUTS = ("maze", "caves", "rooms", "spiral")
 
 # --------------------------
 # Utilities
@@ -69,6 +76,41 @@ def _bfs_path_local(start: Coord, goal: Coord, neighbors_fn: Callable[[Coord], L
                 q.append(v)
     return []
 
+class GridObstacles(set):
+    """
+    Obstacle set tagged with a cheap identity of its grid, the
+    (seed, rows, cols, density, layout) it was built from, so per-grid caches
+    key on that instead of hashing every cell. gridfile.ObstacleSet has a
+    grid_key too (the file's digest). The tag survives pickling to workers.
+    """
+    def __init__(self, cells=(), grid_key: Optional[tuple] = None):
+        super().__init__(cells)
+        self.grid_key = grid_key
+
+# reference BFS paths by grid; graders and hidden checks all ask for the same one,
+# and a long-lived process (grade_daemon) sees the same grids again and again
+_REF_PATHS: "OrderedDict[tuple, List[Coord]]" = OrderedDict()
+_REF_PATHS_MAX = 64
+
+def _reference_path(rows: int, cols: int, obstacles: Set[Coord]) -> List[Coord]:
+    """
+    Shortest START -> (rows-1, cols-1) path on the grid (copy of
+    _bfs_path_local), memoized for obstacle sets that carry a grid_key.
+    """
+    tag = getattr(obstacles, "grid_key", None)
+    if tag is None:
+        return _bfs_path_local(START, (rows-1, cols-1), neighbors_4(rows, cols, obstacles))
+    key = (rows, cols, tag)
+    path = _REF_PATHS.get(key)
+    if path is None:
+        path = _bfs_path_local(START, (rows-1, cols-1), neighbors_4(rows, cols, obstacles))
+        _REF_PATHS[key] = path
+        if len(_REF_PATHS) > _REF_PATHS_MAX:
+            _REF_PATHS.popitem(last=False)
+    else:
+        _REF_PATHS.move_to_end(key)
+    return list(path)
+
 def _grid_bfs_dist(start: Coord, goal: Coord, neighbors_fn) -> float:
     if start == goal:
         return 0
@@ -89,9 +131,14 @@ def build_grid(rows: int, cols: int, density: float, rng: random.Random, layout:
     #  - 'random' (default): keep existing randomized placement with connectivity check
     #  - 'checkerboard': place obstacles on alternating cells (useful for visual tests)
     #  - 'none': no obstacles
+    #  - 'maze', 'caves', 'rooms', 'spiral': structured stress layouts (layouts.py, need NumPy)
     if layout == "none":
         return set()
 
+    if layout in STRUCTURED_LAYOUTS:
+        import layouts
+        return layouts.generate(layout, rows, cols, rng)
+
     if layout == "checkerboard":
         obstacles: Set[Coord] = set()
         for r in range(rows):
@@ -105,6 +152,7 @@ def build_grid(rows: int, cols: int, density: float, rng: random.Random, layout:
         n4 = neighbors_4(rows, cols, obstacles)
         if _bfs_path_local(START, (rows-1, cols-1), n4):
             return obstacles
+        print(f"checkerboard layout has no path on a {rows}x{cols} grid; using no obstacles")
         return set()
 
     # default: random
@@ -124,9 +172,30 @@ def build_grid(rows: int, cols: int, density: float, rng: random.Random, layout:
         attempts += 1
     return set()
 
+class ExpansionCapExceeded(BaseException):
+    """
+    Raised by a capped Trace. Derives from BaseException so that student code
+    wrapping trace.expand() in `except Exception` cannot swallow it; the
+    graders catch it explicitly.
+    """
+
+# default expansion cap per grid cell: BFS/A* expand each cell once, the
+# default 6x6 IDS about 26 times; runaway searches stop instead of hanging
+EXPANSIONS_PER_CELL = 1000
+
 class Trace:
-    def __init__(self): self.expanded: List[Coord] = []
-    def expand(self, node: Coord): self.expanded.append(node)
+    # cap for every new Trace when set (--max_expansions; 0 = unlimited),
+    # otherwise EXPANSIONS_PER_CELL * rows * cols
+    default_cap: Optional[int] = None
+    def __init__(self, cap: Optional[int] = None, cells: int = 1):
+        self.expanded: List[Coord] = []
+        if cap is None:
+            cap = Trace.default_cap if Trace.default_cap is not None else EXPANSIONS_PER_CELL * max(1, cells)
+        self.cap = cap or None
+    def expand(self, node: Coord):
+        self.expanded.append(node)
+        if self.cap is not None and len(self.expanded) > self.cap:
+            raise ExpansionCapExceeded("Exceeded expansion cap; check for loops or poor pruning.")
 
 # --------------------------
 # Integrity helpers
@@ -142,23 +211,57 @@ def _count_plateau_changes(arr, eps=1e-9):
             last = v
     return changes
 
+def _history_summary(history) -> Optional[Dict[str, Any]]:
+    """
+    Count/min/max/plateau changes of an SA history: a plain list, or the
+    grader's own SAHistory recorder (never an object the submission built).
+    """
+    if isinstance(history, SAHistory):
+        return dict(history.summary())
+    if not isinstance(history, list):
+        return None
+    return {
+        "mode": "full",
+        "count": len(history),
+        "min": min(history) if history else None,
+        "max": max(history) if history else None,
+        "changes": _count_plateau_changes(history),
+    }
+
+def _history_export(history) -> Tuple[Optional[List[float]], Optional[List[int]]]:
+    """(values, iteration indices) to serialize; indices only for downsampled recorders."""
+    if isinstance(history, SAHistory):
+        full = history.summary().get("mode") == "full"
+        return list(history.values()), (None if full else list(history.indices()))
+    return history, None
+
+def _supported_kwargs(fn: Callable, **kwargs) -> Dict[str, Any]:
+    """Keep only the optional kwargs fn accepts (older student signatures lack them)."""
+    try:
+        params = inspect.signature(fn).parameters
+    except (TypeError, ValueError):
+        return {}
+    if any(p.kind == inspect.Parameter.VAR_KEYWORD for p in params.values()):
+        return kwargs
+    return {k: v for k, v in kwargs.items() if k in params}
+
 # --------------------------
 # Grading helpers
 # --------------------------
-def grade_bfs(student, rows, cols, obstacles) -> Dict[str, Any]:
+def grade_bfs(student, rows, cols, obstacles, keep_expanded: bool = False) -> Dict[str, Any]:
     n4 = neighbors_4(rows, cols, obstacles)
     goal = (rows-1, cols-1)
-    trace = Trace()
+    trace = Trace(cells=rows * cols)
     try:
         path = student.bfs(START, goal, n4, trace)  # required signature
-    except Exception:
+    except (Exception, ExpansionCapExceeded):
         path = []
     ok = bool(path and path[-1] == goal)
-    best = _bfs_path_local(START, goal, n4)
+    best = _reference_path(rows, cols, obstacles)
     best_len = len(best) if best else None
     path_len = len(path) if path else None
     score = 10 if (ok and best and path_len == best_len) else (5 if ok else 0)
-    return {
+    out = {
         "ok": ok,
         "path": path,
         "path_len": path_len or 0,
@@ -166,6 +269,9 @@ def grade_bfs(student, rows, cols, obstacles) -> Dict[str, Any]:
         "expansions": len(trace.expanded),
         "score": score,
     }
+    if keep_expanded:
+        out["expanded_cells"] = trace.expanded  # for the tile heatmap; run_suite drops it
+    return out
 
 def grade_heuristics(heur, rows, cols, obstacles) -> Dict[str, Any]:
     # 20% total: Manhattan 5, Straight-line 5, Custom 10
@@ -210,21 +316,21 @@ def _normalize_astar_result(res):
         return list(res[0])
     return list(res) if isinstance(res, list) else []
 
-def grade_astar(student, heur, rows, cols, obstacles) -> Dict[str, Any]:
+def grade_astar(student, heur, rows, cols, obstacles, keep_expanded: bool = False) -> Dict[str, Any]:
     n4 = neighbors_4(rows, cols, obstacles)
     goal = (rows-1, cols-1)
-    trace = Trace()
+    trace = Trace(cells=rows * cols)
     try:
         res = student.astar(START, goal, n4, heur.heuristic_manhattan, trace)
         path = _normalize_astar_result(res)
-    except Exception:
+    except (Exception, ExpansionCapExceeded):
         path = []
     ok = bool(path and path[-1] == goal)
-    best = _bfs_path_local(START, goal, n4)
+    best = _reference_path(rows, cols, obstacles)
     best_len = len(best) if best else None
     path_len = len(path) if path else None
     score = 15 if (ok and best and path_len == best_len) else (8 if ok else 0)
-    return {
+    out = {
         "ok": ok,
         "path": path,
         "path_len": path_len or 0,
@@ -233,6 +339,9 @@ def grade_astar(student, heur, rows, cols, obstacles) -> Dict[str, Any]:
         "expansions": len(trace.expanded),
         "score": score,
     }
+    if keep_expanded:
+        out["expanded_cells"] = trace.expanded  # for the tile heatmap; run_suite drops it
+    return out
 
 def _normalize_ids_result(res):
     """Accept path OR (path, limit)."""
@@ -240,21 +349,21 @@ def _normalize_ids_result(res):
         return list(res[0])
     return list(res) if isinstance(res, list) else []
 
-def grade_ids(student, rows, cols, obstacles) -> Dict[str, Any]:
+def grade_ids(student, rows, cols, obstacles, keep_expanded: bool = False) -> Dict[str, Any]:
     n4 = neighbors_4(rows, cols, obstacles)
     goal = (rows-1, cols-1)
-    trace = Trace()
+    trace = Trace(cells=rows * cols)
     try:
         res = student.ids(START, goal, n4, trace)
         path = _normalize_ids_result(res)
-    except Exception:
+    except (Exception, ExpansionCapExceeded):
         path = []
     ok = bool(path and path[-1] == goal)
-    best = _bfs_path_local(START, goal, n4)
+    best = _reference_path(rows, cols, obstacles)
     best_len = len(best) if best else None
     path_len = len(path) if path else None
     score = 15 if (ok and best and path_len == best_len) else (8 if ok else 0)
-    return {
+    out = {
         "ok": ok,
         "path": path,
         "path_len": path_len or 0,
@@ -262,24 +371,40 @@ def grade_ids(student, rows, cols, obstacles) -> Dict[str, Any]:
         "expansions": len(trace.expanded),
         "score": score,
     }
+    if keep_expanded:
+        out["expanded_cells"] = trace.expanded  # for the tile heatmap; run_suite drops it
+    return out
+
+# objective_path is a pure function of the path, so the grader lets SA memoize its costs
+SA_COST_CACHE = 4096
 
-def grade_sa(student_sa, rows, cols, obstacles, seed) -> Dict[str, Any]:
+def grade_sa(student_sa, rows, cols, obstacles, seed,
+             history_mode: str = "full", history_size: int = 1024) -> Dict[str, Any]:
     n4 = neighbors_4(rows, cols, obstacles)
     goal = (rows-1, cols-1)
-    bfs0 = _bfs_path_local(START, goal, n4)
+    bfs0 = _reference_path(rows, cols, obstacles)
     bfs0_cost = objective_path(bfs0) if bfs0 else float("inf")
+    # the bounded recorder is the grader's: its summary comes from the values it saw appended
+    recorder = SAHistory(history_mode, history_size) if history_mode != "full" else None
     try:
         res = student_sa.simulated_annealing(
             neighbors_fn=n4,
             objective_fn=objective_path,
             obstacles=obstacles,
             seed=str(seed),
-            iters=900, T0=1.3, alpha=0.995
+            iters=900, T0=1.3, alpha=0.995,
+            **_supported_kwargs(student_sa.simulated_annealing, start=START, goal=goal,
+                                cost_cache=SA_COST_CACHE,
+                                **({} if recorder is None else {"recorder": recorder}))
         )
         if isinstance(res, tuple) and len(res) == 2:
             best_path, history = res
         else:
             best_path, history = res, None
+        if recorder is not None and recorder.count:
+            history = recorder  # exact summary and iteration indices of the kept values
+        elif isinstance(history, SAHistory):
+            history = history.values()  # a submission's own recorder only counts as its values
         ok = bool(best_path and best_path[-1] == goal)
         final_cost = objective_path(best_path) if ok else None
     except Exception:
@@ -289,9 +414,10 @@ def grade_sa(student_sa, rows, cols, obstacles, seed) -> Dict[str, Any]:
     improvement = -1e9
     if ok and math.isfinite(bfs0_cost) and math.isfinite(final_cost or float('inf')):
         improvement = bfs0_cost - final_cost
-    history_ok = isinstance(history, list) and len(history) >= 2
-    nonconstant = history_ok and (max(history) - min(history) > 1e-6)
-    changes_ok = history_ok and (_count_plateau_changes(history) >= 3)
+    summary = _history_summary(history)
+    history_ok = summary is not None and summary["count"] >= 2
+    nonconstant = history_ok and (summary["max"] - summary["min"] > 1e-6)
+    changes_ok = history_ok and (summary["changes"] >= 3)
     satisfied = sum([improvement > IMPROVE_THR, history_ok and nonconstant, changes_ok])
 
     if ok:
@@ -299,18 +425,102 @@ def grade_sa(student_sa, rows, cols, obstacles, seed) -> Dict[str, Any]:
     else:
         score = 0
 
-    return {
+    history, history_index = _history_export(history)
+    out = {
         "ok": ok,
         "path": best_path if ok else [],
         "path_len": len(best_path) if ok else 0,
         "final_cost": final_cost,
         "history": history,
+        "history_summary": summary,
         "bfs0_cost": bfs0_cost,
         "improvement": improvement,
         "score": score,
     }
+    if history_index is not None:
+        out["history_index"] = history_index
+    return out
+
+def _lp_seidel_crosscheck(student_lpdp, constraints, c1, c2, verts, best_pt, best_val) -> Dict[str, Any]:
+    """Ungraded: compare solve_lp_seidel with the vertex-enumeration optimum."""
+    try:
+        status, pt, val = student_lpdp.solve_lp_seidel(constraints, c1, c2)
+    except Exception as e:
+        return {"status": f"error: {e}", "match": False}
+    if status == "optimal":
+        match = (val is not None and best_val is not None and abs(val - best_val) < 1e-6
+                 and abs(pt[0] - best_pt[0]) < 1e-6 and abs(pt[1] - best_pt[1]) < 1e-6)
+    else:
+        match = (status == "infeasible") == (not verts)
+    return {"status": status, "best_point": pt, "optimum": val, "match": bool(match)}
+
+def _dp_table_export(values, weights, capacity, max_side: int) -> Dict[str, Any]:
+    """
+    Knapsack table for the HTML viz, downsampled to at most max_side rows and
+    columns (plus the last of each). Rows are rolled, so memory is one DP row
+    plus the exported cells rather than the full (n+1) x (capacity+1) table.
+    """
+    n = len(values)
+    def picks(size):
+        step = max(1, -(-size // max_side))
+        idx = list(range(0, size, step))
+        if idx[-1] != size - 1:
+            idx.append(size - 1)
+        return idx
+    caps = picks(capacity + 1)
+    keep = set(picks(n + 1))
+    row = [0] * (capacity + 1)
+    table = {n: [0] * len(caps)}
+    for i in range(n - 1, -1, -1):
+        w, v = weights[i], values[i]
+        for cap in range(capacity, w - 1, -1):
+            if v + row[cap - w] > row[cap]:
+                row[cap] = v + row[cap - w]
+        if i in keep:
+            table[i] = [row[cap] for cap in caps]
+    rows_idx = sorted(table)
+    return {"table": [table[i] for i in rows_idx], "table_rows": rows_idx, "table_caps": caps}
+
+# work caps that keep the capacity-independent engines from running away
+_DP_CAPS = {"branch_and_bound": {"max_nodes": 1_000_000}, "pareto": {"max_front": 100_000}}
 
-def grade_lp_dp(student_lpdp, rng: random.Random) -> Tuple[Dict[str,Any], Dict[str,Any]]:
+def _dp_engines(student_lpdp, values, weights, capacity) -> Tuple[str, str]:
+    """
+    Two knapsack engines to cross-check, picked by the grader from the
+    instance shape (never by the submission's own choose_knapsack_engine):
+    bottom-up/top-down while the n x (capacity+1) table is affordable, then
+    the Pareto front (few items) or branch and bound (many items), each
+    checked against the other. Modules missing an engine get the classic pair.
+    """
+    n = len(values)
+    if n * (max(capacity, 0) + 1) <= DP_CELL_LIMIT:
+        return "bottom_up", "top_down"
+    pair = ("pareto", "branch_and_bound") if n <= 40 else ("branch_and_bound", "pareto")
+    if not all(hasattr(student_lpdp, f"knapsack_{e}") for e in pair):
+        return "bottom_up", "top_down"
+    return pair
+
+def _run_dp_engine(student_lpdp, engine: str, values, weights, capacity) -> Tuple[Optional[int], Optional[str]]:
+    """(value, error): the engine runs under its _DP_CAPS limits when it accepts them."""
+    fn = getattr(student_lpdp, f"knapsack_{engine}")
+    try:
+        return fn(values, weights, capacity, **_supported_kwargs(fn, **_DP_CAPS.get(engine, {}))), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+# capacity of the random --dp_items instance when dp_capacity is 0 (unset)
+DP_DEFAULT_CAPACITY = 1000
+
+def _gen_dp_instance(rng: random.Random, n: int, capacity: int) -> Tuple[List[int], List[int], int]:
+    """Random knapsack with weights spread up to capacity / 4 (at least 1); capacity 0 = DP_DEFAULT_CAPACITY."""
+    capacity = capacity or DP_DEFAULT_CAPACITY
+    w_max = max(1, capacity // 4)
+    weights = [rng.randint(1, w_max) for _ in range(n)]
+    values = [rng.randint(1, 1000) for _ in range(n)]
+    return values, weights, capacity
+
+def grade_lp_dp(student_lpdp, rng: random.Random, dp_table_max: int = 0,
+                dp_items: int = 0, dp_capacity: int = 0) -> Tuple[Dict[str,Any], Dict[str,Any]]:
     # LP instance
     constraints = [
         (1.0, 1.0, 6.0),
@@ -334,30 +544,24 @@ def grade_lp_dp(student_lpdp, rng: random.Random) -> Tuple[Dict[str,Any], Dict[s
         "best_point": best_pt,
         "optimum": best_val
     }
+    if hasattr(student_lpdp, "solve_lp_seidel"):
+        lp_out["seidel"] = _lp_seidel_crosscheck(student_lpdp, constraints, c1, c2, verts, best_pt, best_val)
 
     # DP instance (0/1 knapsack)
-    values = [6, 5, 18, 15, 10]
-    weights = [2, 2,  6,  5,  4]
-    capacity = 10
-    try:
-        bu_val = student_lpdp.knapsack_bottom_up(values, weights, capacity)
-    except Exception:
-        bu_val = None
-    try:
-        td_val = student_lpdp.knapsack_top_down(values, weights, capacity)
-    except Exception:
-        td_val = None
-    dp_ok = (bu_val is not None) and (td_val is not None) and (bu_val == td_val)
+    if dp_items > 0:
+        values, weights, capacity = _gen_dp_instance(rng, dp_items, dp_capacity)
+    else:
+        values = [6, 5, 18, 15, 10]
+        weights = [2, 2,  6,  5,  4]
+        capacity = 10
+    engines = _dp_engines(student_lpdp, values, weights, capacity)
+    runs = [_run_dp_engine(student_lpdp, e, values, weights, capacity) for e in engines]
+    (a_val, _), (b_val, _) = runs
+    dp_ok = (a_val is not None) and (b_val is not None) and (a_val == b_val)
 
-    # build a small DP table for the HTML viz
-    n = len(values)
-    dp_table = [[0]*(capacity+1) for _ in range(n+1)]
-    for i in range(n-1, -1, -1):
-        for cap in range(0, capacity+1):
-            best = dp_table[i+1][cap]
-            if weights[i] <= cap:
-                best = max(best, values[i] + dp_table[i+1][cap - weights[i]])
-            dp_table[i][cap] = best
+    # the table is only meaningful (and affordable) for the pseudo-polynomial DP
+    table = (_dp_table_export(values, weights, capacity, dp_table_max)
+             if dp_table_max > 0 and "bottom_up" in engines else {})
 
     dp_out = {
         "ok": dp_ok,
@@ -365,17 +569,66 @@ def grade_lp_dp(student_lpdp, rng: random.Random) -> Tuple[Dict[str,Any], Dict[s
         "values": values,
         "weights": weights,
         "capacity": capacity,
-        "table": dp_table,
-        "bottom_up_value": bu_val,
-        "top_down_value": td_val,
-        "optimum": bu_val if bu_val is not None else td_val
+        **table,
+        "engines": list(engines),
+        # value from each engine that ran, keyed by engine ("bottom_up", "pareto", ...)
+        "engine_values": {e: v for e, (v, _) in zip(engines, runs)},
+        "optimum": a_val if a_val is not None else b_val
     }
+    errors = {e: err for e, (_, err) in zip(engines, runs) if err}
+    if errors:
+        dp_out["engine_errors"] = errors
     return lp_out, dp_out
 
 # --------------------------
 # Hidden checks
 # --------------------------
-def build_hidden_checks(seed, rows, cols, obstacles, out_all, heur_mod, sa_out, lp_out, dp_out):
+def _check_heuristic_admissible(heur_mod, rows, cols, obstacles) -> Tuple[bool, str]:
+    n4 = neighbors_4(rows, cols, obstacles)
+    goal = (rows-1, cols-1)
+    rng = random.Random(4242)
+    samples = []
+    for _ in range(20):
+        u = (rng.randrange(rows), rng.randrange(cols))
+        if u in obstacles: continue
+        td = _grid_bfs_dist(u, goal, n4)
+        if math.isfinite(td) and td < float('inf'):
+            samples.append((u, td))
+    bad = 0; neg = 0
+    for (u, td) in samples:
+        h = heur_mod.heuristic_manhattan(u, goal)
+        if h < -1e-9: neg += 1
+        if h > td + 1e-9: bad += 1
+    ok = (neg == 0 and bad == 0 and len(samples) >= 5)
+    return ok, f"samples={len(samples)}, neg={neg}, above={bad}"
+
+def _check_hidden_sa(student_sa, rows, cols, obstacles, seed) -> Tuple[bool, str]:
+    res = student_sa.simulated_annealing(
+        neighbors_fn=neighbors_4(rows, cols, obstacles),
+        objective_fn=objective_path,
+        obstacles=obstacles,
+        seed=str(seed) + "_h1",
+        iters=200, T0=1.3, alpha=0.995,
+        **_supported_kwargs(student_sa.simulated_annealing, start=START, goal=(rows-1, cols-1),
+                            cost_cache=SA_COST_CACHE)
+    )
+    best_path = res[0] if isinstance(res, tuple) else res
+    ok = bool(best_path and best_path[-1] == (rows-1, cols-1))
+    return ok, "SA sanity on hidden seed"
+
+def _add_student_check(checks, name, student_checks, run) -> None:
+    """Hidden check that calls student code: taken from student_checks when precomputed (as run_suite does)."""
+    if student_checks is not None:
+        ok, detail = student_checks[name]
+    else:
+        try:
+            ok, detail = run()
+        except Exception as e:
+            ok, detail = False, f"error: {e}"
+    _add_check(checks, name, ok, detail)
+
+def build_hidden_checks(seed, rows, cols, obstacles, out_all, heur_mod, sa_out, lp_out, dp_out,
+                        student_checks: Optional[Dict[str, Tuple[bool, str]]] = None):
     checks = []
     _add_check(checks, "Seed match", True, f"seed={seed}")
 
@@ -390,40 +643,22 @@ def build_hidden_checks(seed, rows, cols, obstacles, out_all, heur_mod, sa_out,
         _add_check(checks, "Trace usage", False, f"error: {e}")
 
     # A* heuristic admissibility (Manhattan spot-check)
-    try:
-        n4 = neighbors_4(rows, cols, obstacles)
-        goal = (rows-1, cols-1)
-        rng = random.Random(4242)
-        samples = []
-        for _ in range(20):
-            u = (rng.randrange(rows), rng.randrange(cols))
-            if u in obstacles: continue
-            td = _grid_bfs_dist(u, goal, n4)
-            if math.isfinite(td) and td < float('inf'):
-                samples.append((u, td))
-        bad = 0; neg = 0
-        for (u, td) in samples:
-            h = heur_mod.heuristic_manhattan(u, goal)
-            if h < -1e-9: neg += 1
-            if h > td + 1e-9: bad += 1
-        ok = (neg == 0 and bad == 0 and len(samples) >= 5)
-        _add_check(checks, "A* heuristic admissibility", ok, f"samples={len(samples)}, neg={neg}, above={bad}")
-    except Exception as e:
-        _add_check(checks, "A* heuristic admissibility", False, f"error: {e}")
+    _add_student_check(checks, "A* heuristic admissibility", student_checks,
+                       lambda: _check_heuristic_admissible(heur_mod, rows, cols, obstacles))
 
     # SA annealing signals
     try:
         n4 = neighbors_4(rows, cols, obstacles)
         goal = (rows-1, cols-1)
-        bfs0 = _bfs_path_local(START, goal, n4)
+        bfs0 = _reference_path(rows, cols, obstacles)
         bfs0_cost = objective_path(bfs0) if bfs0 else float("inf")
-        sa_hist = sa_out.get("history")
+        hs = sa_out.get("history_summary") or _history_summary(sa_out.get("history")) or {"count": 0, "changes": 0}
         sa_cost = sa_out.get("final_cost")
         improvement = (bfs0_cost - sa_cost) if (math.isfinite(bfs0_cost) and math.isfinite(sa_cost or float('inf'))) else -1e9
-        hist_ok = isinstance(sa_hist, list) and len(sa_hist) >= 2 and (max(sa_hist) - min(sa_hist) > 1e-6)
-        changes_ok = _count_plateau_changes(sa_hist) >= 3 if sa_hist else False
+        hist_ok = hs["count"] >= 2 and (hs["max"] - hs["min"] > 1e-6)
+        changes_ok = hs["changes"] >= 3
         all_ok = (improvement > 1.0) and hist_ok and changes_ok
-        _add_check(checks, "SA annealing", all_ok, f"improve={improvement:.3f}, hist_len={len(sa_hist or [])}, changes={_count_plateau_changes(sa_hist)}")
+        _add_check(checks, "SA annealing", all_ok, f"improve={improvement:.3f}, hist_len={hs['count']}, changes={hs['changes']}")
     except Exception as e:
         _add_check(checks, "SA annealing", False, f"error: {e}")
 
@@ -438,33 +673,70 @@ def build_hidden_checks(seed, rows, cols, obstacles, out_all, heur_mod, sa_out,
 
     # DP cross-check
     try:
-        bu = dp_out.get("bottom_up_value"); td = dp_out.get("top_down_value")
-        ok = (bu is not None) and (td is not None) and (bu == td)
-        _add_check(checks, "DP cross-check", ok, f"bottom_up={bu}, top_down={td}")
+        vals = dp_out.get("engine_values") or {}
+        ok = len(vals) == 2 and None not in vals.values() and len(set(vals.values())) == 1
+        _add_check(checks, "DP cross-check", ok, ", ".join(f"{e}={v}" for e, v in vals.items()))
     except Exception as e:
         _add_check(checks, "DP cross-check", False, f"error: {e}")
 
     # Hidden multi-seed quick SA
-    try:
-        SA = importlib.import_module("student_sa")
-        res = SA.simulated_annealing(
-            neighbors_fn=neighbors_4(rows, cols, obstacles),
-            objective_fn=objective_path,
-            obstacles=obstacles,
-            seed=str(seed) + "_h1",
-            iters=200, T0=1.3, alpha=0.995
-        )
-        best_path = res[0] if isinstance(res, tuple) else res
-        ok = bool(best_path and best_path[-1] == (rows-1, cols-1))
-        _add_check(checks, "Hidden multi-seed run", ok, "SA sanity on hidden seed")
-    except Exception as e:
-        _add_check(checks, "Hidden multi-seed run", False, f"error: {e}")
+    _add_student_check(checks, "Hidden multi-seed run", student_checks,
+                       lambda: _check_hidden_sa(importlib.import_module("student_sa"), rows, cols, obstacles, seed))
 
     return checks
 
 # --------------------------
 # Main run
 # --------------------------
+def _failed_output(kind: str, reason: str) -> Dict[str, Any]:
+    """Zero-score grader output for a component whose isolated run was killed or crashed."""
+    out: Dict[str, Any] = {"ok": False, "score": 0, "error": reason}
+    if kind in ("bfs", "astar", "ids", "sa"):
+        out.update(path=[], path_len=0, expansions=0)
+    if kind == "heuristics":
+        del out["ok"]
+        for name in ("manhattan", "straight", "custom"):
+            out[name] = {"ok": False, "detail": reason, "score": 0}
+    if kind == "sa":
+        out.update(final_cost=None, history=[], history_summary=None, bfs0_cost=None, improvement=None)
+    return out
+
+# rough relative cost, so the slowest tasks start first when workers are fewer than tasks
+_COST_HINT = {"grade_sa": 4, "grade_ids": 4, "_check_hidden_sa": 3, "grade_lp_dp": 2}
+
+def _pool_reason(status: str, payload: Any) -> str:
+    if status == "timeout":
+        return f"timed out after {payload}s"
+    if status == "memory":
+        return f"exceeded memory limit ({payload} MB RSS)"
+    return str(payload).strip().splitlines()[-1] if payload else status
+
+def _grade_pooled(pool, calls, check_calls) -> Tuple[Dict[str, Any], Dict[str, Tuple[bool, str]]]:
+    """
+    Run grader calls (component, grader, module names, args) and the hidden
+    checks that call student code (name, function, module names, args) on a
+    WorkerPool. None of them depends on another, so all are submitted at once,
+    slowest first; build_hidden_checks, which needs every output, runs after.
+    Failed graders become _failed_output, failed checks (False, reason).
+    """
+    tasks = [(fn, mods, args) for _, fn, mods, args in calls + check_calls]
+    order = sorted(range(len(tasks)), key=lambda i: -_COST_HINT.get(tasks[i][0], 1))
+    res: List[Any] = [None] * len(tasks)
+    for i, r in zip(order, pool.map([tasks[i] for i in order])):
+        res[i] = r
+    got = {}
+    for (kind, _, _, _), (status, payload) in zip(calls, res):
+        got[kind] = payload if status == "ok" else _failed_output(kind, _pool_reason(status, payload))
+    checks = {}
+    for (name, _, _, _), (status, payload) in zip(check_calls, res[len(calls):]):
+        if status == "ok":
+            checks[name] = payload
+        elif status == "error":
+            checks[name] = (False, "error: " + _pool_reason(status, payload))
+        else:
+            checks[name] = (False, f"{status}: {payload}")
+    return got, checks
+
 def _normalize_seed(student_id: str, seed: Optional[str]) -> str:
     """Fallback to student_id when seed is None / 'None' / '' (robust)."""
     if seed is None:
@@ -474,59 +746,553 @@ def _normalize_seed(student_id: str, seed: Optional[str]) -> str:
         return student_id
     return str(seed)
 
+# gradable components; lp and dp come from one grader
+COMPONENTS = ("bfs", "heuristics", "astar", "ids", "sa", "lp", "dp")
+_GRADERS = {
+    "bfs": ("grade_bfs", ("student_bfs",)),
+    "heuristics": ("grade_heuristics", ("heuristics",)),
+    "astar": ("grade_astar", ("student_astar", "heuristics")),
+    "ids": ("grade_ids", ("student_ids",)),
+    "sa": ("grade_sa", ("student_sa",)),
+    "lp_dp": ("grade_lp_dp", ("student_lp_dp",)),
+}
+# hidden checks that call student code: the component that re-runs them, function, modules
+_STUDENT_CHECKS = {
+    "A* heuristic admissibility": ("heuristics", "_check_heuristic_admissible", ("heuristics",)),
+    "Hidden multi-seed run": ("sa", "_check_hidden_sa", ("student_sa",)),
+}
+
+def _select_components(only) -> Set[str]:
+    """Component names from --only ("astar,heuristics" or an iterable); None selects everything."""
+    if only is None:
+        return set(COMPONENTS)
+    names = {n.strip() for n in (only.split(",") if isinstance(only, str) else only) if n.strip()}
+    if "lp_dp" in names:
+        names = (names - {"lp_dp"}) | {"lp", "dp"}
+    unknown = names - set(COMPONENTS)
+    if unknown:
+        raise ValueError(f"unknown components {sorted(unknown)}; choose from {', '.join(COMPONENTS)}")
+    if names & {"lp", "dp"}:
+        names |= {"lp", "dp"}
+    return names
+
+def _previous_results(out_dir: str, seed: str, rows: int, cols: int, obstacles: Set[Coord],
+                      grid_sha: Optional[str] = None) -> Dict[str, Any]:
+    """results.json in out_dir if it was graded on the same problem, else {} (with a note why)."""
+    path = os.path.join(out_dir, "results.json")
+    try:
+        with open(path, encoding="utf-8") as f:
+            prev = json.load(f)
+    except (OSError, ValueError):
+        print(f"No readable {path}; writing the selected components only")
+        return {}
+    same = (prev.get("seed") == str(seed) and prev.get("rows") == rows and prev.get("cols") == cols
+            and (prev.get("grid_sha256") == grid_sha if "grid_sha256" in prev
+                 else prev.get("obstacles") == [list(o) for o in sorted(obstacles)]))
+    if not same:
+        print(f"{path} was graded on a different problem; writing the selected components only")
+        return {}
+    for k in ("bfs", "astar", "ids", "sa"):
+        if isinstance(prev.get(k), dict) and isinstance(prev[k].get("path"), dict):
+            import pathcodec
+            prev[k]["path"] = [list(p) for p in pathcodec.decode_path(prev[k]["path"])]
+    lp = prev.get("lp")
+    if isinstance(lp, dict) and isinstance(lp.get("best_point"), list):
+        lp["best_point"] = tuple(lp["best_point"])  # as graded (JSON turned it into a list)
+    return prev
+
+class _Metrics:
+    """
+    Per-phase wall / CPU time for run_suite, plus the tracemalloc peak of each
+    phase when alloc=True and a cProfile dump per grader into profile_dir,
+    which is relative to base_dir (run_suite's out_dir). A disabled instance hands out nullcontext(), so the instrumentation costs
+    nothing when it is off.
+    """
+
+    def __init__(self, enabled: bool = False, alloc: bool = False, profile_dir: Optional[str] = None,
+                 base_dir: str = "."):
+        self.enabled = enabled or alloc or bool(profile_dir)
+        self.alloc = alloc
+        self.profile_dir = profile_dir
+        self._profile_path = os.path.join(base_dir, profile_dir) if profile_dir else None
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self._t0 = (time.perf_counter(), time.process_time())
+        if alloc:
+            import tracemalloc
+            self._tm = tracemalloc
+            tracemalloc.start()
+        if profile_dir:
+            os.makedirs(self._profile_path, exist_ok=True)
+
+    def phase(self, name: str, profile: bool = False):
+        return self._phase(name, profile) if self.enabled else nullcontext()
+
+    @contextmanager
+    def _phase(self, name: str, profile: bool):
+        prof = None
+        if profile and self.profile_dir:
+            import cProfile
+            prof = cProfile.Profile()
+        if self.alloc:
+            self._tm.reset_peak()
+            base = self._tm.get_traced_memory()[0]
+        wall, cpu = time.perf_counter(), time.process_time()
+        if prof is not None:
+            prof.enable()
+        try:
+            yield
+        finally:
+            if prof is not None:
+                prof.disable()
+            rec: Dict[str, Any] = {"wall_s": round(time.perf_counter() - wall, 6),
+                                   "cpu_s": round(time.process_time() - cpu, 6)}
+            if self.alloc:
+                rec["peak_alloc_kb"] = round(max(0, self._tm.get_traced_memory()[1] - base) / 1024, 1)
+            if prof is not None:
+                rec["profile"] = os.path.join(self.profile_dir, f"{name}.prof")  # as seen from base_dir
+                prof.dump_stats(os.path.join(self._profile_path, f"{name}.prof"))
+            self.phases[name] = rec
+
+    def as_dict(self) -> Dict[str, Any]:
+        if self.alloc:
+            self._tm.stop()
+        return {"phases": self.phases,
+                "total": {"wall_s": round(time.perf_counter() - self._t0[0], 6),
+                          "cpu_s": round(time.process_time() - self._t0[1], 6)},
+                "alloc_traced": self.alloc}
+
+def _json_member(key: str, value: Any, first: bool, streamed: bool = False):
+    """
+    Chunks of one member of an indent=2 JSON object, laid out as json.dump
+    (or pathcodec.write_json when streamed) lays it out; the caller writes
+    the closing brace after the last one.
+    """
+    yield ("{" if first else ",") + "\n  " + json.dumps(key) + ": "
+    if streamed:
+        import pathcodec
+        yield from pathcodec.iter_json(value, 2, 1)
+    else:
+        yield json.dumps(value, indent=2).replace("\n", "\n  ")
+
+@dataclass
+class OutputOptions:
+    """
+    What run_suite records and how it writes it; the defaults give the
+    classic results.json.
+
+    sa_history / sa_history_size: SA history kept in results.json
+    (see sahistory.SAHistory; summaries always cover every iteration).
+    dp_table_max > 0 exports the knapsack DP table, downsampled to that
+    many rows / columns.
+
+    grid_format="bin" writes the obstacles as a bit-packed grid.bin (see
+    gridfile.py) and problem.json / results.json only reference it.
+
+    path_encoding ("dir2", "rle" or "auto", see pathcodec.encode_path) stores
+    the BFS / A* / IDS / SA paths in results.json as start cell plus moves,
+    and writes both JSON files with pathcodec's streaming writer, which keeps
+    flat arrays such as the SA history on one line. The returned results
+    keep plain paths.
+
+    tiles=True exports a tile pyramid of the grid (obstacle density, path
+    overlay and BFS / A* / IDS expansion heatmaps, see tiles.export_tiles)
+    into out_dir/tiles for the index.html explorer, tile_size pixels a side.
+    results.json and problem.json then point to its manifest and, unless
+    grid.bin holds the cells, carry grid_sha256 and obstacle_count in place
+    of the obstacles.
+
+    metrics=True adds a "metrics" section with per-phase wall / CPU time;
+    metrics_alloc also records each phase's tracemalloc peak (which slows the
+    run), and profile_dir (relative to out_dir, like the other outputs) gets
+    a cProfile dump per in-process grader.
+    """
+    sa_history: str = "full"
+    sa_history_size: int = 1024
+    dp_table_max: int = 0
+    grid_format: str = "json"
+    path_encoding: str = "list"
+    tiles: bool = False
+    tile_size: int = 256
+    metrics: bool = False
+    metrics_alloc: bool = False
+    profile_dir: Optional[str] = None
+
+    def __post_init__(self):
+        if self.grid_format not in ("json", "bin"):
+            raise ValueError(f"grid_format must be 'json' or 'bin', not {self.grid_format!r}")
+        if self.path_encoding != "list":
+            import pathcodec
+            if self.path_encoding not in pathcodec.ENCODINGS:
+                raise ValueError(f"path_encoding must be one of {pathcodec.ENCODINGS}, "
+                                 f"not {self.path_encoding!r}")
+
+    @classmethod
+    def split(cls, opts: Dict[str, Any]) -> Tuple["OutputOptions", Dict[str, Any]]:
+        """(OutputOptions from the keys of opts that name its fields, the other keys)."""
+        names = {f.name for f in fields(cls)}
+        return (cls(**{k: v for k, v in opts.items() if k in names}),
+                {k: v for k, v in opts.items() if k not in names})
+
 def run_suite(student_id: str, seed: str | None = None,
-              rows: int = 6, cols: int = 6, density: float = 0.22,
-              layout: str = "random") -> None:
+              rows: int = 6, cols: int = 6, density: float = 0.22, layout: str = "random",
+              dp_items: int = 0, dp_capacity: int = 0, out_dir: str = ".",
+              output: Optional[OutputOptions] = None, only=None, jobs: int = 1,
+              isolate: bool = False, timeout: float = 30.0, max_expansions: Optional[int] = None,
+              max_rss_mb: Optional[int] = None, grid_file: Optional[str] = None,
+              modules: Optional[Dict[str, Any]] = None, grid_cache: Optional[Dict[tuple, Any]] = None,
+              write: bool = True) -> Dict[str, Any]:
+    """
+    Grade every component, write problem.json / results.json into out_dir and
+    return the results. `output` (OutputOptions) selects what is recorded and
+    in which format. With isolate=True each grader runs in a reused worker
+    process (isolation.WorkerPool) under the timeout / RSS limits, and a
+    component that hangs or crashes scores 0 instead of stopping the run.
+    max_expansions caps every Trace either way (None: EXPANSIONS_PER_CELL
+    per grid cell, 0: no cap).
+
+    only (e.g. "astar,heuristics") grades just those components and imports
+    just their modules; the rest, and the hidden checks that run student
+    code, are taken from the results.json already in out_dir when it was
+    graded on the same problem. "graded" then lists what this run re-graded.
+
+    jobs > 1 runs the graders and the student-code hidden checks concurrently
+    on that many worker processes (without isolate's limits unless isolate is
+    set too); the results are the same as a sequential run.
+
+    grid_file grades the grid stored in a gridfile.py grid file instead of
+    generating one: rows / cols come from its header and the obstacles stay
+    memory-mapped. The seeded RNG then only drives SA and LP/DP, so those
+    can differ from a run that generated the same grid.
+
+    For long-lived callers (grade_daemon): `modules` maps module names to
+    already-loaded modules used instead of importing, `grid_cache` memoizes
+    generated grids (and the RNG state after them) by problem, hits moved to
+    the end so the caller can evict from the front, and write=False skips the JSON files.
+    """
+    output = output or OutputOptions()
+    metrics = _Metrics(output.metrics, output.metrics_alloc, output.profile_dir, out_dir)
+    path_encoding = output.path_encoding
+    if path_encoding != "list":
+        import pathcodec
     seed = _normalize_seed(student_id, seed)
     rng = set_seed_from_any(seed)
-    obstacles = build_grid(rows, cols, density, rng, layout)
+    with metrics.phase("build_grid"):
+        grid_key = (seed, rows, cols, density, layout)
+        if grid_file is not None:
+            import gridfile
+            grid = gridfile.GridFile(grid_file)
+            if grid.start != START or grid.goal != (grid.rows-1, grid.cols-1):
+                raise ValueError(f"{grid_file}: start/goal must be {START} and the bottom-right cell")
+            rows, cols, obstacles = grid.rows, grid.cols, grid.obstacles
+            layout = "file"
+        elif grid_cache is not None and grid_key in grid_cache:
+            # re-insert so the cache's order is least recently used first
+            obstacles, state = grid_cache[grid_key] = grid_cache.pop(grid_key)
+            rng.setstate(state)
+        else:
+            obstacles = GridObstacles(build_grid(rows, cols, density, rng, layout), grid_key)
+            if grid_cache is not None:
+                grid_cache[grid_key] = (obstacles, rng.getstate())
 
     # Save the generated problem for HTML viz
     problem = {
         "rows": rows, "cols": cols,
         "start": list(START), "goal": [rows-1, cols-1],
-        "obstacles": sorted(list(obstacles)),
+        "obstacles": None,
         "layout": layout,
         "seed": str(seed)
     }
-    with open("problem.json","w",encoding="utf-8") as f:
-        json.dump(problem, f, indent=2)
-
-    # Import student modules
-    BFS   = importlib.import_module("student_bfs")
-    IDS   = importlib.import_module("student_ids")
-    ASTAR = importlib.import_module("student_astar")
-    SA    = importlib.import_module("student_sa")
-    LPDP  = importlib.import_module("student_lp_dp")
-    HEUR  = importlib.import_module("heuristics")
-
-    bfs_out   = grade_bfs(BFS, rows, cols, obstacles)
-    heur_out  = grade_heuristics(HEUR, rows, cols, obstacles)
-    astar_out = grade_astar(ASTAR, HEUR, rows, cols, obstacles)
-    ids_out   = grade_ids(IDS, rows, cols, obstacles)
-    sa_out    = grade_sa(SA, rows, cols, obstacles, seed)
-    lp_out, dp_out = grade_lp_dp(LPDP, rng)
-
-    hidden_checks = build_hidden_checks(seed, rows, cols, obstacles,
-                                        {"bfs":bfs_out, "astar":astar_out, "ids":ids_out},
-                                        HEUR, sa_out, lp_out, dp_out)
+    grid_ref: Dict[str, Any] = {}
+    tiles = output.tiles and write
+    if write:
+        os.makedirs(out_dir, exist_ok=True)
+        with metrics.phase("write_problem"):
+            if output.grid_format == "bin":
+                import gridfile
+                path = os.path.join(out_dir, "grid.bin")
+                if grid_file is not None and os.path.exists(path) and os.path.samefile(path, grid_file):
+                    sha = grid.sha256()  # grading the file in place: never truncate a mapped file
+                else:
+                    sha = gridfile.write_grid(path, rows, cols, obstacles, START, (rows-1, cols-1))
+                grid_ref = {"grid_file": "grid.bin", "grid_format": gridfile.FORMAT_NAME,
+                            "grid_sha256": sha, "obstacle_count": len(obstacles)}
+                del problem["obstacles"]
+                problem.update(grid_ref)
+            elif tiles:
+                # the tile pyramid carries the cells; keep the digest so --only can still match runs
+                import gridfile
+                sha = (grid.sha256() if grid_file is not None else
+                       hashlib.sha256(gridfile.pack_obstacles(rows, cols, obstacles)).hexdigest())
+                grid_ref = {"grid_sha256": sha, "obstacle_count": len(obstacles)}
+                del problem["obstacles"]
+                problem.update(grid_ref)
+            else:
+                problem["obstacles"] = sorted(list(obstacles))
+            if tiles:
+                problem["tiles"] = "tiles/manifest.json"
+            if path_encoding != "list":
+                pathcodec.write_json(os.path.join(out_dir, "problem.json"), problem)
+            else:
+                with open(os.path.join(out_dir, "problem.json"),"w",encoding="utf-8") as f:
+                    json.dump(problem, f, indent=2)
+
+    want = _select_components(only)
+    partial = want != set(COMPONENTS)
+    prev = (_previous_results(out_dir, seed, rows, cols, obstacles, grid_ref.get("grid_sha256"))
+            if partial and write else {})
+    grader_args = {
+        "bfs": (rows, cols, obstacles, tiles), "heuristics": (rows, cols, obstacles),
+        "astar": (rows, cols, obstacles, tiles), "ids": (rows, cols, obstacles, tiles),
+        "sa": (rows, cols, obstacles, seed, output.sa_history, output.sa_history_size),
+        "lp_dp": (rng, output.dp_table_max, dp_items, dp_capacity),
+    }
+    calls = [(key, grader, mods, grader_args[key]) for key, (grader, mods) in _GRADERS.items()
+             if key in want or (key == "lp_dp" and "lp" in want)]
+    check_calls = [(name, fn, mods, (rows, cols, obstacles) + ((seed,) if comp == "sa" else ()))
+                   for name, (comp, fn, mods) in _STUDENT_CHECKS.items() if comp in want]
+    # student checks of components not re-graded keep their previous outcome
+    student_checks: Dict[str, Tuple[bool, str]] = {}
+    for c in prev.get("hidden_checks") or []:
+        if c.get("name") in _STUDENT_CHECKS:
+            student_checks[c["name"]] = (c.get("ok", False), c.get("detail", ""))
+    for name in _STUDENT_CHECKS:
+        student_checks.setdefault(name, (False, "not graded"))
+
+    Trace.default_cap = max_expansions
+    if isolate or jobs > 1:
+        from isolation import WorkerPool
+        if not isolate:
+            # forked workers inherit already-imported modules; isolate keeps student code out of this process
+            with metrics.phase("import"):
+                for _, _, names, _ in calls + check_calls:
+                    for m in names:
+                        importlib.import_module(m)
+        # limits only apply with isolate; jobs > 1 alone is plain parallelism
+        with WorkerPool(workers=jobs, timeout=timeout if isolate else None, max_expansions=max_expansions,
+                        max_rss_mb=max_rss_mb if isolate else None) as pool:
+            # graders run in the workers, so only their combined wall time is measured here
+            with metrics.phase("graders_pool"):
+                got, pooled_checks = _grade_pooled(pool, calls, check_calls)
+        student_checks.update(pooled_checks)
+    else:
+        # Import only the student modules the selected graders need
+        with metrics.phase("import"):
+            mods = {m: (modules or {}).get(m) or importlib.import_module(m)
+                    for _, _, names, _ in calls + check_calls for m in names}
+        got = {}
+        for key, grader, names, args in calls:
+            with metrics.phase(key, profile=True):
+                got[key] = globals()[grader](*(mods[m] for m in names), *args)
+        with metrics.phase("student_checks", profile=True):
+            for name, fn, names, args in check_calls:
+                try:
+                    student_checks[name] = globals()[fn](*(mods[m] for m in names), *args)
+                except Exception as e:
+                    student_checks[name] = (False, f"error: {e}")
+
+    expanded = {k: got[k].pop("expanded_cells", None) for k in ("bfs", "astar", "ids") if isinstance(got.get(k), dict)}
+    if "lp_dp" in got:
+        got["lp"], got["dp"] = (got["lp_dp"] if isinstance(got["lp_dp"], tuple)
+                                else (got["lp_dp"], dict(got["lp_dp"])))
+    parts = {k: got[k] if k in got else prev.get(k) for k in COMPONENTS}
+    with metrics.phase("hidden_checks", profile=True):
+        hidden_checks = build_hidden_checks(seed, rows, cols, obstacles,
+                                            {"bfs":parts["bfs"], "astar":parts["astar"], "ids":parts["ids"]},
+                                            None, parts["sa"] or {}, parts["lp"] or {}, parts["dp"] or {},
+                                            student_checks)
 
     out = {
-        "rows": rows, "cols": cols, "obstacles": sorted(list(obstacles)),
+        "rows": rows, "cols": cols, **(grid_ref or {"obstacles": sorted(list(obstacles))}),
         "seed": str(seed), "student_id": student_id,
         "start": list(START), "goal": [rows-1, cols-1],
-        "bfs": bfs_out,
-        "heuristics": heur_out,     # 20%
-        "astar": astar_out,         # 15%
-        "ids": ids_out,             # 15%
-        "sa": sa_out,               # 15%
-        "lp": lp_out,               # 12.5%
-        "dp": dp_out,               # 12.5%
+        "bfs": parts["bfs"],
+        "heuristics": parts["heuristics"],  # 20%
+        "astar": parts["astar"],            # 15%
+        "ids": parts["ids"],                # 15%
+        "sa": parts["sa"],                  # 15%
+        "lp": parts["lp"],                  # 12.5%
+        "dp": parts["dp"],                  # 12.5%
         "hidden_checks": hidden_checks
     }
-    with open("results.json","w",encoding="utf-8") as f:
-        json.dump(out, f, indent=2)
-    print("Wrote results.json and problem.json")
+    if partial:
+        out = {k: v for k, v in out.items() if v is not None}
+        out["graded"] = [k for k in COMPONENTS if k in want]
+    if tiles:
+        import tiles as tile_export
+        with metrics.phase("export_tiles"):
+            tile_export.export_tiles(os.path.join(out_dir, "tiles"), rows, cols, obstacles,
+                                     {k: (parts[k] or {}).get("path") for k in tile_export.PATH_LAYERS},
+                                     expanded, output.tile_size, START, (rows-1, cols-1))
+        out["tiles"] = "tiles/manifest.json"
+    if write:
+        # results go to a temp file member by member; the timed part is every
+        # member but metrics, which is written last, once its own timing is known
+        results_path = os.path.join(out_dir, "results.json")
+        streamed = path_encoding != "list"
+        tmp_path = results_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            with metrics.phase("serialize_results"):
+                for i, (k, v) in enumerate(out.items()):
+                    if streamed and k in ("bfs", "astar", "ids", "sa") and isinstance(v, dict) and "path" in v:
+                        v = {**v, "path": pathcodec.encode_path(v["path"], path_encoding)}
+                    f.writelines(_json_member(k, v, i == 0, streamed))
+                f.flush()
+            if metrics.enabled:
+                out["metrics"] = metrics.as_dict()
+                f.writelines(_json_member("metrics", out["metrics"], False, streamed))
+            f.write("\n}")
+        os.replace(tmp_path, results_path)
+    elif metrics.enabled:
+        out["metrics"] = metrics.as_dict()
+    if write:
+        print("Wrote results.json and problem.json" if out_dir == "." else
+              f"Wrote results.json and problem.json to {out_dir}")
+    return out
+
+# --------------------------
+# Performance regression gate
+# --------------------------
+GATE_ALGOS = ("bfs", "astar", "ids", "sa")
+# written into every baseline file; _load_baseline accepts nothing else
+BASELINE_FORMAT = "runner-baseline"
+BASELINE_VERSION = 1
+
+def _problem_spec(student_id, seed, rows, cols, density, layout) -> Dict[str, Any]:
+    return {"seed": _normalize_seed(student_id, seed), "rows": rows, "cols": cols,
+            "density": density, "layout": layout}
+
+def _median(xs: List[float]) -> float:
+    xs = sorted(xs)
+    mid = len(xs) // 2
+    return xs[mid] if len(xs) % 2 else (xs[mid - 1] + xs[mid]) / 2
+
+def measure_problem(spec: Dict[str, Any], repeat: int = 5, algos=GATE_ALGOS) -> Dict[str, Dict[str, Any]]:
+    """
+    Grade each algorithm `repeat` times on the problem described by `spec`.
+    Expansions / path length / SA cost come from the runs (they are
+    deterministic); wall time is summarized as median and min over the runs.
+    """
+    obstacles = GridObstacles(build_grid(spec["rows"], spec["cols"], spec["density"], set_seed_from_any(spec["seed"]),
+                                         spec["layout"]),
+                              (spec["seed"], spec["rows"], spec["cols"], spec["density"], spec["layout"]))
+    heur = importlib.import_module("heuristics")
+    calls = {
+        "bfs": lambda m: grade_bfs(m, spec["rows"], spec["cols"], obstacles),
+        "astar": lambda m: grade_astar(m, heur, spec["rows"], spec["cols"], obstacles),
+        "ids": lambda m: grade_ids(m, spec["rows"], spec["cols"], obstacles),
+        "sa": lambda m: grade_sa(m, spec["rows"], spec["cols"], obstacles, spec["seed"], "minmax", 256),
+    }
+    modules = {"bfs": "student_bfs", "astar": "student_astar", "ids": "student_ids", "sa": "student_sa"}
+    out: Dict[str, Dict[str, Any]] = {}
+    for algo in algos:
+        mod = importlib.import_module(modules[algo])
+        times = []
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            res = calls[algo](mod)
+            times.append(time.perf_counter() - t0)
+        rec: Dict[str, Any] = {"ok": bool(res.get("ok")), "path_len": res.get("path_len"),
+                               "wall_s": round(_median(times), 6), "wall_s_min": round(min(times), 6)}
+        if algo == "sa":
+            rec["final_cost"] = res.get("final_cost")
+        else:
+            rec["expansions"] = res.get("expansions")
+        out[algo] = rec
+    return out
+
+def _load_baseline(path: str) -> List[Dict[str, Any]]:
+    """
+    Baseline problems as [{"problem": spec, "metrics": {algo: {...}}}].
+    Only files written by write_baseline are accepted; anything else (such
+    as results/search_metrics.json, which does not say which problem it
+    measured) raises ValueError.
+    """
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if not (isinstance(data, dict) and data.get("format") == BASELINE_FORMAT):
+        raise ValueError(f"{path} is not a baseline file written by --write_baseline; "
+                         f"regenerate it with --write_baseline {path}")
+    if data.get("version") != BASELINE_VERSION:
+        raise ValueError(f"{path} is baseline version {data.get('version')!r}, this runner reads "
+                         f"version {BASELINE_VERSION}; regenerate it with --write_baseline {path}")
+    return data["problems"]
+
+def write_baseline(path: str, spec: Dict[str, Any], repeat: int = 5) -> None:
+    """Measure `spec` and store it in the baseline file, replacing an entry for the same problem."""
+    problems: List[Dict[str, Any]] = []
+    if os.path.exists(path):
+        try:
+            problems = _load_baseline(path)
+        except ValueError:
+            with open(path, encoding="utf-8") as f:
+                old = json.load(f)
+            if not (isinstance(old, dict) and "problems" in old):
+                raise ValueError(f"{path} exists and is not a baseline file; "
+                                 f"choose another file for --write_baseline") from None
+            print(f"Replacing {path}, written by an older runner")
+    problems = [p for p in problems if p.get("problem") != spec]
+    problems.append({"problem": spec, "metrics": measure_problem(spec, repeat)})
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"format": BASELINE_FORMAT, "version": BASELINE_VERSION, "repeat": repeat,
+                   "problems": problems}, f, indent=2)
+    print(f"Wrote baseline for {spec} to {path}")
+
+def _gate_findings(algo: str, base: Dict[str, Any], cur: Dict[str, Any], tol: Dict[str, float]) -> List[Dict[str, Any]]:
+    found = []
+    def check(metric, limit):
+        if base.get(metric) is None or cur.get(metric) is None:
+            return
+        found.append({"algo": algo, "metric": metric, "baseline": base[metric], "current": cur[metric],
+                      "limit": round(limit, 6), "ok": cur[metric] <= limit})
+    if "expansions" in base:
+        check("expansions", base["expansions"] * (1 + tol["expansions"]))
+    if "path_len" in base:
+        check("path_len", base["path_len"])
+    if "final_cost" in base:
+        check("final_cost", base["final_cost"] * (1 + tol["sa_cost"]) + 1e-9)
+    if "wall_s" in base:
+        check("wall_s", base["wall_s"] * (1 + tol["time"]) + tol["time_floor_s"])
+    return found
+
+def regression_gate(path: str, repeat: int = 5, tol_expansions: float = 0.10,
+                    tol_time: float = 0.25, tol_sa_cost: float = 0.02, time_floor_ms: float = 2.0,
+                    retries: int = 2, report: Optional[str] = None) -> int:
+    """
+    Re-run every baseline problem and compare. Expansions, path length and SA
+    final cost are deterministic and compared once. Wall time is a median of
+    `repeat` runs plus a fixed floor (sub-millisecond timings are mostly
+    noise); a suspected time regression is re-measured up to `retries` times
+    and only the best median counts. Returns 0 when everything is within
+    tolerance, 1 otherwise.
+    """
+    tol = {"expansions": tol_expansions, "time": tol_time, "sa_cost": tol_sa_cost,
+           "time_floor_s": time_floor_ms / 1000}
+    findings: List[Dict[str, Any]] = []
+    for entry in _load_baseline(path):
+        spec, base = entry["problem"], entry["metrics"]
+        algos = [a for a in GATE_ALGOS if a in base]
+        cur = measure_problem(spec, repeat, algos)
+        for algo in algos:
+            found = _gate_findings(algo, base[algo], cur[algo], tol)
+            for _ in range(retries):
+                if all(f["ok"] for f in found if f["metric"] == "wall_s"):
+                    break
+                again = measure_problem(spec, repeat, [algo])[algo]
+                cur[algo]["wall_s"] = min(cur[algo]["wall_s"], again["wall_s"])
+                found = _gate_findings(algo, base[algo], cur[algo], tol)
+            for f in found:
+                f["problem"] = spec
+            findings.extend(found)
+    failed = [f for f in findings if not f["ok"]]
+    for f in findings:
+        mark = "ok  " if f["ok"] else "FAIL"
+        print(f"{mark} {f['algo']:>5} {f['metric']:<11} baseline={f['baseline']} current={f['current']} "
+              f"limit={f['limit']}  seed={f['problem']['seed']} {f['problem']['rows']}x{f['problem']['cols']}")
+    print(f"{len(findings) - len(failed)}/{len(findings)} checks within tolerance")
+    if report:
+        with open(report, "w", encoding="utf-8") as f:
+            json.dump({"baseline": path, "tolerances": tol, "passed": not failed, "findings": findings}, f, indent=2)
+    return 1 if failed else 0
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
@@ -536,6 +1302,71 @@ if __name__ == "__main__":
     ap.add_argument("--rows", type=int, default=6)
     ap.add_argument("--cols", type=int, default=6)
     ap.add_argument("--density", type=float, default=0.22)
-    ap.add_argument("--layout", choices=["random","checkerboard","none"], default="random", help="Obstacle layout mode")
+    ap.add_argument("--layout", choices=["random","checkerboard","none", *STRUCTURED_LAYOUTS], default="random",
+                    help="Obstacle layout mode (--density applies to random only)")
+    ap.add_argument("--sa_history", choices=["full","ring","changes","minmax"], default="full",
+                    help="SA history downsampling (summaries always cover every iteration)")
+    ap.add_argument("--sa_history_size", type=int, default=1024, help="Ring length / min-max window for --sa_history")
+    ap.add_argument("--dp_table", type=int, default=0, metavar="MAX_SIDE",
+                    help="Export the knapsack DP table for the viewer, downsampled to MAX_SIDE rows/cols (0 = off)")
+    ap.add_argument("--dp_items", type=int, default=0,
+                    help="Grade DP on a random knapsack with this many items instead of the fixed one (0 = fixed)")
+    ap.add_argument("--dp_capacity", type=int, default=0,
+                    help=f"Capacity for --dp_items instances (0 = {DP_DEFAULT_CAPACITY})")
+    ap.add_argument("--out_dir", default=".", help="Directory for problem.json / results.json")
+    ap.add_argument("--grid_format", choices=["json","bin"], default="json",
+                    help="bin: store obstacles in a bit-packed grid.bin referenced from the JSON files")
+    ap.add_argument("--path_encoding", choices=["list","dir2","rle","auto"], default="list",
+                    help="Store result paths as start + 2-bit moves (dir2), runs (rle) or the shorter (auto)")
+    ap.add_argument("--tiles", action="store_true",
+                    help="Export a multi-resolution tile pyramid to OUT_DIR/tiles for the index.html explorer")
+    ap.add_argument("--tile_size", type=int, default=256, help="Tile side in pixels for --tiles")
+    ap.add_argument("--grid_file", default=None, metavar="FILE",
+                    help="Grade the grid in this grid.bin (memory-mapped) instead of generating one")
+    ap.add_argument("--isolate", action="store_true",
+                    help="Run each grader in a supervised worker process (see --timeout / --max_rss_mb)")
+    ap.add_argument("--timeout", type=float, default=30.0, help="Per-grader wall-clock limit with --isolate (seconds)")
+    ap.add_argument("--max_rss_mb", type=int, default=None, help="Per-worker memory limit with --isolate (MB)")
+    ap.add_argument("--max_expansions", type=int, default=None,
+                    help=f"Cap on Trace expansions per search (default {EXPANSIONS_PER_CELL} x rows x cols; 0 = none)")
+    ap.add_argument("--metrics", action="store_true", help="Add per-phase wall/CPU times to results.json")
+    ap.add_argument("--metrics_alloc", action="store_true",
+                    help="Also record per-phase tracemalloc peaks (implies --metrics; slows the run)")
+    ap.add_argument("--profile_dir", default=None,
+                    help="Dump a cProfile .prof per grader into this directory (relative to --out_dir)")
+    ap.add_argument("--write_baseline", default=None, metavar="FILE",
+                    help="Measure BFS/A*/IDS/SA on this problem and store it in a baseline file (no grading)")
+    ap.add_argument("--baseline", default=None, metavar="FILE",
+                    help="Regression gate: re-run the baseline problems and exit 1 on regressions (no grading)")
+    ap.add_argument("--repeat", type=int, default=5, help="Timed runs per algorithm for --baseline / --write_baseline")
+    ap.add_argument("--tol_expansions", type=float, default=0.10, help="Allowed relative growth in expansions")
+    ap.add_argument("--tol_time", type=float, default=0.25, help="Allowed relative growth in median wall time")
+    ap.add_argument("--time_floor_ms", type=float, default=2.0, help="Absolute slack added to the wall-time limit")
+    ap.add_argument("--tol_sa_cost", type=float, default=0.02, help="Allowed relative growth in SA final cost")
+    ap.add_argument("--gate_report", default=None, metavar="FILE", help="Write the --baseline findings as JSON")
+    ap.add_argument("--jobs", type=int, default=1,
+                    help="Run graders concurrently on this many worker processes (output identical to sequential)")
+    ap.add_argument("--only", default=None, metavar="COMPONENTS",
+                    help="Grade only these components (comma-separated from " + ",".join(COMPONENTS)
+                         + ") and merge them into the existing results.json")
     args = ap.parse_args()
-    run_suite(args.student_id, seed=args.seed, rows=args.rows, cols=args.cols, density=args.density, layout=args.layout)
+    if args.write_baseline or args.baseline:
+        Trace.default_cap = args.max_expansions
+        spec = _problem_spec(args.student_id, args.seed, args.rows, args.cols, args.density, args.layout)
+        try:
+            if args.write_baseline:
+                write_baseline(args.write_baseline, spec, args.repeat)
+            if args.baseline:
+                sys.exit(regression_gate(args.baseline, args.repeat, args.tol_expansions, args.tol_time,
+                                         args.tol_sa_cost, args.time_floor_ms, report=args.gate_report))
+        except ValueError as e:
+            ap.exit(2, f"{ap.prog}: error: {e}\n")
+        sys.exit(0)
+    output = OutputOptions(sa_history=args.sa_history, sa_history_size=args.sa_history_size,
+                           dp_table_max=args.dp_table, grid_format=args.grid_format,
+                           path_encoding=args.path_encoding, tiles=args.tiles, tile_size=args.tile_size,
+                           metrics=args.metrics, metrics_alloc=args.metrics_alloc, profile_dir=args.profile_dir)
+    run_suite(args.student_id, seed=args.seed, rows=args.rows, cols=args.cols, density=args.density,
+              layout=args.layout, dp_items=args.dp_items, dp_capacity=args.dp_capacity, out_dir=args.out_dir,
+              output=output, only=args.only, jobs=args.jobs, isolate=args.isolate, timeout=args.timeout,
+              max_expansions=args.max_expansions, max_rss_mb=args.max_rss_mb, grid_file=args.grid_file)
@@ -0,0 +1,90 @@
+# sahistory.py — bounded SA cost history, owned by the grader (runner.grade_sa passes one in)
+from __future__ import annotations
+import math
+from array import array
+from typing import List, Optional
+
+
+class SAHistory:
+    """
+    Bounded-memory cost history backed by typed arrays.
+
+    mode selects what is kept of the stream:
+      - 'full':    every value
+      - 'ring':    the last `size` values
+      - 'changes': only values that differ (beyond eps) from the last kept one,
+                   with their iteration index
+      - 'minmax':  min and max of each window of `size` iterations
+    Count, min, max and plateau changes are tracked over the whole stream as
+    values arrive, so summary() is exact whatever the mode.
+    """
+    MODES = ("full", "ring", "changes", "minmax")
+
+    def __init__(self, mode: str = "full", size: int = 1024, eps: float = 1e-9):
+        if mode not in self.MODES:
+            raise ValueError(f"unknown history mode: {mode!r}")
+        self.mode = mode
+        self.size = max(1, int(size))
+        self.eps = eps
+        self.count = 0
+        self.lo = math.inf
+        self.hi = -math.inf
+        self.changes = 0
+        self._last: Optional[float] = None
+        self._vals = array('d')
+        self._idx = array('q')
+
+    def append(self, v: float) -> None:
+        i = self.count
+        self.count += 1
+        if v < self.lo: self.lo = v
+        if v > self.hi: self.hi = v
+        changed = self._last is None or abs(v - self._last) > self.eps
+        if changed:
+            self.changes += 1
+            self._last = v
+        if self.mode == "full":
+            self._vals.append(v)
+        elif self.mode == "ring":
+            if len(self._vals) < self.size:
+                self._vals.append(v)
+            else:
+                self._vals[i % self.size] = v
+        elif self.mode == "changes":
+            if changed:
+                self._vals.append(v)
+                self._idx.append(i)
+        else:  # minmax: one (min, max) slot pair per window
+            if i % self.size == 0:
+                self._vals.extend((v, v))
+                self._idx.append(i)
+            elif v < self._vals[-2]:
+                self._vals[-2] = v
+            elif v > self._vals[-1]:
+                self._vals[-1] = v
+
+    def values(self) -> List[float]:
+        """Kept values in stream order (min, max pairs per window in 'minmax' mode)."""
+        if self.mode == "ring" and self.count > self.size:
+            k = self.count % self.size
+            return (self._vals[k:] + self._vals[:k]).tolist()
+        return self._vals.tolist()
+
+    def indices(self) -> List[int]:
+        """Iteration index of each entry of values()."""
+        if self.mode == "full":
+            return list(range(self.count))
+        if self.mode == "ring":
+            return list(range(self.count - len(self._vals), self.count))
+        if self.mode == "changes":
+            return self._idx.tolist()
+        return [i for i in self._idx for _ in (0, 1)]
+
+    def summary(self) -> dict:
+        return {
+            "mode": self.mode,
+            "count": self.count,
+            "min": self.lo if self.count else None,
+            "max": self.hi if self.count else None,
+            "changes": self.changes,
+        }
@@ -1,8 +1,15 @@
 # student_lp_dp.py
 from __future__ import annotations
 from typing import List, Tuple, Optional
-from functools import lru_cache
-import math
+import math, collections, bisect, random
+from array import array
+
+from common import DP_CELL_LIMIT
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; batch queries fall back to bisect
+    np = None
 
 """
 ===========================================================
@@ -100,27 +107,12 @@ def _satisfies(pt: Tuple[float, float], constraints: List[Constraint]) -> bool:
     return True
 
 
-def feasible_vertices(constraints: List[Constraint]) -> List[Tuple[float, float]]:
+def _enumerate_vertices(cons: List[Constraint]) -> List[Tuple[float, float]]:
+    """
+    Reference O(m^3) vertex enumeration: intersect every pair of boundary
+    lines, keep candidates satisfying all constraints, dedup by rounding.
+    `cons` must already include the non-negativity constraints.
     """
-    (6%) Enumerate and return all *feasible* vertices (x,y) of the polygonal feasible region.
-
-    Detailed steps:
-      1) Copy input constraints and append non-negativity:
-         - Represent x>=0 and y>=0 as <=-type constraints suitable for your intersection logic.
-           (Hint: you'll add two extra constraints to the list.)
-      2) For every unordered pair of constraints, compute the intersection of their *boundary lines*.
-         - Skip pairs that do not produce a unique intersection.
-      3) Collect all intersection points plus the origin (as a simple additional candidate).
-      4) Run the feasibility test on each candidate using _is_feasible.
-      5) De-duplicate points robustly (e.g., rounding to fixed decimals or using a tolerance-based key).
-      6) Return the list of unique feasible vertices.
-    """
-    # TODO: Build candidates by intersecting pairs + non-negativity, then filter and dedup
-    # Copy constraints and add non-negativity (x >= 0, y >= 0)
-    cons = list(constraints)
-    # represent x>=0, y>=0 as <=-type constraints for the solver
-    cons.extend([(-1.0, 0.0, 0.0), (0.0, -1.0, 0.0)])
-
     candidates: List[Tuple[float, float]] = []
     m = len(cons)
     for i in range(m):
@@ -146,6 +138,162 @@ def feasible_vertices(constraints: List[Constraint]) -> List[Tuple[float, float]
     return list(seen_map.values())
 
 
+# Half-planes are clipped to |x|, |y| <= _BOX so unbounded regions stay finite;
+# vertices on the box are "at infinity" and are not reported.
+_BOX = 1e9
+_PARALLEL = 1e-12
+
+
+def _hp_out(h: Constraint, pt: Tuple[float, float]) -> bool:
+    """True if pt violates half-plane h beyond EPS (relative to b) plus rounding slack."""
+    a1, a2, b = h
+    lhs = a1 * pt[0] + a2 * pt[1]
+    return lhs - b > EPS * max(1.0, abs(b)) + 1e-12 * (abs(a1 * pt[0]) + abs(a2 * pt[1]))
+
+
+def _half_plane_polygon(cons: List[Constraint]) -> Optional[Tuple[List[int], List[float], List[Tuple[float, float]]]]:
+    """
+    Sort-and-sweep half-plane intersection (O(m log m)).
+
+    Returns (ring, phi, verts): the indices into `cons` of the boundary lines
+    of the feasible polygon in counter-clockwise order (indices >= len(cons)
+    are bounding box sides), their outward normal angles (ascending) and the
+    polygon corners, verts[k] joining edges k-1 and k. Returns None when the
+    intersection is empty (or too thin to resolve).
+    """
+    m = len(cons)
+    box = [(1.0, 0.0, _BOX), (0.0, 1.0, _BOX), (-1.0, 0.0, _BOX), (0.0, -1.0, _BOX)]
+    hps: List[Tuple[float, int, Constraint]] = []
+    for idx, (a1, a2, b) in enumerate(list(cons) + box):
+        norm = math.hypot(a1, a2)
+        if norm < _PARALLEL:
+            if b < -EPS:
+                return None  # 0 <= b violated everywhere
+            continue
+        h = (a1 / norm, a2 / norm, b / norm)
+        # boundary direction with the feasible side on its left is (-a2, a1)
+        hps.append((math.atan2(h[0], -h[1]), idx, h))
+    hps.sort(key=lambda t: (t[0], t[1]))
+
+    dq: collections.deque = collections.deque()
+
+    def meet(p: Tuple[int, Constraint], q: Tuple[int, Constraint]) -> Tuple[float, float]:
+        pt = _solve2(p[1], q[1])
+        return pt if pt is not None else (math.inf, math.inf)
+
+    for _, idx, h in hps:
+        cur = (idx, h)
+        while len(dq) > 1 and _hp_out(h, meet(dq[-1], dq[-2])):
+            dq.pop()
+        while len(dq) > 1 and _hp_out(h, meet(dq[0], dq[1])):
+            dq.popleft()
+        if dq:
+            bh = dq[-1][1]
+            if abs(h[0] * bh[1] - h[1] * bh[0]) < _PARALLEL:
+                if h[0] * bh[0] + h[1] * bh[1] < 0.0:
+                    return None  # opposite parallel half-planes met: empty
+                # same direction: keep the tighter of the two
+                if _hp_out(h, (bh[0] * bh[2], bh[1] * bh[2])):
+                    dq.pop()
+                else:
+                    continue
+        dq.append(cur)
+
+    while len(dq) > 2 and _hp_out(dq[0][1], meet(dq[-1], dq[-2])):
+        dq.pop()
+    while len(dq) > 2 and _hp_out(dq[-1][1], meet(dq[0], dq[1])):
+        dq.popleft()
+    if len(dq) < 3:
+        return None
+    ring = list(dq)
+    # rotate so outward normal angles increase from the first edge; vertex k
+    # joins edges k-1 and k and is extreme for normals in [phi[k-1], phi[k]]
+    phi = [math.atan2(h[1], h[0]) for _, h in ring]
+    first = min(range(len(ring)), key=phi.__getitem__)
+    ring, phi = ring[first:] + ring[:first], phi[first:] + phi[:first]
+    verts = [meet(ring[k - 1], ring[k]) for k in range(len(ring))]
+    # an empty intersection can still leave a (bogus) ring behind; reject it
+    # if any half-plane cuts off the ring's extreme vertex for its normal
+    for _, _, h in hps:
+        if _hp_out(h, verts[_extreme_index(phi, h[0], h[1])]):
+            return None
+    return [idx for idx, _ in ring], phi, verts
+
+
+def _extreme_index(phi: List[float], c1: float, c2: float) -> int:
+    """Index of the polygon vertex maximizing c1*x + c2*y, by bisecting edge normal angles."""
+    k = bisect.bisect_left(phi, math.atan2(c2, c1))
+    return 0 if k == len(phi) else k
+
+
+def _relaxed(cons: List[Constraint], slack: float = 1e-7) -> List[Constraint]:
+    return [(a1, a2, b + slack * (abs(a1) + abs(a2) + abs(b) + 1.0)) for a1, a2, b in cons]
+
+
+def feasible_vertices(constraints: List[Constraint]) -> List[Tuple[float, float]]:
+    """
+    (6%) Enumerate and return all *feasible* vertices (x,y) of the polygonal feasible region.
+
+    Detailed steps:
+      1) Copy input constraints and append non-negativity:
+         - Represent x>=0 and y>=0 as <=-type constraints suitable for your intersection logic.
+           (Hint: you'll add two extra constraints to the list.)
+      2) Build the feasible polygon directly with a half-plane intersection:
+         - Sort boundary lines by angle and sweep them through a deque, dropping
+           lines made redundant by later ones (O(m log m) instead of all pairs).
+         - Unbounded regions are clipped to a large box whose corners are not
+           reported; empty regions give [].
+      3) Each pair of consecutive polygon edges (both real constraints) gives
+         one vertex, solved with _solve2 exactly as pairwise enumeration would.
+      4) De-duplicate points robustly (e.g., rounding to fixed decimals or using a tolerance-based key).
+      5) Return the list of unique feasible vertices in counter-clockwise order.
+
+    Zero-area regions (a segment or a single point) fall back to
+    _enumerate_vertices, which handles them with the EPS tolerance.
+    """
+    return _polygon_vertices(constraints)[0]
+
+
+def _polygon_vertices(constraints: List[Constraint]):
+    """
+    Shared by feasible_vertices and LPPolygon: returns (vertices, poly, ring_map)
+    where poly is the _half_plane_polygon result (None when the region is
+    empty or handled by the enumeration fallback) and ring_map[k] is the
+    index in vertices of ring corner k, or None for bounding-box corners.
+    """
+    cons = list(constraints)
+    # represent x>=0, y>=0 as <=-type constraints for the solver
+    cons.extend([(-1.0, 0.0, 0.0), (0.0, -1.0, 0.0)])
+
+    poly = _half_plane_polygon(cons)
+    if poly is None:
+        if _half_plane_polygon(_relaxed(cons)) is None:
+            return [], None, []
+        return _enumerate_vertices(cons), None, []
+
+    ring = poly[0]
+    m = len(cons)
+    seen_map = {}
+    ring_map: List[Optional[int]] = []
+    for k in range(len(ring)):
+        i, j = ring[k - 1], ring[k]
+        if i >= m or j >= m:
+            ring_map.append(None)
+            continue
+        pt = _solve2(cons[i], cons[j])
+        if pt is None:
+            # parallel neighbours on the ring: let LPPolygon scan linearly
+            ring_map.append(None)
+            poly = None
+            continue
+        key = (round(pt[0], 10), round(pt[1], 10))
+        if key not in seen_map:
+            seen_map[key] = len(seen_map)
+        ring_map.append(seen_map[key])
+
+    return [(float(x), float(y)) for x, y in seen_map], poly, ring_map
+
+
 def maximize_objective(vertices: List[Tuple[float, float]], c1: float, c2: float) -> Tuple[Tuple[float, float], float]:
     """
     (6.5%) Evaluate Z = c1*x + c2*y over feasible vertices and return (best_point, best_value).
@@ -180,8 +328,434 @@ def maximize_objective(vertices: List[Tuple[float, float]], c1: float, c2: float
     return best_pt, float(best_val)
 
 
+class LPPolygon:
+    """
+    Feasible polygon of a constraint set, built once, for many objectives.
+
+    maximize(c1, c2) returns exactly what
+    maximize_objective(feasible_vertices(constraints), c1, c2) returns,
+    including its tie-breaking, but finds the optimal corner by bisecting
+    the sorted edge normals (O(log m)) instead of scanning every vertex.
+    """
+
+    def __init__(self, constraints: List[Constraint]):
+        self.vertices, poly, self._ring_map = _polygon_vertices(constraints)
+        self._phi: Optional[List[float]] = poly[1] if poly is not None else None
+        # unbounded regions: ring corners of the finite chain, in ring order
+        self._chain: Optional[Tuple[int, int]] = None
+        if self._phi is not None and None in self._ring_map:
+            n = len(self._ring_map)
+            first = next((k for k in range(n) if self._ring_map[k] is not None
+                          and self._ring_map[k - 1] is None), None)
+            if first is not None:
+                last = first
+                while self._ring_map[(last + 1) % n] is not None:
+                    last = (last + 1) % n
+                self._chain = (first, last)
+
+    def _ties(self, k: int, c1: float, c2: float) -> List[int]:
+        """Vertex indices around ring corner k whose value is within EPS of corner k's."""
+        rm, n = self._ring_map, len(self._ring_map)
+        x, y = self.vertices[rm[k]]
+        top = c1 * x + c2 * y
+        out = {rm[k]}
+        for step in (1, -1):
+            j = k
+            for _ in range(n - 1):
+                j = (j + step) % n
+                if rm[j] is None:
+                    break
+                x, y = self.vertices[rm[j]]
+                if c1 * x + c2 * y < top - EPS:
+                    break
+                out.add(rm[j])
+        return sorted(out)
+
+    def _resolve(self, k: int, c1: float, c2: float) -> Tuple[Tuple[float, float], float]:
+        if self._ring_map[k] is not None:
+            cand = self._ties(k, c1, c2)
+        elif self._chain is not None:
+            # optimum is "at infinity": over the finite chain the objective
+            # falls then rises, so the best vertex is one of its two ends
+            cand = sorted(set(self._ties(self._chain[0], c1, c2)) | set(self._ties(self._chain[1], c1, c2)))
+        else:
+            cand = list(range(len(self.vertices)))
+        return maximize_objective([self.vertices[i] for i in cand], c1, c2)
+
+    def maximize(self, c1: float, c2: float) -> Tuple[Tuple[float, float], float]:
+        if self._phi is None or not self.vertices:
+            return maximize_objective(self.vertices, c1, c2)
+        return self._resolve(_extreme_index(self._phi, c1, c2), c1, c2)
+
+    def maximize_batch(self, c1s, c2s) -> Tuple[List[Tuple[float, float]], List[float]]:
+        """maximize() for arrays of objective coefficients; returns (points, values)."""
+        c1s = [float(v) for v in c1s]
+        c2s = [float(v) for v in c2s]
+        if self._phi is None or not self.vertices:
+            res = [maximize_objective(self.vertices, a, b) for a, b in zip(c1s, c2s)]
+        else:
+            if np is not None:
+                ks = np.searchsorted(np.asarray(self._phi), np.arctan2(c2s, c1s), side="left")
+                ks = np.where(ks == len(self._phi), 0, ks).tolist()
+            else:
+                ks = [_extreme_index(self._phi, a, b) for a, b in zip(c1s, c2s)]
+            res = [self._resolve(k, a, b) for k, a, b in zip(ks, c1s, c2s)]
+        return [p for p, _ in res], [v for _, v in res]
+
+
+def _seidel(hps: List[Constraint], c1: float, c2: float, box: float, rng: random.Random):
+    """
+    Seidel's randomized incremental LP over unit-normal half-planes `hps`,
+    clipped to |x|, |y| <= box. Returns (point, (i, j)) where i, j index
+    the two lines defining the optimum (negative indices are box sides),
+    or None if infeasible. Expected O(m) for a random insertion order.
+    """
+    sides: List[Constraint] = [(1.0, 0.0, box), (0.0, 1.0, box), (-1.0, 0.0, box), (0.0, -1.0, box)]
+
+    def line(k: int) -> Constraint:
+        return hps[k] if k >= 0 else sides[-k - 1]
+
+    ix = -1 if c1 >= 0 else -3
+    iy = -2 if c2 >= 0 else -4
+    v = (box if c1 >= 0 else -box, box if c2 >= 0 else -box)
+    pair = (ix, iy)
+    order = list(range(len(hps)))
+    rng.shuffle(order)
+    for pos, i in enumerate(order):
+        h = hps[i]
+        if not _hp_out(h, v):
+            continue
+        # new optimum lies on line i: 1-D LP along p0 + t*d against earlier lines
+        a1, a2, b = h
+        p0, d = (a1 * b, a2 * b), (-a2, a1)
+        lo, hi, jlo, jhi = -math.inf, math.inf, None, None
+        for k in [-1, -2, -3, -4] + order[:pos]:
+            g = line(k)
+            sd = g[0] * d[0] + g[1] * d[1]
+            r = g[2] - (g[0] * p0[0] + g[1] * p0[1])
+            if abs(sd) < _PARALLEL:
+                if r < -EPS * max(1.0, abs(g[2])):
+                    return None
+                continue
+            t = r / sd
+            if sd > 0 and t < hi:
+                hi, jhi = t, k
+            elif sd < 0 and t > lo:
+                lo, jlo = t, k
+        if lo > hi + EPS * max(1.0, abs(lo), abs(hi)):
+            return None
+        if c1 * d[0] + c2 * d[1] >= 0:
+            t, j = hi, jhi
+        else:
+            t, j = lo, jlo
+        v, pair = (p0[0] + t * d[0], p0[1] + t * d[1]), (i, j)
+    return v, pair
+
+
+def solve_lp_seidel(constraints: List[Constraint], c1: float, c2: float, seed: int = 0):
+    """
+    Maximize Z = c1*x + c2*y (x, y >= 0) without building the vertex list.
+
+    Returns (status, best_point, best_value) with status 'optimal',
+    'infeasible' or 'unbounded' (point and value are None unless optimal).
+    When optimal, (best_point, best_value) equals
+    maximize_objective(feasible_vertices(constraints), c1, c2): the optimal
+    face is recovered around Seidel's optimum and its corners go through
+    maximize_objective for the same tie-breaking. The insertion order comes
+    from random.Random(seed), so runs are reproducible.
+    """
+    cons = list(constraints)
+    cons.extend([(-1.0, 0.0, 0.0), (0.0, -1.0, 0.0)])
+    keep: List[int] = []
+    hps: List[Constraint] = []
+    for idx, (a1, a2, b) in enumerate(cons):
+        norm = math.hypot(a1, a2)
+        if norm < _PARALLEL:
+            if b < -EPS:
+                return "infeasible", None, None
+            continue
+        keep.append(idx)
+        hps.append((a1 / norm, a2 / norm, b / norm))
+
+    if c1 == 0 and c2 == 0:
+        # every feasible point is optimal: lexicographically largest vertex
+        status, cands = _seidel_face(cons, keep, hps, 1.0, 0.0, seed)
+        if status == "unbounded":
+            return ("optimal",) + maximize_objective(feasible_vertices(constraints), c1, c2)
+    else:
+        status, cands = _seidel_face(cons, keep, hps, c1, c2, seed)
+    if status != "optimal":
+        return status, None, None
+    return ("optimal",) + maximize_objective(cands, c1, c2)
+
+
+def _seidel_face(cons: List[Constraint], keep: List[int], hps: List[Constraint],
+                 c1: float, c2: float, seed: int) -> Tuple[str, List[Tuple[float, float]]]:
+    """(status, corners of the optimal face) for solve_lp_seidel."""
+    res = _seidel(hps, c1, c2, _BOX, random.Random(seed))
+    if res is None:
+        return "infeasible", []
+    v, (i, j) = res
+    if i < 0 or j < 0:
+        # clipped by the box: unbounded iff some recession direction improves Z
+        cone = [(a1, a2, 0.0) for a1, a2, _ in hps]
+        rec = _seidel(cone, c1, c2, 1.0, random.Random(seed))
+        if rec is not None and c1 * rec[0][0] + c2 * rec[0][1] > EPS * max(1.0, abs(c1) + abs(c2)):
+            return "unbounded", []
+
+    def corner(p: int, q: int) -> Optional[Tuple[float, float]]:
+        pt = _solve2(cons[keep[p]], cons[keep[q]])
+        return None if pt is None else (round(pt[0], 10), round(pt[1], 10))
+
+    # a line with outward normal along c that is tight at v is an optimal edge: its
+    # ends (found by a 1-D scan along it) are the optimal corners
+    cn = math.hypot(c1, c2)
+    for k, h in enumerate(hps):
+        if abs(h[0] * c2 - h[1] * c1) < _PARALLEL * cn and h[0] * c1 + h[1] * c2 > 0 and not _hp_out(h, v) \
+                and not _hp_out((-h[0], -h[1], -h[2]), v):
+            a1, a2, b = h
+            p0, d = (a1 * b, a2 * b), (-a2, a1)
+            lo, hi, jlo, jhi = -math.inf, math.inf, None, None
+            for q, g in enumerate(hps):
+                sd = g[0] * d[0] + g[1] * d[1]
+                if abs(sd) < _PARALLEL:
+                    continue
+                t = (g[2] - (g[0] * p0[0] + g[1] * p0[1])) / sd
+                if sd > 0 and t < hi:
+                    hi, jhi = t, q
+                elif sd < 0 and t > lo:
+                    lo, jlo = t, q
+            ends = [corner(k, q) for q in (jlo, jhi) if q is not None]
+            return "optimal", [pt for pt in ends if pt is not None]
+    if i < 0 or j < 0:
+        return "optimal", []
+    pt = corner(i, j)
+    return "optimal", [pt] if pt is not None else []
+
+
+def _simplex_column(A, sign, n: int, j: int):
+    """Column j of [sign*A | diag(sign) | I] (structural, slack, artificial)."""
+    m = len(sign)
+    if j < n:
+        col = A[:, j].toarray().ravel() if hasattr(A, "tocsc") else A[:, j]
+        return sign * col
+    col = np.zeros(m)
+    col[(j - n) % m] = sign[j - n] if j < n + m else 1.0
+    return col
+
+
+def _lu_backend():
+    try:
+        from scipy.linalg import lu_factor, lu_solve
+        from scipy.sparse.linalg import splu
+    except ImportError:  # scipy is optional; the basis falls back to an explicit inverse
+        return None
+    return lu_factor, lu_solve, splu
+
+
+class _EtaBasis:
+    """
+    B^-1 for the revised simplex in product form: an LU factorization of the
+    basis at the last refactorization (sparse LU for scipy.sparse A, dense LU
+    otherwise, np.linalg.inv without scipy) followed by one eta column per
+    pivot since. A pivot costs O(m) to record instead of an O(m^2) update.
+    """
+
+    def __init__(self, A, sign, n: int, basis):
+        m = len(sign)
+        pos = np.flatnonzero(basis < n)
+        slack = np.flatnonzero(basis >= n)
+        srow = (basis[slack] - n) % m
+        sval = np.where(basis[slack] < n + m, sign[srow], 1.0)
+        backend = _lu_backend()
+        if hasattr(A, "tocsc") and backend is not None:
+            import scipy.sparse as sp
+            S = A[:, basis[pos]].tocoo()
+            B = sp.csc_matrix((np.concatenate([S.data * sign[S.row], sval]),
+                               (np.concatenate([S.row, srow]), np.concatenate([pos[S.col], slack]))),
+                              shape=(m, m))
+            lu = backend[2](B)
+            self._solve, self._solve_t = lu.solve, lambda v: lu.solve(v, trans="T")
+        else:
+            B = np.zeros((m, m))
+            if pos.size:
+                cols = A[:, basis[pos]]
+                B[:, pos] = sign[:, None] * (cols.toarray() if hasattr(cols, "toarray") else cols)
+            B[srow, slack] = sval
+            if backend is not None:
+                f = backend[0](B)
+                self._solve = lambda v: backend[1](f, v)
+                self._solve_t = lambda v: backend[1](f, v, trans=1)
+            else:
+                Binv = np.linalg.inv(B)
+                self._solve, self._solve_t = Binv.__matmul__, Binv.T.__matmul__
+        self._etas: List[Tuple[int, "np.ndarray"]] = []
+
+    def ftran(self, v):
+        """B^-1 v."""
+        x = np.array(self._solve(v), dtype=float)
+        for r, u in self._etas:
+            xr = x[r] / u[r]
+            x -= xr * u
+            x[r] = xr
+        return x
+
+    def btran(self, v):
+        """B^-T v; v may also be an (m, k) block of vectors."""
+        y = np.array(v, dtype=float)
+        for r, u in reversed(self._etas):
+            y[r] = y[r] - (u @ y - y[r]) / u[r]
+        return np.asarray(self._solve_t(y), dtype=float)
+
+    def pivot(self, r: int, u) -> None:
+        """Column r of the basis is replaced by the column whose ftran is u."""
+        self._etas.append((r, u))
+
+
+def solve_lp_simplex(A, b, c, pricing: str = "steepest", tol: float = 1e-9,
+                     max_iter: Optional[int] = None, refactor: int = 50):
+    """
+    Maximize c.x subject to A x <= b, x >= 0 for any number of variables.
+
+    Revised simplex on [A | I] with the basis kept as an LU factorization
+    plus eta file (_EtaBasis), refactorized every `refactor` pivots. A may be
+    a dense array/list of rows or a scipy.sparse matrix. Rows with b < 0 get
+    an artificial variable and a Phase I. pricing is 'steepest' (steepest
+    edge, weights 1 + |B^-1 a_j|^2 kept exact by Goldfarb-Reid updates, one
+    pass over A per pivot; switches to Bland after repeated degenerate
+    pivots) or 'bland' (smallest improving index; never cycles, but slow).
+
+    Returns (status, x, value) with status 'optimal', 'infeasible' or
+    'unbounded'; x (list of floats) and value are None unless optimal.
+    """
+    if np is None:
+        raise ImportError("solve_lp_simplex requires numpy")
+    if pricing not in ("bland", "steepest"):
+        raise ValueError(f"unknown pricing rule: {pricing!r}")
+    if not hasattr(A, "tocsc"):
+        A = np.atleast_2d(np.asarray(A, dtype=float))
+    else:
+        A = A.tocsc().astype(float)
+    b = np.asarray(b, dtype=float).ravel()
+    c = np.asarray(c, dtype=float).ravel()
+    m, n = A.shape
+    if b.shape[0] != m or c.shape[0] != n:
+        raise ValueError("shape mismatch between A, b and c")
+    sign = np.where(b < 0, -1.0, 1.0)
+    rhs = np.abs(b)
+    art_rows = np.flatnonzero(sign < 0)
+    n_all = n + m + m
+    # basis: slack for rows with b >= 0, artificial otherwise; B = I either way
+    basis = np.where(sign > 0, n + np.arange(m), n + m + np.arange(m))
+    is_basic = np.zeros(n_all, dtype=bool)
+    is_basic[basis] = True
+    lu = _EtaBasis(A, sign, n, basis)
+    xB = rhs.copy()
+    limit = max_iter if max_iter is not None else 50 * (n + m) + 1000
+    # steepest-edge weights, exact for the starting basis B = I
+    gamma = np.full(n_all, 2.0)
+    gamma[:n] = 1.0 + np.asarray(A.multiply(A).sum(axis=0) if hasattr(A, "tocsc")
+                                 else (A * A).sum(axis=0)).ravel()
+
+    def dots(v):
+        """v . a_j for every column j of [sign*A | diag(sign) | I] (one row per column of v)."""
+        s = sign if v.ndim == 1 else sign[:, None]
+        return np.concatenate([A.T @ (s * v), s * v, v])
+
+    def refactorize():
+        nonlocal lu, xB
+        lu = _EtaBasis(A, sign, n, basis)
+        xB = lu.ftran(rhs)
+
+    def pivot(r: int, e: int, u, d=None) -> None:
+        """Bring e into the basis at row r (u = B^-1 a_e); updates d and the weights in place."""
+        # row r of B^-1 [sign*A | diag(sign) | I], scaled by the pivot
+        if pricing == "steepest":
+            rows = dots(lu.btran(np.column_stack([np.eye(1, m, r).ravel(), u])))
+            ratio, aw = rows[:, 0] / u[r], rows[:, 1]
+        else:
+            ratio = dots(lu.btran(np.eye(1, m, r).ravel())) / u[r]
+        if d is not None:
+            d -= d[e] * ratio
+        if pricing == "steepest":
+            # Goldfarb-Reid, with w = B^-T u:
+            # g_j <- max(g_j - 2 (a_rj/a_re) a_j.w + (a_rj/a_re)^2 g_e, 1 + (a_rj/a_re)^2)
+            upd = np.maximum(gamma - 2.0 * ratio * aw + ratio * ratio * gamma[e], 1.0 + ratio * ratio)
+            gamma[~is_basic] = upd[~is_basic]
+            gamma[basis[r]] = max(gamma[e] / (u[r] * u[r]), 1.0)
+        lu.pivot(r, u)
+        is_basic[basis[r]] = False
+        is_basic[e] = True
+        basis[r] = e
+
+    def run(cost, allowed) -> str:
+        nonlocal xB
+        degenerate = 0
+        for it in range(limit):
+            if it % refactor == 0:
+                if it:
+                    refactorize()
+                d = cost - dots(lu.btran(cost[basis]))  # updated by each pivot in between
+            score = np.where(allowed & ~is_basic, d, -np.inf)
+            cand = np.flatnonzero(score > tol)
+            if cand.size == 0:
+                return "optimal"
+            if pricing == "bland" or degenerate > 50:
+                e = int(cand[0])
+            else:
+                e = int(cand[np.argmax(d[cand] ** 2 / gamma[cand])])
+            u = lu.ftran(_simplex_column(A, sign, n, e))
+            rows = np.flatnonzero(u > tol)
+            if rows.size == 0:
+                return "unbounded"
+            ratios = xB[rows] / u[rows]
+            best = ratios.min()
+            ties = rows[ratios <= best + tol]
+            r = int(ties[np.argmin(basis[ties])])  # Bland's leaving rule
+            degenerate = degenerate + 1 if best <= tol else 0
+            step = xB[r] / u[r]
+            xB -= step * u
+            xB[r] = step
+            pivot(r, e, u, d)
+        return "iteration_limit"
+
+    allowed = np.ones(n_all, dtype=bool)
+    allowed[n + m:] = False
+    allowed[n + m + art_rows] = True
+    if art_rows.size:
+        phase1 = np.zeros(n_all)
+        phase1[n + m + art_rows] = -1.0
+        status = run(phase1, allowed)
+        if status == "iteration_limit":
+            return status, None, None
+        refactorize()
+        if phase1[basis] @ xB < -tol * max(1.0, float(rhs.max())):
+            return "infeasible", None, None
+        # drive zero-level artificials out of the basis where possible
+        for r in np.flatnonzero(basis >= n + m):
+            row = dots(lu.btran(np.eye(1, m, r).ravel()))
+            row[n + m:] = 0.0
+            row[is_basic] = 0.0
+            js = np.flatnonzero(np.abs(row) > tol)
+            if js.size:
+                e = int(js[0])
+                pivot(int(r), e, lu.ftran(_simplex_column(A, sign, n, e)))
+        refactorize()
+    allowed[n + m:] = False
+    cost = np.zeros(n_all)
+    cost[:n] = c
+    status = run(cost, allowed)
+    if status != "optimal":
+        return status, None, None
+    refactorize()
+    x = np.zeros(n_all)
+    x[basis] = xB
+    x = np.maximum(x[:n], 0.0)
+    return "optimal", x.tolist(), float(c @ x)
+
+
 # ---------- DP (12.5% of total grade) ----------
-def knapsack_bottom_up(values: List[int], weights: List[int], capacity: int) -> int:
+def knapsack_bottom_up(values: List[int], weights: List[int], capacity: int, engine: str = "auto") -> int:
     """
     (6.5%) Bottom-up 0/1 knapsack. Return the optimal value (int).
 
@@ -204,24 +778,231 @@ def knapsack_bottom_up(values: List[int], weights: List[int], capacity: int) ->
       2) Allocate and initialize the 2D table to zeros.
       3) Implement your chosen formulation consistently, filling the table.
       4) Return the appropriate cell as the answer (depends on formulation).
+
+    Only row i+1 is ever read while filling row i, so the table is kept as a
+    single typed row (O(capacity) memory); see knapsack_bottom_up_items for
+    the variant that also reconstructs the chosen items.
+
+    engine: 'auto' uses the NumPy row update (one np.maximum over a shifted
+    slice per item) when numpy is installed and the values cannot overflow
+    int64, else the pure-Python loop; 'numpy' / 'python' force one of them.
     """
     # TODO: Bottom-up DP (Option A): dp[i][cap] = best using items i..n-1
     n = len(values)
     if n != len(weights) or capacity < 0:
         return 0
-    # Option A formulation: dp[i][cap] = best using items i..n-1 with capacity cap
-    dp = [[0] * (capacity + 1) for _ in range(n + 1)]
+    if _use_numpy_dp(values, weights, engine):
+        return int(_dp_row_np(values, weights, capacity)[capacity])
+    # Option A, rolled into one row: after item i the row holds dp[i][*];
+    # caps go high -> low so row[cap - w] is still dp[i+1][cap - w]
+    row = _dp_row(values, capacity)
     for i in range(n - 1, -1, -1):
         v, w = values[i], weights[i]
-        for cap in range(0, capacity + 1):
-            best = dp[i + 1][cap]  # skip
-            if w <= cap:
-                best = max(best, v + dp[i + 1][cap - w])
-            dp[i][cap] = best
-    return dp[0][capacity]
+        for cap in range(capacity, w - 1, -1):
+            take = v + row[cap - w]
+            if take > row[cap]:
+                row[cap] = take
+    return row[capacity]
+
+
+_INT64_MAX = (1 << 63) - 1
+
+
+def _dp_row(values: List[int], capacity: int):
+    """Zeroed DP row of capacity+1 cells: array('q') unless values could overflow int64."""
+    if sum(abs(v) for v in values) <= _INT64_MAX:
+        return array('q', bytes(8 * (capacity + 1)))
+    return [0] * (capacity + 1)
+
+
+def _use_numpy_dp(values: List[int], weights: List[int], engine: str) -> bool:
+    if engine not in ("auto", "numpy", "python"):
+        raise ValueError(f"unknown DP engine: {engine!r}")
+    if engine == "python":
+        return False
+    ok = np is not None and all(w >= 0 for w in weights) and sum(abs(v) for v in values) <= _INT64_MAX
+    if engine == "numpy" and not ok:
+        raise ValueError("numpy DP engine unavailable (numpy missing, negative weight or int64 overflow)")
+    return ok
+
+
+def _dp_row_np(values: List[int], weights: List[int], capacity: int, took: Optional[list] = None):
+    """
+    Vectorized rolling DP row (int64). The right-hand side of each update is
+    built from the previous row before assignment, so it is still 0/1. If
+    `took` is a list, the packed take-bits of each item are appended to it
+    (in item order n-1 .. 0, little bit order as in knapsack_bottom_up_items).
+    """
+    row = np.zeros(capacity + 1, dtype=np.int64)
+    for i in range(len(values) - 1, -1, -1):
+        v, w = int(values[i]), int(weights[i])
+        if w > capacity:
+            if took is not None:
+                took.append(np.zeros((capacity + 8) // 8, dtype=np.uint8))
+            continue
+        cand = row[:capacity + 1 - w] + v
+        if took is not None:
+            better = np.zeros(capacity + 1, dtype=bool)
+            better[w:] = cand > row[w:]
+            took.append(np.packbits(better, bitorder="little"))
+        np.maximum(row[w:], cand, out=row[w:])
+    return row
+
+
+def knapsack_bottom_up_items(values: List[int], weights: List[int], capacity: int,
+                             engine: str = "auto") -> Tuple[int, List[int]]:
+    """
+    Rolling bottom-up 0/1 knapsack that also returns the chosen item indices.
+
+    Same O(capacity) value row as knapsack_bottom_up plus one bit per
+    (item, cap) recording whether taking item i was strictly better, i.e.
+    n*(capacity+1)/8 bytes instead of an (n+1) x (capacity+1) table of ints.
+    """
+    n = len(values)
+    if n != len(weights) or capacity < 0:
+        return 0, []
+    if _use_numpy_dp(values, weights, engine):
+        packed: list = []
+        row = _dp_row_np(values, weights, capacity, packed)
+        packed.reverse()
+        items = []
+        cap = capacity
+        for i in range(n):
+            if packed[i][cap >> 3] >> (cap & 7) & 1:
+                items.append(i)
+                cap -= weights[i]
+        return int(row[capacity]), items
+    row = _dp_row(values, capacity)
+    stride = (capacity + 8) // 8
+    took = bytearray(n * stride)
+    for i in range(n - 1, -1, -1):
+        v, w = values[i], weights[i]
+        base = i * stride
+        for cap in range(capacity, w - 1, -1):
+            take = v + row[cap - w]
+            if take > row[cap]:
+                row[cap] = take
+                took[base + (cap >> 3)] |= 1 << (cap & 7)
+    items: List[int] = []
+    cap = capacity
+    for i in range(n):
+        if took[i * stride + (cap >> 3)] >> (cap & 7) & 1:
+            items.append(i)
+            cap -= weights[i]
+    return row[capacity], items
+
+
+class KnapsackTable:
+    """
+    All-capacities 0/1 knapsack: one rolling DP row up to `max_capacity`.
+
+    Because the row starts at zero, row[cap] is the best value of any subset
+    with total weight <= cap, so best_value(cap) is a single lookup for every
+    cap <= max_capacity; it equals knapsack_bottom_up(values, weights, cap).
+    With reconstruct=True the take-bits of each item are kept (one bit per
+    (item, cap), as in knapsack_bottom_up_items) and items(cap) returns the
+    chosen indices. add_front() prepends an item with one O(max_capacity)
+    row update: the row holds dp[i][*] of Option A, so the new item is just
+    the next i.
+    """
+
+    def __init__(self, values: List[int], weights: List[int], max_capacity: int,
+                 reconstruct: bool = False, engine: str = "auto"):
+        if len(values) != len(weights):
+            raise ValueError("values and weights must have the same length")
+        if max_capacity < 0:
+            raise ValueError("max_capacity must be >= 0")
+        self.capacity = max_capacity
+        self.values: List[int] = []
+        self.weights: List[int] = []
+        self.reconstruct = reconstruct
+        self._numpy = _use_numpy_dp(values, weights, engine)
+        self._vsum = 0
+        if self._numpy:
+            self._row = np.zeros(max_capacity + 1, dtype=np.int64)
+        else:
+            self._row = _dp_row(values, max_capacity)
+        # take-bits in insertion order (last item first), one packed row each
+        self._took: list = []
+        for i in range(len(values) - 1, -1, -1):
+            self.add_front(values[i], weights[i])
+
+    def add_front(self, value: int, weight: int) -> None:
+        """Insert an item at index 0 (existing indices shift up by one)."""
+        v, w, cap_max = int(value), int(weight), self.capacity
+        if w < 0:
+            raise ValueError("weights must be >= 0")
+        self._vsum += abs(v)
+        if self._vsum > _INT64_MAX and not isinstance(self._row, list):
+            # int64 could overflow: continue on Python ints
+            self._row = [int(x) for x in self._row]
+            self._numpy = False
+        row = self._row
+        if self._numpy:
+            better = np.zeros(cap_max + 1, dtype=bool)
+            if w <= cap_max:
+                cand = row[:cap_max + 1 - w] + v
+                better[w:] = cand > row[w:]
+                np.maximum(row[w:], cand, out=row[w:])
+            if self.reconstruct:
+                self._took.append(np.packbits(better, bitorder="little"))
+        else:
+            took = bytearray((cap_max + 8) // 8) if self.reconstruct else None
+            for cap in range(cap_max, w - 1, -1):
+                take = v + row[cap - w]
+                if take > row[cap]:
+                    row[cap] = take
+                    if took is not None:
+                        took[cap >> 3] |= 1 << (cap & 7)
+            if took is not None:
+                self._took.append(took)
+        self.values.insert(0, v)
+        self.weights.insert(0, w)
+
+    def _check(self, cap: int) -> None:
+        if cap > self.capacity:
+            raise ValueError(f"capacity {cap} exceeds the table's max_capacity {self.capacity}")
+
+    def best_value(self, cap: int) -> int:
+        """Optimal value for capacity `cap` (0 for cap < 0, like knapsack_bottom_up)."""
+        if cap < 0:
+            return 0
+        self._check(cap)
+        return int(self._row[cap])
 
+    def best_values(self, caps) -> List[int]:
+        """best_value() for an array of capacities."""
+        if np is not None and isinstance(self._row, np.ndarray):
+            caps = np.asarray(caps, dtype=np.int64).reshape(-1)
+            if caps.size:
+                self._check(int(caps.max()))
+            out = self._row[np.maximum(caps, 0)]
+            return np.where(caps < 0, 0, out).tolist()
+        caps = [int(c) for c in caps]
+        if caps:
+            self._check(max(caps))
+        row = self._row
+        return [int(row[c]) if c >= 0 else 0 for c in caps]
 
-def knapsack_top_down(values: List[int], weights: List[int], capacity: int) -> int:
+    def items(self, cap: int) -> List[int]:
+        """Indices of an optimal item set for capacity `cap` (needs reconstruct=True)."""
+        if not self.reconstruct:
+            raise ValueError("KnapsackTable was built without reconstruct=True")
+        if cap < 0:
+            return []
+        self._check(cap)
+        took, n = self._took, len(self.values)
+        chosen: List[int] = []
+        for i in range(n):
+            bits = took[n - 1 - i]
+            if bits[cap >> 3] >> (cap & 7) & 1:
+                chosen.append(i)
+                cap -= self.weights[i]
+        return chosen
+
+
+def knapsack_top_down(values: List[int], weights: List[int], capacity: int,
+                      stats: Optional[dict] = None) -> int:
     """
     (6%) Top-down (memoized) 0/1 knapsack. Return optimal value (int).
 
@@ -234,29 +1015,193 @@ def knapsack_top_down(values: List[int], weights: List[int], capacity: int) -> i
                    )                                    otherwise
 
     Detailed steps:
-      1) Define an inner function f(i, cap) and decorate with @lru_cache(None).
+      1) Evaluate f(i, cap) with an explicit stack instead of recursion, so
+         the depth is not limited by Python's recursion limit.
       2) Implement the base cases (past last item or capacity empty).
-      3) Implement the recurrence using the rule above.
+      3) Implement the recurrence using the rule above; a state is resolved
+         once both children are in the memo, otherwise they are pushed.
       4) Return f(0, capacity).
+
+    The memo is a dict holding only the states reachable from (0, capacity)
+    and is dropped on return. If `stats` is given, stats["states"] is set to
+    the number of states visited.
     """
     n = len(values)
     if n != len(weights) or capacity < 0:
         return 0
 
     # TODO: Memoized recursion f(i,cap) with base/fit checks and max(skip,take)
-    @lru_cache(maxsize=None)
-    def f(i: int, cap: int) -> int:
+    # state (i, cap) is keyed as cap*(n+1) + i, unique for any integer cap
+    stride = n + 1
+    memo: dict = {}
+    stack = [(0, capacity)]
+    while stack:
+        i, cap = stack[-1]
+        key = cap * stride + i
+        if key in memo:
+            stack.pop()
+            continue
         if i >= n or cap <= 0:
-            return 0
+            memo[key] = 0
+            stack.pop()
+            continue
         w = weights[i]
-        v = values[i]
+        skip = memo.get(key + 1)  # (i+1, cap)
+        if skip is None:
+            stack.append((i + 1, cap))
+            continue
         # If item doesn't fit, must skip
         if w > cap:
-            return f(i + 1, cap)
+            memo[key] = skip
+            stack.pop()
+            continue
+        take = memo.get((cap - w) * stride + i + 1)
+        if take is None:
+            stack.append((i + 1, cap - w))
+            continue
         # Otherwise choose best of skip or take
-        return max(f(i + 1, cap), v + f(i + 1, cap - w))
+        memo[key] = max(skip, values[i] + take)
+        stack.pop()
+
+    if stats is not None:
+        stats["states"] = len(memo)
+    return memo[capacity * stride]
+
+
+def knapsack_branch_and_bound(values: List[int], weights: List[int], capacity: int,
+                              stats: Optional[dict] = None, max_nodes: Optional[int] = None) -> int:
+    """
+    0/1 knapsack by depth-first branch and bound; time does not depend on
+    the size of `capacity`.
+
+    Items are sorted by value density and every node is bounded by the
+    LP relaxation (greedy fill plus a fraction of the first item that does
+    not fit), found with a bisect over prefix weight sums. The greedy
+    solution is the initial incumbent. If `stats` is given,
+    stats["nodes"] is set to the number of nodes expanded. Items of nearly
+    equal density defeat the bound and the search turns exponential, so
+    max_nodes caps it: past that many nodes a RuntimeError is raised.
+    """
+    n = len(values)
+    if n != len(weights) or capacity < 0:
+        return 0
+    base = sum(v for v, w in zip(values, weights) if w == 0 and v > 0)
+    items = sorted(((v, w) for v, w in zip(values, weights) if 0 < w <= capacity and v > 0),
+                   key=lambda t: (-t[0] / t[1], t[1]))
+    W = [0]
+    V = [0]
+    for v, w in items:
+        W.append(W[-1] + w)
+        V.append(V[-1] + v)
+    m = len(items)
+
+    def bound(k: int, cap: int) -> float:
+        # items k.. greedily into cap; j is the first that does not fit
+        j = bisect.bisect_right(W, W[k] + cap, k) - 1
+        val = V[j] - V[k]
+        if j < m:
+            val += (cap - (W[j] - W[k])) * items[j][0] / items[j][1]
+        return val
+
+    best = 0
+    cap = capacity
+    for v, w in items:  # greedy incumbent
+        if w <= cap:
+            cap -= w
+            best += v
+    nodes = 0
+    stack = [(0, capacity, 0)]
+    while stack:
+        k, cap, val = stack.pop()
+        nodes += 1
+        if max_nodes is not None and nodes > max_nodes:
+            raise RuntimeError(f"branch and bound exceeded max_nodes={max_nodes}")
+        if val > best:
+            best = val
+        if k == m or math.floor(val + bound(k, cap) + 1e-9) <= best:
+            continue
+        v, w = items[k]
+        stack.append((k + 1, cap, val))  # skip, explored after take
+        if w <= cap:
+            stack.append((k + 1, cap - w, val + v))
+
+    if stats is not None:
+        stats["nodes"] = nodes
+    return base + best
+
+
+def knapsack_pareto(values: List[int], weights: List[int], capacity: int,
+                    stats: Optional[dict] = None, max_front: Optional[int] = None) -> int:
+    """
+    0/1 knapsack over the sparse Pareto front of (weight, value) pairs.
+
+    The front is kept sorted by weight with strictly increasing value; each
+    item merges it with a copy shifted by (w, v), dropping dominated pairs.
+    Cost is O(n * |front|), independent of `capacity` except through the
+    front size. If `stats` is given, stats["front"] is the largest front;
+    a front longer than max_front raises a RuntimeError.
+    """
+    n = len(values)
+    if n != len(weights) or capacity < 0:
+        return 0
+    front = [(0, 0)]
+    largest = 1
+    for v, w in zip(values, weights):
+        if v <= 0 or w > capacity:
+            continue
+        if w == 0:
+            front = [(fw, fv + v) for fw, fv in front]
+            continue
+        shifted = [(fw + w, fv + v) for fw, fv in front if fw + w <= capacity]
+        merged = []
+        i = j = 0
+        while i < len(front) or j < len(shifted):
+            if j == len(shifted) or (i < len(front) and
+                                     (front[i][0], -front[i][1]) <= (shifted[j][0], -shifted[j][1])):
+                cand = front[i]
+                i += 1
+            else:
+                cand = shifted[j]
+                j += 1
+            if not merged or cand[1] > merged[-1][1]:
+                merged.append(cand)
+        front = merged
+        largest = max(largest, len(front))
+        if max_front is not None and largest > max_front:
+            raise RuntimeError(f"Pareto front exceeded max_front={max_front}")
+
+    if stats is not None:
+        stats["front"] = largest
+    return front[-1][1]
+
+
+def choose_knapsack_engine(values: List[int], weights: List[int], capacity: int) -> str:
+    """
+    Pick an exact knapsack engine from the instance shape: 'bottom_up' while
+    the n x (capacity+1) table is affordable, then 'pareto' for few items
+    (front bounded by 2^n) and 'branch_and_bound' for many.
+    """
+    n = len(values)
+    if n * (max(capacity, 0) + 1) <= DP_CELL_LIMIT:
+        return "bottom_up"
+    return "pareto" if n <= 40 else "branch_and_bound"
+
+
+KNAPSACK_ENGINES = {
+    "bottom_up": knapsack_bottom_up,
+    "top_down": knapsack_top_down,
+    "branch_and_bound": knapsack_branch_and_bound,
+    "pareto": knapsack_pareto,
+}
+
 
-    return f(0, capacity)
+def knapsack_solve(values: List[int], weights: List[int], capacity: int, engine: str = "auto") -> int:
+    """Optimal knapsack value with the named engine, or choose_knapsack_engine's pick for 'auto'."""
+    if engine == "auto":
+        engine = choose_knapsack_engine(values, weights, capacity)
+    if engine not in KNAPSACK_ENGINES:
+        raise ValueError(f"unknown knapsack engine: {engine!r}")
+    return KNAPSACK_ENGINES[engine](values, weights, capacity)
 
 
 # ------------- Optional local smoke test -------------
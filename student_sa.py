@@ -1,10 +1,23 @@
 # student_sa.py
 from __future__ import annotations
-from typing import List, Tuple, Set, Optional, Callable
+from typing import List, Tuple, Set, Optional, Callable, Sequence
 import math, random, collections
 
+from sahistory import SAHistory  # re-exported: student code and older callers import it from here
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; batch scoring falls back to pure Python
+    np = None
+
 Coord = Tuple[int, int]
 
+# step (dr, dc) -> direction code for unit steps; _encode_dirs numbers the
+# distinct non-unit steps of a path from 4 up, one code per delta
+_DIR_CODE = {(-1, 0): 0, (1, 0): 1, (0, -1): 2, (0, 1): 3}
+# goal used when the caller gives neither goal nor grid (original 6x6 board)
+_LEGACY_GOAL: Coord = (5, 5)
+
 
 def _quick_bfs(src: Coord, dst: Coord, nbrs: Callable[[Coord], List[Coord]]) -> List[Coord]:
     if src == dst:
@@ -47,20 +60,142 @@ def _default_cost(path: List[Coord]) -> float:
     return float(len(path) + 0.2 * _count_turns(path))
 
 
-def _splice_segment(base: List[Coord], i: int, j: int, mid: List[Coord]) -> List[Coord]:
+def _shuffled_bfs(src: Coord, dst: Coord, nbrs: Callable[[Coord], List[Coord]], rng: random.Random) -> List[Coord]:
+    """BFS shortest path with neighbours visited in random order (ties broken by rng)."""
+    dq = collections.deque([src])
+    prev = {src: None}
+    while dq:
+        cur = dq.popleft()
+        nbs = list(nbrs(cur))
+        rng.shuffle(nbs)
+        for n in nbs:
+            if n not in prev:
+                prev[n] = cur
+                if n == dst:
+                    path = [n]
+                    while prev[path[-1]] is not None:
+                        path.append(prev[path[-1]])
+                    path.reverse()
+                    return path
+                dq.append(n)
+    return []
+
+
+def _initial_pool(initial: List[Coord], nbrs: Callable[[Coord], List[Coord]], rng: random.Random, size: int) -> List[List[Coord]]:
+    """Up to `size` distinct shortest paths sharing the endpoints of `initial`."""
+    pool = [initial]
+    if size <= 1 or len(initial) < 2:
+        return pool
+    seen = {tuple(initial)}
+    for _ in range(3 * size):
+        p = _shuffled_bfs(initial[0], initial[-1], nbrs, rng)
+        if p and tuple(p) not in seen:
+            seen.add(tuple(p))
+            pool.append(p)
+            if len(pool) >= size:
+                break
+    return pool
+
+
+def _encode_dirs(path: List[Coord]) -> List[int]:
+    """
+    One code per step: 0..3 for unit moves, then 4, 5, ... for each distinct
+    non-unit delta, so two steps share a code exactly when _count_turns sees
+    no turn between them.
+    """
+    codes = dict(_DIR_CODE)
+    out = []
+    for a, b in zip(path, path[1:]):
+        d = (b[0] - a[0], b[1] - a[1])
+        code = codes.get(d)
+        if code is None:
+            code = codes[d] = len(codes)
+        out.append(code)
+    return out
+
+
+def batch_path_cost(paths: Sequence[List[Coord]]) -> List[float]:
+    """
+    Score many paths at once with the turn/length objective (len + 0.2 * turns).
+
+    Paths are encoded into a padded direction-code matrix so that turns are
+    counted for the whole batch with a single vectorized comparison when numpy
+    is available. Matches _default_cost path for path (empty path -> inf).
+    """
+    codes = [_encode_dirs(p) for p in paths]
+    if np is not None and codes:
+        width = max(len(c) for c in codes)
+        if width >= 2:
+            mat = np.full((len(codes), width), -1, dtype=np.int64)
+            for row, c in enumerate(codes):
+                mat[row, :len(c)] = c
+            prev, nxt = mat[:, :-1], mat[:, 1:]
+            turns = ((prev != nxt) & (nxt != -1)).sum(axis=1).tolist()
+        else:
+            turns = [0] * len(codes)
+    else:
+        turns = [sum(1 for x, y in zip(c, c[1:]) if x != y) for c in codes]
+    return [float(len(p) + 0.2 * t) if p else float('inf') for p, t in zip(paths, turns)]
+
+
+def _splice_parts(base: List[Coord], i: int, j: int, mid: List[Coord]) -> Optional[Tuple[int, int, List[Coord]]]:
+    """(i, j, core) such that the splice is base[:i+1] + core + base[j:]; None if it is a no-op."""
     if not base or i < 0 or j >= len(base) or i >= j:
-        return base[:]
-    out = base[:i+1]
+        return None
     core = mid[:]
     if core and core[0] == base[i]:
         core = core[1:]
     if core and core[-1] == base[j]:
         core = core[:-1]
+    return i, j, core
+
+
+def _splice_segment(base: List[Coord], i: int, j: int, mid: List[Coord]) -> List[Coord]:
+    parts = _splice_parts(base, i, j, mid)
+    if parts is None:
+        return base[:]
+    i, j, core = parts
+    out = base[:i+1]
     out.extend(core)
     out.extend(base[j:])
     return out
 
 
+class _PathHash:
+    """
+    Polynomial rolling hash of a path with prefix hashes, so the fingerprint
+    of a splice base[:i+1] + core + base[j:] costs O(len(core) + log n)
+    instead of rehashing the whole candidate. Fingerprints are (len, hash).
+    """
+    MOD = (1 << 61) - 1
+    BASE = 1_000_003
+
+    def __init__(self, path: List[Coord]):
+        M, B = self.MOD, self.BASE
+        pre = [0]
+        for u in path:
+            pre.append((pre[-1] * B + self._code(u)) % M)
+        self.pre = pre
+        self.n = len(path)
+
+    @staticmethod
+    def _code(u: Coord) -> int:
+        return (u[0] * 0x9E3779B1 + u[1] * 0x85EBCA77 + 1) % _PathHash.MOD
+
+    def key(self) -> Tuple[int, int]:
+        return self.n, self.pre[self.n]
+
+    def spliced(self, i: int, j: int, core: List[Coord]) -> Tuple[int, int]:
+        M, B, pre = self.MOD, self.BASE, self.pre
+        h = pre[i + 1]
+        for u in core:
+            h = (h * B + self._code(u)) % M
+        tail = self.n - j
+        shift = pow(B, tail, M)
+        suffix = (pre[self.n] - pre[j] * shift) % M
+        return i + 1 + len(core) + tail, (h * shift + suffix) % M
+
+
 def _biased_walk(a: Coord, b: Coord, nbrs: Callable[[Coord], List[Coord]], rng: random.Random, budget: int = 24) -> List[Coord]:
     def man(u: Coord, v: Coord) -> int:
         return abs(u[0] - v[0]) + abs(u[1] - v[1])
@@ -87,30 +222,45 @@ def _biased_walk(a: Coord, b: Coord, nbrs: Callable[[Coord], List[Coord]], rng:
     return []
 
 
-def _mut_shortcut(path: List[Coord], nbrs: Callable[[Coord], List[Coord]], rng: random.Random) -> List[Coord]:
+def _shortcut_splice(path: List[Coord], nbrs: Callable[[Coord], List[Coord]], rng: random.Random) -> Optional[Tuple[int, int, List[Coord]]]:
     n = len(path)
     if n < 6:
-        return path[:]
+        return None
     i = rng.randrange(1, n-3)
     j = rng.randrange(i+2, min(i+6, n-1))
     a, b = path[i], path[j]
     mid = _biased_walk(a, b, nbrs, rng, budget=18)
     if mid and len(mid) <= (j - i + 1):
-        return _splice_segment(path, i, j, mid)
-    return path[:]
+        return _splice_parts(path, i, j, mid)
+    return None
 
 
-def _mut_detour(path: List[Coord], nbrs: Callable[[Coord], List[Coord]], rng: random.Random) -> List[Coord]:
+def _detour_splice(path: List[Coord], nbrs: Callable[[Coord], List[Coord]], rng: random.Random) -> Optional[Tuple[int, int, List[Coord]]]:
     n = len(path)
     if n < 6:
-        return path[:]
+        return None
     i = rng.randrange(1, n-3)
     j = rng.randrange(i+2, min(i+6, n-1))
     a, b = path[i], path[j]
     mid = _biased_walk(a, b, nbrs, rng, budget=30)
     if mid:
-        return _splice_segment(path, i, j, mid)
-    return path[:]
+        return _splice_parts(path, i, j, mid)
+    return None
+
+
+def _apply_splice(path: List[Coord], parts: Optional[Tuple[int, int, List[Coord]]]) -> List[Coord]:
+    if parts is None:
+        return path[:]
+    i, j, core = parts
+    return path[:i+1] + core + path[j:]
+
+
+def _mut_shortcut(path: List[Coord], nbrs: Callable[[Coord], List[Coord]], rng: random.Random) -> List[Coord]:
+    return _apply_splice(path, _shortcut_splice(path, nbrs, rng))
+
+
+def _mut_detour(path: List[Coord], nbrs: Callable[[Coord], List[Coord]], rng: random.Random) -> List[Coord]:
+    return _apply_splice(path, _detour_splice(path, nbrs, rng))
 
 
 def simulated_annealing(
@@ -120,54 +270,143 @@ def simulated_annealing(
     seed: str,
     iters: int = 1200,
     T0: float = 1.3,
-    alpha: float = 0.995
-):
+    alpha: float = 0.995,
+    batch: int = 1,
+    batch_objective_fn: Optional[Callable[[Sequence[List[Coord]]], Sequence[float]]] = None,
+    start: Coord = (0, 0),
+    goal: Optional[Coord] = None,
+    grid: Optional[Tuple[int, int]] = None,
+    n_init: int = 1,
+    recorder: Optional[SAHistory] = None,
+    cost_cache: int = 0
+) -> Tuple[List[Coord], List[float]]:
+    """
+    Anneal a start->goal path under objective_fn and return (best, history).
+
+    With batch > 1 every step proposes `batch` mutations of the current path,
+    scores them together through batch_objective_fn (or objective_fn one by
+    one when it is not given; batch_path_cost is a vectorized drop-in for the
+    default turn/length objective) and runs the Metropolis test on the
+    cheapest one. history still gets one entry per step, and batch=1 keeps
+    the original single-proposal behaviour draw for draw.
+
+    The walk starts from a BFS shortest path between start and goal. goal
+    defaults to the bottom-right cell of grid=(rows, cols) and, without
+    either, to the corner of the classic 6x6 board. n_init > 1 builds a pool
+    of that many distinct shortest paths and starts from the cheapest one.
+
+    history is always a plain list of floats: recorder.values(). Pass an
+    SAHistory in another mode ('ring', 'changes', 'minmax') as `recorder` to
+    keep long runs bounded in memory; afterwards it also holds the exact
+    summary() and the iteration indices() of the returned values.
+
+    cost_cache > 0 memoizes costs in an LRU of up to that many entries keyed
+    by a rolling path fingerprint that is updated from the splice rather than
+    rehashed, so unchanged or revisited candidates never reach objective_fn.
+    Only turn it on when objective_fn is a pure function of the path; it is
+    off by default.
+    """
     rng = random.Random(str(seed))
 
-    # initial feasible path search similar to original intent
-    starts = [(0,0), (0,1), (1,0)]
-    goals = [(5,5), (5,4), (4,5)]
-    initial: List[Coord] = []
-    for s in starts:
-        for g in goals:
-            p = _quick_bfs(s, g, neighbors_fn)
-            if p:
-                initial = p
-                break
-        if initial:
-            break
-    if not initial:
-        p = _quick_bfs((0,0), (5,5), neighbors_fn)
-        if p:
-            initial = p
+    # seed from one exact shortest path between the explicit endpoints
+    if goal is None:
+        goal = (grid[0] - 1, grid[1] - 1) if grid is not None else _LEGACY_GOAL
+    initial = _quick_bfs(start, goal, neighbors_fn)
     if not initial:
         return []
+    pool = _initial_pool(initial, neighbors_fn, rng, int(n_init))
+
+    def _checked(v, path: List[Coord]) -> float:
+        # objective values that are not finite numbers fall back to the default cost
+        try:
+            v = float(v)
+        except (TypeError, ValueError, OverflowError):
+            return _default_cost(path)
+        return v if math.isfinite(v) else _default_cost(path)
 
     def _safe_cost(path: List[Coord]) -> float:
         try:
-            v = objective_fn(path)
-            if v is None or not math.isfinite(v):
-                return _default_cost(path)
-            return float(v)
+            return _checked(objective_fn(path), path)
         except Exception:
             return _default_cost(path)
 
-    current = initial[:]
-    best = initial[:]
-    cur_cost = _safe_cost(current)
+    cache: Optional[collections.OrderedDict] = collections.OrderedDict() if cost_cache > 0 else None
+
+    def _cached_cost(path: List[Coord], key: Optional[Tuple[int, int]]) -> Optional[float]:
+        if cache is None or key is None:
+            return None
+        v = cache.get(key)
+        if v is not None:
+            cache.move_to_end(key)
+        return v
+
+    def _store_cost(key: Optional[Tuple[int, int]], v: float) -> None:
+        if cache is None or key is None:
+            return
+        cache[key] = v
+        if len(cache) > cost_cache:
+            cache.popitem(last=False)
+
+    def _cost(path: List[Coord], key: Optional[Tuple[int, int]]) -> float:
+        v = _cached_cost(path, key)
+        if v is None:
+            v = _safe_cost(path)
+            _store_cost(key, v)
+        return v
+
+    def _propose(k: int) -> Tuple[List[Coord], Optional[Tuple[int, int]]]:
+        # mutation choice: mostly shortcut, occasionally detour
+        if (k % 5) == 0:
+            parts = _detour_splice(current, neighbors_fn, rng)
+        else:
+            parts = _shortcut_splice(current, neighbors_fn, rng)
+        if cache is None:
+            return _apply_splice(current, parts), None
+        if parts is None:
+            return current[:], cur_hash.key()
+        return _apply_splice(current, parts), cur_hash.spliced(*parts)
+
+    def _best_of_batch(k: int) -> Tuple[List[Coord], float, Optional[Tuple[int, int]]]:
+        proposals = [_propose(k * K + b) for b in range(K)]
+        cands = [c for c, _ in proposals]
+        keys = [key for _, key in proposals]
+        costs: List[Optional[float]] = [_cached_cost(c, key) for c, key in proposals]
+        miss = [b for b in range(K) if costs[b] is None]
+        if miss:
+            scored: Sequence[float] = []
+            if batch_objective_fn is not None:
+                try:
+                    scored = list(batch_objective_fn([cands[b] for b in miss]))
+                except Exception:
+                    scored = []
+            if len(scored) != len(miss):
+                scored = [_safe_cost(cands[b]) for b in miss]
+            for b, v in zip(miss, scored):
+                v = _checked(v, cands[b])
+                costs[b] = v
+                _store_cost(keys[b], v)
+        pick = min(range(K), key=costs.__getitem__)
+        return cands[pick], costs[pick], keys[pick]
+
+    K = max(1, int(batch))
+    pool_costs = [_safe_cost(p) for p in pool]
+    pick = min(range(len(pool)), key=pool_costs.__getitem__)
+    current = pool[pick][:]
+    cur_hash = _PathHash(current) if cache is not None else None
+    best = pool[pick][:]
+    cur_cost = pool_costs[pick]
     best_cost = cur_cost
-    history: List[float] = [cur_cost]
+    history = recorder if recorder is not None else SAHistory("full")
+    history.append(cur_cost)
     T = float(T0)
 
     no_improve = 0
     for k in range(1, int(iters)+1):
-        # mutation choice: mostly shortcut, occasionally detour
-        if (k % 5) == 0:
-            candidate = _mut_detour(current, neighbors_fn, rng)
+        if K == 1:
+            candidate, cand_key = _propose(k)
+            cand_cost = _cost(candidate, cand_key)
         else:
-            candidate = _mut_shortcut(current, neighbors_fn, rng)
-
-        cand_cost = _safe_cost(candidate)
+            candidate, cand_cost, cand_key = _best_of_batch(k)
         delta = cand_cost - cur_cost
 
         accepted = False
@@ -179,6 +418,8 @@ def simulated_annealing(
                 accepted = True
 
         if accepted:
+            if cache is not None and cand_key != cur_hash.key():
+                cur_hash = _PathHash(candidate)
             current = candidate
             cur_cost = cand_cost
 
@@ -199,7 +440,11 @@ def simulated_annealing(
             current = best[:]
             cur_cost = best_cost
             current = _mut_detour(current, neighbors_fn, rng)
-            cur_cost = _safe_cost(current)
+            if cache is not None:
+                cur_hash = _PathHash(current)
+                cur_cost = _cost(current, cur_hash.key())
+            else:
+                cur_cost = _safe_cost(current)
             no_improve = 0
 
-    return best, history
+    return best, history.values()
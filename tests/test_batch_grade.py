@@ -0,0 +1,35 @@
+import json
+
+import pytest
+
+import batch_grade
+
+
+def _manifest(tmp_path, entries):
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps(entries), encoding="utf-8")
+    return str(path)
+
+
+def test_plain_ids_keep_their_folder_name():
+    assert batch_grade._safe("IT23294998") == "IT23294998"
+
+
+def test_rewritten_ids_do_not_collide():
+    names = ["a/b", "a_b", "a b", "a\\b", "", "..", "."]
+    safe = [batch_grade._safe(n) for n in names]
+    assert len(set(safe)) == len(names)
+    assert all(s not in ("", ".", "..") and "/" not in s and "\\" not in s for s in safe)
+
+
+def test_manifest_rejects_tasks_sharing_an_output_folder(tmp_path):
+    with pytest.raises(ValueError, match="share the output folder"):
+        batch_grade.load_manifest(_manifest(tmp_path, [{"student_id": "S1", "seeds": ["x", "x"]}]))
+    with pytest.raises(ValueError, match="share the output folder"):
+        batch_grade.load_manifest(_manifest(tmp_path, [{"student_id": "Ann", "seed": "1"},
+                                                       {"student_id": "ann", "seed": "1"}]))
+
+
+def test_manifest_accepts_ids_that_only_differ_after_sanitizing(tmp_path):
+    tasks = batch_grade.load_manifest(_manifest(tmp_path, [{"student_id": "a/b"}, {"student_id": "a_b"}]))
+    assert len({batch_grade._task_dir("out", t) for t in tasks}) == 2
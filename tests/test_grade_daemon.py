@@ -0,0 +1,101 @@
+import asyncio
+import os
+
+import pytest
+
+import common
+import grade_daemon
+import runner
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    monkeypatch.setattr(grade_daemon, "_DIR", ROOT)
+    monkeypatch.setattr(grade_daemon, "_MODULES", {})
+    monkeypatch.setattr(grade_daemon, "_GRIDS", grade_daemon.OrderedDict())
+    return grade_daemon
+
+
+def test_modules_hashed_only_when_stat_changes(worker, monkeypatch):
+    calls = []
+    real = common.sha_code_fingerprint
+    monkeypatch.setattr(common, "sha_code_fingerprint", lambda paths: calls.append(paths) or real(paths))
+    first = worker._fresh_modules()
+    assert len(calls) == len(worker.STUDENT_MODULES)
+    calls.clear()
+    assert worker._fresh_modules() == first
+    assert calls == []
+
+    path = os.path.join(ROOT, "heuristics.py")
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    try:
+        again = worker._fresh_modules()
+    finally:
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert calls == [[path]]
+    assert again["heuristics"] is first["heuristics"]  # same source: no reload
+
+
+def test_grid_cache_evicts_least_recently_used(worker, monkeypatch):
+    monkeypatch.setattr(worker, "_GRIDS_MAX", 2)
+
+    def grade(seed):
+        worker._grade({"seed": str(seed), "rows": 6, "cols": 6, "only": "bfs"})
+        return [k[0] for k in worker._GRIDS]
+
+    assert grade(1) == ["1"]
+    assert grade(2) == ["1", "2"]
+    assert grade(1) == ["2", "1"]
+    assert grade(3) == ["1", "3"]
+
+
+def test_reference_path_keyed_by_grid_identity(monkeypatch):
+    monkeypatch.setattr(runner, "_REF_PATHS", runner.OrderedDict())
+    cells = {(1, 1), (2, 2)}
+    tagged = runner.GridObstacles(cells, ("s", 5, 5, 0.1, "random"))
+    path = runner._reference_path(5, 5, tagged)
+    assert list(runner._REF_PATHS) == [(5, 5, tagged.grid_key)]
+    assert runner._reference_path(5, 5, set(cells)) == path
+    assert len(runner._REF_PATHS) == 1  # untagged sets are not memoized
+
+
+def _sleepy_grade(req):
+    if req.get("seed") == "hang":
+        import time
+        time.sleep(60)
+    return {"ok": True, "pid": os.getpid(), "out_dir": req.get("out_dir")}
+
+
+@pytest.fixture
+def daemon(tmp_path, monkeypatch):
+    monkeypatch.setattr(grade_daemon, "_grade", _sleepy_grade)
+    d = grade_daemon.GradingDaemon(ROOT, 1, out_root=str(tmp_path), timeout=1.0)
+    yield d
+    d.pool.shutdown(wait=False, cancel_futures=True)
+
+
+@pytest.mark.parametrize("out_dir", ["../elsewhere", "/etc", "a/../../b", "", 3])
+def test_out_dir_must_stay_inside_the_root(daemon, out_dir):
+    resp = asyncio.run(daemon.handle({"student_id": "x", "out_dir": out_dir}))
+    assert not resp["ok"] and "out_dir" in resp["error"]
+
+
+def test_out_dir_is_resolved_under_the_root(daemon, tmp_path):
+    resp = asyncio.run(daemon.handle({"student_id": "x", "out_dir": "batch/a"}))
+    assert resp["ok"] and resp["out_dir"] == os.path.join(os.path.realpath(tmp_path), "batch", "a")
+
+
+def test_runaway_request_times_out_and_frees_the_worker(daemon):
+    async def run():
+        first = await daemon.handle({"student_id": "x", "seed": "ok"})
+        hung = await daemon.handle({"student_id": "x", "seed": "hang"})
+        after = await daemon.handle({"student_id": "x", "seed": "ok"})
+        return first, hung, after
+
+    first, hung, after = asyncio.run(run())
+    assert first["ok"] and after["ok"]
+    assert not hung["ok"] and "timed out" in hung["error"]
+    assert after["pid"] != first["pid"]
@@ -0,0 +1,56 @@
+import pickle
+import random
+
+import pytest
+
+import gridfile
+
+
+def _cells(rows, cols, seed=0, density=0.3):
+    rng = random.Random(seed)
+    return {(r, c) for r in range(rows) for c in range(cols) if rng.random() < density}
+
+
+@pytest.mark.parametrize("rows,cols", [(1, 1), (5, 8), (7, 13), (33, 17)])
+def test_round_trip(tmp_path, rows, cols):
+    cells = _cells(rows, cols, seed=rows * cols)
+    path = str(tmp_path / "grid.bin")
+    sha = gridfile.write_grid(path, rows, cols, cells)
+    g = gridfile.GridFile(path)
+    try:
+        assert (g.rows, g.cols, g.start, g.goal) == (rows, cols, (0, 0), (rows - 1, cols - 1))
+        assert g.sha256() == sha
+        assert set(g.obstacles) == cells and len(g.obstacles) == len(cells)
+        assert all(((r, c) in g.obstacles) == ((r, c) in cells) for r in range(rows) for c in range(cols))
+        assert (-1, 0) not in g.obstacles and (rows, 0) not in g.obstacles and "x" not in g.obstacles
+    finally:
+        g.close()
+
+
+def test_python_packing_matches_numpy(monkeypatch):
+    cells = _cells(9, 21, seed=3)
+    packed = gridfile.pack_obstacles(9, 21, cells)
+    monkeypatch.setattr(gridfile, "np", None)
+    assert gridfile.pack_obstacles(9, 21, cells) == packed
+
+
+def test_obstacle_set_pickles_by_path(tmp_path):
+    path = str(tmp_path / "grid.bin")
+    cells = _cells(6, 6, seed=1)
+    gridfile.write_grid(path, 6, 6, cells)
+    obs = gridfile.GridFile(path).obstacles
+    again = pickle.loads(pickle.dumps(obs))
+    assert set(again) == cells and again.grid_key == obs.grid_key
+
+
+def test_rejects_foreign_and_truncated_files(tmp_path):
+    bad = tmp_path / "bad.bin"
+    bad.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError, match="not a"):
+        gridfile.GridFile(str(bad))
+    path = str(tmp_path / "grid.bin")
+    gridfile.write_grid(path, 8, 8, {(1, 1)})
+    with open(path, "r+b") as f:
+        f.truncate(gridfile.HEADER.size + 3)
+    with pytest.raises(ValueError, match="truncated"):
+        gridfile.GridFile(path)
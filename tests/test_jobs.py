@@ -0,0 +1,15 @@
+import pytest
+
+import runner
+
+
+def _results(tmp_path, name, **kw):
+    out = tmp_path / name
+    runner.run_suite("IT23294998", out_dir=str(out), rows=12, cols=12, **kw)
+    return (out / "results.json").read_bytes(), (out / "problem.json").read_bytes()
+
+
+@pytest.mark.parametrize("kw", [{"jobs": 4}, {"jobs": 3, "isolate": True}, {"isolate": True}],
+                         ids=["jobs", "jobs-isolate", "isolate"])
+def test_parallel_results_are_byte_identical_to_sequential(tmp_path, kw):
+    assert _results(tmp_path, "par", **kw) == _results(tmp_path, "seq")
@@ -0,0 +1,175 @@
+import random
+import types
+
+import pytest
+
+import runner
+import student_lp_dp as DP
+
+
+def _instance(seed, n=12, w_max=30):
+    rng = random.Random(seed)
+    weights = [rng.randint(1, w_max) for _ in range(n)]
+    values = [rng.randint(0, 60) for _ in range(n)]
+    return values, weights, rng.randint(0, n * w_max // 2)
+
+
+@pytest.mark.parametrize("engine", sorted(DP.KNAPSACK_ENGINES))
+@pytest.mark.parametrize("seed", range(25))
+def test_every_engine_matches_top_down(engine, seed):
+    values, weights, cap = _instance(seed)
+    assert DP.KNAPSACK_ENGINES[engine](values, weights, cap) == DP.knapsack_top_down(values, weights, cap)
+
+
+def _equal_density(seed):
+    rng = random.Random(seed)
+    weights = [rng.randint(10 ** 8, 2 * 10 ** 9) for _ in range(60)]
+    return [3 * w + rng.randint(-5, 5) for w in weights], weights, 10 ** 10
+
+
+def test_branch_and_bound_node_cap():
+    values, weights, cap = _equal_density(1)
+    with pytest.raises(RuntimeError, match="max_nodes"):
+        DP.knapsack_branch_and_bound(values, weights, cap, max_nodes=10_000)
+
+
+def test_pareto_front_cap():
+    values, weights, cap = _equal_density(1)
+    with pytest.raises(RuntimeError, match="max_front"):
+        DP.knapsack_pareto(values, weights, cap, max_front=1_000)
+
+
+def test_grader_picks_engines_from_shape_not_submission():
+    student = types.SimpleNamespace(**{f"knapsack_{e}": f for e, f in DP.KNAPSACK_ENGINES.items()},
+                                    choose_knapsack_engine=lambda *a: "bottom_up")
+    assert runner._dp_engines(student, [1] * 5, [1] * 5, 10) == ("bottom_up", "top_down")
+    assert runner._dp_engines(student, [1] * 20, [1] * 20, 10 ** 10) == ("pareto", "branch_and_bound")
+    assert runner._dp_engines(student, [1] * 60, [1] * 60, 10 ** 10) == ("branch_and_bound", "pareto")
+
+
+def test_grader_reports_capped_engines_instead_of_hanging(monkeypatch):
+    monkeypatch.setitem(runner._DP_CAPS, "branch_and_bound", {"max_nodes": 1_000})
+    values, weights, cap = _equal_density(2)
+    value, err = runner._run_dp_engine(DP, "branch_and_bound", values, weights, cap)
+    assert value is None and "max_nodes=1000" in err
+
+
+def _brute(values, weights, cap):
+    """Best value of every subset with total weight <= cap (exhaustive)."""
+    best = 0
+    for mask in range(1 << len(values)):
+        w = sum(weights[i] for i in range(len(values)) if mask >> i & 1)
+        if w <= cap:
+            best = max(best, sum(values[i] for i in range(len(values)) if mask >> i & 1))
+    return best
+
+
+def _small(seed):
+    rng = random.Random(seed)
+    n = rng.randint(0, 8)
+    return [rng.randint(0, 40) for _ in range(n)], [rng.randint(0, 12) for _ in range(n)], rng.randint(0, 40)
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+@pytest.mark.parametrize("seed", range(15))
+def test_table_answers_every_capacity(engine, seed):
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+    values, weights, max_cap = _small(seed)
+    table = DP.KnapsackTable(values, weights, max_cap, reconstruct=True, engine=engine)
+    want = [_brute(values, weights, cap) for cap in range(max_cap + 1)]
+    assert [table.best_value(cap) for cap in range(max_cap + 1)] == want
+    assert table.best_values(list(range(-2, max_cap + 1))) == [0, 0] + want
+    for cap in range(max_cap + 1):
+        chosen = table.items(cap)
+        assert len(set(chosen)) == len(chosen)
+        assert sum(weights[i] for i in chosen) <= cap
+        assert sum(values[i] for i in chosen) == want[cap]
+    with pytest.raises(ValueError):
+        table.best_value(max_cap + 1)
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+@pytest.mark.parametrize("seed", range(10))
+def test_add_front_matches_building_from_scratch(engine, seed):
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+    values, weights, max_cap = _small(seed)
+    grown = DP.KnapsackTable([], [], max_cap, reconstruct=True, engine=engine)
+    for i in range(len(values) - 1, -1, -1):
+        grown.add_front(values[i], weights[i])
+        rest_v, rest_w = values[i:], weights[i:]
+        for cap in range(max_cap + 1):
+            assert grown.best_value(cap) == _brute(rest_v, rest_w, cap)
+            chosen = grown.items(cap)
+            assert sum(rest_w[j] for j in chosen) <= cap
+            assert sum(rest_v[j] for j in chosen) == grown.best_value(cap)
+    assert (grown.values, grown.weights) == (values, weights)
+
+
+def test_items_needs_reconstruct():
+    with pytest.raises(ValueError, match="reconstruct"):
+        DP.KnapsackTable([3], [1], 4).items(4)
+
+
+@pytest.mark.parametrize("engine", ["python", "numpy"])
+@pytest.mark.parametrize("seed", range(20))
+def test_bottom_up_items_reach_the_optimum(engine, seed):
+    if engine == "numpy":
+        pytest.importorskip("numpy")
+    values, weights, cap = _small(seed)
+    value, chosen = DP.knapsack_bottom_up_items(values, weights, cap, engine=engine)
+    assert value == _brute(values, weights, cap)
+    assert len(set(chosen)) == len(chosen)
+    assert sum(weights[i] for i in chosen) <= cap
+    assert sum(values[i] for i in chosen) == value
+
+
+def test_dp_table_export_is_opt_in():
+    _, dp = runner.grade_lp_dp(DP, random.Random(0))
+    assert "table" not in dp
+    _, dp = runner.grade_lp_dp(DP, random.Random(0), dp_table_max=64)
+    assert dp["table_rows"][0] == 0 and dp["table_caps"][-1] == dp["capacity"]
+    assert dp["table"][0][-1] == dp["optimum"]
+    assert len(dp["table"]) == len(dp["table_rows"]) and all(len(r) == len(dp["table_caps"]) for r in dp["table"])
+
+
+def test_dp_table_export_downsamples():
+    values, weights, cap = _instance(3, n=40, w_max=200)
+    out = runner._dp_table_export(values, weights, cap, 8)
+    assert len(out["table_rows"]) <= 9 and len(out["table_caps"]) <= 9
+    assert out["table_rows"][-1] == 40 and out["table_caps"][-1] == cap
+    assert out["table"][0][-1] == DP.knapsack_top_down(values, weights, cap)
+
+
+def test_top_down_handles_deep_instances_with_a_sparse_memo():
+    import sys
+    rng = random.Random(5)
+    n, w = 5000, 10 ** 6
+    assert n > sys.getrecursionlimit()
+    values = [rng.randint(1, 10 ** 6) for _ in range(n)]
+    stats = {}
+    got = DP.knapsack_top_down(values, [w] * n, 5 * w, stats=stats)
+    assert got == sum(sorted(values)[-5:])
+    # only caps 5w, 4w, ..., 0 are reachable: a handful of states per item
+    assert 0 < stats["states"] <= 6 * (n + 1)
+
+
+def test_top_down_stats_count_visited_states():
+    stats = {}
+    assert DP.knapsack_top_down([6, 5, 18, 15, 10], [2, 2, 6, 5, 4], 10, stats=stats) == 29
+    assert 0 < stats["states"] < 6 * 11
+
+
+def test_dp_results_are_keyed_by_the_engines_that_ran():
+    _, small = runner.grade_lp_dp(DP, random.Random(0))
+    assert small["engine_values"] == {"bottom_up": 29, "top_down": 29}
+    _, large = runner.grade_lp_dp(DP, random.Random(0), dp_items=30, dp_capacity=10 ** 9)
+    assert large["engines"] == ["pareto", "branch_and_bound"]
+    assert set(large["engine_values"]) == {"pareto", "branch_and_bound"}
+    assert large["ok"] and len(set(large["engine_values"].values())) == 1
+
+
+def test_unset_dp_capacity_uses_the_default_capacity():
+    _, dp = runner.grade_lp_dp(DP, random.Random(0), dp_items=10)
+    assert dp["capacity"] == runner.DP_DEFAULT_CAPACITY
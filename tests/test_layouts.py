@@ -0,0 +1,40 @@
+import random
+from collections import deque
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import layouts
+
+
+def _reachable(g):
+    rows, cols = g.shape
+    seen = {(0, 0)}
+    q = deque(seen)
+    while q:
+        r, c = q.popleft()
+        for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1)):
+            if 0 <= nr < rows and 0 <= nc < cols and not g[nr, nc] and (nr, nc) not in seen:
+                seen.add((nr, nc))
+                q.append((nr, nc))
+    return (rows - 1, cols - 1) in seen
+
+
+@pytest.mark.parametrize("layout", sorted(layouts.LAYOUTS))
+@pytest.mark.parametrize("rows,cols", [(2, 2), (5, 5), (6, 9), (20, 20), (31, 18), (40, 64)])
+def test_start_reaches_goal(layout, rows, cols):
+    for seed in range(5):
+        g = layouts.generate_array(layout, rows, cols, random.Random(seed))
+        assert g.shape == (rows, cols) and g.dtype == bool
+        assert not g[0, 0] and not g[rows - 1, cols - 1]
+        assert _reachable(g), (layout, rows, cols, seed)
+
+
+@pytest.mark.parametrize("layout", sorted(layouts.LAYOUTS))
+def test_deterministic_per_seed(layout):
+    a = layouts.generate(layout, 24, 30, random.Random("seed"))
+    b = layouts.generate(layout, 24, 30, random.Random("seed"))
+    assert a == b
+    if layout != "spiral":  # the spiral has no randomness
+        assert any(layouts.generate(layout, 24, 30, random.Random(s)) != a for s in range(3))
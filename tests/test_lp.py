@@ -0,0 +1,165 @@
+import random
+
+import pytest
+
+import common
+import student_lp_dp as LP
+
+NONNEG = [(-1.0, 0.0, 0.0), (0.0, -1.0, 0.0)]
+
+
+def _random_constraints(rng, m, box=True):
+    cons = [(rng.uniform(-3, 3), rng.uniform(-3, 3), rng.uniform(-5, 20)) for _ in range(m)]
+    if box:
+        cons += [(1.0, 0.0, rng.uniform(5, 15)), (0.0, 1.0, rng.uniform(5, 15))]
+    return cons
+
+
+def _reference(cons, c1, c2):
+    verts = LP._enumerate_vertices(cons + NONNEG)
+    return verts, LP.maximize_objective(verts, c1, c2)
+
+
+@pytest.mark.parametrize("seed", range(40))
+def test_feasible_vertices_match_pairwise_enumeration(seed):
+    rng = random.Random(seed)
+    cons = _random_constraints(rng, rng.randint(1, 12))
+    got = LP.feasible_vertices(cons)
+    want = LP._enumerate_vertices(cons + NONNEG)
+    assert sorted(got) == pytest.approx(sorted(want), abs=1e-7)
+
+
+def test_feasible_vertices_on_benchmark_instance():
+    cons, _ = common.gen_lp_large("t", 60)
+    assert sorted(LP.feasible_vertices(cons)) == pytest.approx(
+        sorted(LP._enumerate_vertices(cons + NONNEG)), abs=1e-7)
+
+
+@pytest.mark.parametrize("seed", range(60))
+def test_seidel_matches_vertex_enumeration(seed):
+    rng = random.Random(1000 + seed)
+    cons = _random_constraints(rng, rng.randint(1, 10))
+    c1, c2 = rng.choice([0.0, rng.uniform(-4, 4)]), rng.uniform(-4, 4)
+    verts, (pt, val) = _reference(cons, c1, c2)
+    status, got_pt, got_val = LP.solve_lp_seidel(cons, c1, c2, seed=seed)
+    if not verts:
+        assert status == "infeasible"
+    else:
+        assert status == "optimal"
+        assert got_val == pytest.approx(val, abs=1e-6)
+        assert got_pt == pytest.approx(pt, abs=1e-6)
+
+
+def test_seidel_reports_unbounded_region():
+    assert LP.solve_lp_seidel([(1.0, -1.0, 2.0)], 1.0, 1.0)[0] == "unbounded"
+
+
+@pytest.mark.parametrize("pricing", ["steepest", "bland"])
+@pytest.mark.parametrize("seed", range(30))
+def test_simplex_matches_vertex_enumeration_in_two_dimensions(seed, pricing):
+    rng = random.Random(2000 + seed)
+    cons = _random_constraints(rng, rng.randint(1, 10))
+    c1, c2 = rng.uniform(-4, 4), rng.uniform(-4, 4)
+    verts, (_, val) = _reference(cons, c1, c2)
+    status, x, got = LP.solve_lp_simplex([[a1, a2] for a1, a2, _ in cons], [b for *_, b in cons],
+                                         [c1, c2], pricing=pricing)
+    if not verts:
+        assert status == "infeasible"
+    else:
+        assert status == "optimal"
+        assert got == pytest.approx(val, abs=1e-6)
+
+
+def test_simplex_reports_unbounded():
+    assert LP.solve_lp_simplex([[1.0, -1.0]], [2.0], [1.0, 1.0])[0] == "unbounded"
+
+
+def _brute_force_3d(A, b, c):
+    """Best objective over the vertices of {A x <= b, x >= 0} in three variables."""
+    import itertools
+    import numpy as np
+    G = np.vstack([np.asarray(A, dtype=float), -np.eye(3)])
+    h = np.concatenate([np.asarray(b, dtype=float), np.zeros(3)])
+    best = None
+    for rows in itertools.combinations(range(len(h)), 3):
+        M = G[list(rows)]
+        if abs(np.linalg.det(M)) < 1e-9:
+            continue
+        x = np.linalg.solve(M, h[list(rows)])
+        if (G @ x <= h + 1e-7).all():
+            v = float(np.dot(c, x))
+            best = v if best is None else max(best, v)
+    return best
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_simplex_matches_brute_force_on_generated_instances(seed):
+    A, b, c = common.gen_lp_nd(f"t{seed}", 3, 6, density=0.7)
+    status, x, val = LP.solve_lp_simplex(A, b, c)
+    assert status == "optimal"
+    assert val == pytest.approx(_brute_force_3d(A, b, c), abs=1e-6)
+
+
+def test_simplex_sparse_input_matches_dense():
+    sp = pytest.importorskip("scipy.sparse")
+    A, b, c = common.gen_lp_nd("sparse", 60, 40, density=0.1)
+    dense = LP.solve_lp_simplex(A, b, c)
+    sparse = LP.solve_lp_simplex(sp.csr_matrix(A), b, c)
+    assert sparse[0] == dense[0] == "optimal"
+    assert sparse[2] == pytest.approx(dense[2], rel=1e-9)
+
+
+def test_simplex_without_scipy_uses_explicit_inverse(monkeypatch):
+    A, b, c = common.gen_lp_nd("noscipy", 30, 20, density=0.5)
+    want = LP.solve_lp_simplex(A, b, c)
+    monkeypatch.setattr(LP, "_lu_backend", lambda: None)
+    got = LP.solve_lp_simplex(A, b, c)
+    assert got[0] == want[0] == "optimal"
+    assert got[2] == pytest.approx(want[2], rel=1e-9)
+
+
+def _objectives(rng, cons, k=12):
+    cs = [(rng.uniform(-4, 4), rng.uniform(-4, 4)) for _ in range(k)]
+    cs += [(1.0, 0.0), (0.0, 1.0), (-1.0, 0.0), (0.0, -1.0), (0.0, 0.0)]
+    cs += [(a, b) for a, b, _ in cons[:3]]  # parallel to an edge: ties along it
+    return cs
+
+
+def _check_polygon(cons, objectives):
+    poly = LP.LPPolygon(cons)
+    verts = LP._enumerate_vertices(cons + NONNEG)
+    assert sorted(poly.vertices) == pytest.approx(sorted(verts), abs=1e-7)
+    want = [LP.maximize_objective(verts, c1, c2) for c1, c2 in objectives]
+    for (c1, c2), (pt, val) in zip(objectives, want):
+        got_pt, got_val = poly.maximize(c1, c2)
+        assert got_val == pytest.approx(val, abs=1e-6)
+        assert got_pt == pytest.approx(pt, abs=1e-6)
+    pts, vals = poly.maximize_batch([c[0] for c in objectives], [c[1] for c in objectives])
+    assert vals == pytest.approx([v for _, v in want], abs=1e-6)
+    assert [x for p in pts for x in p] == pytest.approx([x for p, _ in want for x in p], abs=1e-6)
+
+
+@pytest.mark.parametrize("bounded", [True, False], ids=["bounded", "unbounded"])
+@pytest.mark.parametrize("seed", range(40))
+def test_polygon_matches_vertex_enumeration(seed, bounded):
+    rng = random.Random(3000 + seed)
+    cons = _random_constraints(rng, rng.randint(1, 12), box=bounded)
+    _check_polygon(cons, _objectives(rng, cons))
+
+
+def test_polygon_on_open_wedge_and_infeasible_region():
+    rng = random.Random(9)
+    wedge = [(1.0, -1.0, 2.0), (-1.0, 2.0, 4.0)]  # unbounded towards +x, +y
+    _check_polygon(wedge, _objectives(rng, wedge))
+    empty = [(1.0, 1.0, -1.0)]
+    poly = LP.LPPolygon(empty)
+    assert poly.vertices == []
+    assert poly.maximize(3.0, 5.0) == ((0.0, 0.0), 0.0)
+    assert poly.maximize_batch([1.0, -2.0], [0.5, 1.0]) == ([(0.0, 0.0)] * 2, [0.0, 0.0])
+
+
+def test_polygon_batch_without_numpy(monkeypatch):
+    rng = random.Random(11)
+    cons = _random_constraints(rng, 8)
+    monkeypatch.setattr(LP, "np", None)
+    _check_polygon(cons, _objectives(rng, cons))
@@ -0,0 +1,59 @@
+import json
+import random
+
+import pytest
+
+import pathcodec
+
+
+def _walk(n, seed=0):
+    rng = random.Random(seed)
+    path = [(5, 5)]
+    for _ in range(n):
+        dr, dc = rng.choice(((-1, 0), (0, 1), (1, 0), (0, -1)))
+        path.append((path[-1][0] + dr, path[-1][1] + dc))
+    return path
+
+
+@pytest.mark.parametrize("encoding", ["dir2", "rle", "auto"])
+@pytest.mark.parametrize("n", [1, 3, 4, 5, 63, 64, 65, 300])
+def test_round_trip(encoding, n):
+    path = _walk(n, seed=n)
+    enc = pathcodec.encode_path(path, encoding)
+    assert enc["steps"] == n
+    assert pathcodec.decode_path(json.loads(json.dumps(enc))) == path
+
+
+def test_runs_and_non_unit_steps():
+    straight = [(0, c) for c in range(12)] + [(r, 11) for r in range(1, 4)]
+    assert pathcodec.encode_path(straight, "rle")["moves"] == "R11D3"
+    jump = [(0, 0), (0, 2)]
+    assert pathcodec.encode_path(jump, "auto") is jump
+    assert pathcodec.encode_path([], "auto") == []
+    assert pathcodec.decode_path([[0, 0], [0, 1]]) == [(0, 0), (0, 1)]
+    with pytest.raises(ValueError):
+        pathcodec.encode_path(straight, "base64")
+
+
+DOCS = [
+    {},
+    [],
+    {"a": [], "b": {}, "c": None},
+    {"rows": 3, "obstacles": [[0, 1], [2, 2]], "history": [1.5, 2.0, 3],
+     "bfs": {"path": {"enc": "rle", "start": [0, 0], "steps": 2, "moves": "R2"}, "ok": True},
+     "hidden_checks": [{"name": "x", "ok": False}, {"name": "yé", "ok": True}]},
+]
+
+
+@pytest.mark.parametrize("doc", DOCS)
+def test_iter_json_parses_back(doc, tmp_path):
+    text = "".join(pathcodec.iter_json(doc))
+    assert json.loads(text) == doc
+    out = tmp_path / "doc.json"
+    pathcodec.write_json(str(out), doc, chunk=8)
+    assert out.read_text(encoding="utf-8") == text
+
+
+def test_flat_arrays_stay_on_one_line():
+    text = "".join(pathcodec.iter_json({"history": [1, 2, 3], "cells": [[0, 1], [1, 1]]}))
+    assert '"history": [1, 2, 3]' in text and '"cells": [[0, 1], [1, 1]]' in text
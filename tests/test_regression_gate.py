@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+import runner
+
+SPEC = runner._problem_spec("IT23294998", None, 6, 6, 0.22, "random")
+
+
+@pytest.fixture
+def baseline(tmp_path):
+    path = tmp_path / "baseline.json"
+    runner.write_baseline(str(path), SPEC, repeat=1)
+    return path
+
+
+def test_written_baseline_passes_the_gate(baseline, tmp_path):
+    data = json.loads(baseline.read_text(encoding="utf-8"))
+    assert (data["format"], data["version"]) == (runner.BASELINE_FORMAT, runner.BASELINE_VERSION)
+    report = tmp_path / "report.json"
+    assert runner.regression_gate(str(baseline), repeat=1, tol_time=100.0, report=str(report)) == 0
+    assert json.loads(report.read_text(encoding="utf-8"))["passed"]
+
+
+def test_gate_fails_when_expansions_grow(baseline):
+    data = json.loads(baseline.read_text(encoding="utf-8"))
+    data["problems"][0]["metrics"]["ids"]["expansions"] //= 3
+    baseline.write_text(json.dumps(data), encoding="utf-8")
+    assert runner.regression_gate(str(baseline), repeat=1, tol_time=100.0) == 1
+
+
+def test_gate_rejects_files_not_written_by_write_baseline(tmp_path):
+    legacy = tmp_path / "search_metrics.json"
+    legacy.write_text(json.dumps({"bfs": {"path_len": 11, "expanded": 29}}), encoding="utf-8")
+    with pytest.raises(ValueError, match="--write_baseline"):
+        runner.regression_gate(str(legacy), repeat=1)
+    with pytest.raises(ValueError, match="not a baseline file"):
+        runner.write_baseline(str(legacy), SPEC, repeat=1)
+    assert json.loads(legacy.read_text(encoding="utf-8")) == {"bfs": {"path_len": 11, "expanded": 29}}
+
+
+def test_write_baseline_replaces_an_older_baseline(tmp_path):
+    old = tmp_path / "old.json"
+    old.write_text(json.dumps({"version": 1, "repeat": 5, "problems": []}), encoding="utf-8")
+    with pytest.raises(ValueError):
+        runner.regression_gate(str(old), repeat=1)
+    runner.write_baseline(str(old), SPEC, repeat=1)
+    assert runner.regression_gate(str(old), repeat=1, tol_time=100.0) == 0
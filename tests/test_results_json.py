@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+import pathcodec
+import runner
+
+DOC = {"rows": 2, "path": [[0, 0], [0, 1]], "nested": {"a": [1.5, None], "b": {}}}
+METRICS = {"phases": {"serialize_results": {"wall_s": 0.1, "cpu_s": 0.1}}, "alloc_traced": False}
+
+
+@pytest.mark.parametrize("streamed", [False, True])
+def test_members_match_a_single_write(streamed):
+    full = {**DOC, "metrics": METRICS}
+    text = "".join(chunk for i, (k, v) in enumerate(full.items())
+                   for chunk in runner._json_member(k, v, i == 0, streamed)) + "\n}"
+    want = "".join(pathcodec.iter_json(full)) if streamed else json.dumps(full, indent=2)
+    assert text == want
+
+
+def test_metrics_time_the_real_results_write(tmp_path):
+    out = runner.run_suite("IT23294998", out_dir=str(tmp_path), output=runner.OutputOptions(metrics=True),
+                           only=["bfs"])
+    with open(tmp_path / "results.json", encoding="utf-8") as f:
+        written = json.load(f)
+    assert written["metrics"] == out["metrics"]
+    assert "serialize_results" in written["metrics"]["phases"]
+    assert list(written)[-1] == "metrics"
+    assert not (tmp_path / "results.json.tmp").exists()
+
+
+@pytest.mark.parametrize("encoding", ["list", "auto"])
+def test_metrics_leave_the_rest_of_the_file_unchanged(tmp_path, encoding):
+    runner.run_suite("IT23294998", out_dir=str(tmp_path / "plain"),
+                     output=runner.OutputOptions(path_encoding=encoding))
+    runner.run_suite("IT23294998", out_dir=str(tmp_path / "timed"),
+                     output=runner.OutputOptions(path_encoding=encoding, metrics=True))
+    plain = (tmp_path / "plain" / "results.json").read_text(encoding="utf-8")
+    timed = (tmp_path / "timed" / "results.json").read_text(encoding="utf-8")
+    assert timed.startswith(plain[:-2] + ",\n  \"metrics\": ")
+
+
+def test_profile_dir_is_relative_to_out_dir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    out = runner.run_suite("IT23294998", out_dir="run", output=runner.OutputOptions(profile_dir="prof"),
+                           only=["bfs"])
+    assert (tmp_path / "run" / "prof" / "bfs.prof").exists()
+    assert not (tmp_path / "prof").exists()
+    assert out["metrics"]["phases"]["bfs"]["profile"] == "prof/bfs.prof"
+
+
+def test_output_options_split_and_validate():
+    output, rest = runner.OutputOptions.split({"tiles": True, "rows": 8, "metrics": True})
+    assert output == runner.OutputOptions(tiles=True, metrics=True) and rest == {"rows": 8}
+    with pytest.raises(ValueError, match="grid_format"):
+        runner.OutputOptions(grid_format="png")
+    with pytest.raises(ValueError, match="path_encoding"):
+        runner.OutputOptions(path_encoding="zip")
@@ -0,0 +1,145 @@
+import math, random, types
+
+import pytest
+
+import runner
+import student_sa
+from runner import neighbors_4, objective_path
+
+ROWS, COLS = 8, 8
+OBSTACLES = {(2, 2), (2, 3), (2, 4), (5, 5), (5, 6), (6, 1)}
+GOAL = (ROWS - 1, COLS - 1)
+
+
+def _is_valid_path(path):
+    nbrs = neighbors_4(ROWS, COLS, OBSTACLES)
+    return (path[0] == (0, 0) and path[-1] == GOAL
+            and all(b in nbrs(a) for a, b in zip(path, path[1:])))
+
+
+def _anneal(**kw):
+    return student_sa.simulated_annealing(
+        neighbors_fn=neighbors_4(ROWS, COLS, OBSTACLES), objective_fn=objective_path,
+        obstacles=OBSTACLES, seed="t", iters=200, goal=GOAL, **kw)
+
+
+def test_batch_path_cost_matches_default_cost():
+    paths = [[], [(0, 0)], [(0, 0), (0, 1), (1, 1), (2, 1)], [(0, 0), (1, 0), (2, 0), (2, 1)]]
+    assert student_sa.batch_path_cost(paths) == [student_sa._default_cost(p) for p in paths]
+
+
+def test_batch_path_cost_counts_turns_between_non_unit_steps():
+    paths = [[(0, 0), (0, 2), (2, 2)], [(0, 0), (0, 2), (0, 4)], [(0, 0), (0, 1), (0, 3), (0, 4), (3, 4)],
+             [(0, 0), (5, 5), (0, 0), (5, 5)]]
+    want = [student_sa._default_cost(p) for p in paths]
+    assert want[0] != want[1]  # (0, 2) then (2, 0) is a turn, (0, 2) twice is not
+    assert student_sa.batch_path_cost(paths) == want
+    assert [student_sa.batch_path_cost([p])[0] for p in paths] == want
+
+
+@pytest.mark.parametrize("junk", [None, "cheap", float("nan"), float("-inf"), 10 ** 400, object()])
+def test_batch_scores_that_are_not_finite_numbers_fall_back(junk):
+    best, history = _anneal(batch=4, batch_objective_fn=lambda ps: [junk] * len(ps))
+    assert _is_valid_path(best)
+    assert all(math.isfinite(v) for v in history)
+
+
+def test_batch_objective_matches_one_by_one_scoring():
+    a = _anneal(batch=4)
+    b = _anneal(batch=4, batch_objective_fn=student_sa.batch_path_cost)
+    assert a == b
+    assert _is_valid_path(a[0])
+
+
+@pytest.mark.parametrize("mode", ["ring", "changes", "minmax"])
+def test_recorder_keeps_exact_summary_and_history_stays_a_list(mode):
+    full = _anneal()[1]
+    rec = student_sa.SAHistory(mode, 16)
+    best, history = _anneal(recorder=rec)
+    assert isinstance(history, list) and history == rec.values()
+    assert len(rec.indices()) == len(history)
+    assert rec.summary()["count"] == len(full)
+    assert (rec.summary()["min"], rec.summary()["max"]) == (min(full), max(full))
+    if mode == "ring":
+        assert history == full[-16:]
+    elif mode == "changes":
+        assert [full[i] for i in rec.indices()] == history
+
+
+def test_spliced_fingerprint_matches_rehashing_the_new_path():
+    rng = random.Random(7)
+    nbrs = neighbors_4(ROWS, COLS, OBSTACLES)
+    path = student_sa._quick_bfs((0, 0), GOAL, nbrs)
+    checked = 0
+    for _ in range(300):
+        splice = student_sa._shortcut_splice if rng.random() < 0.5 else student_sa._detour_splice
+        parts = splice(path, nbrs, rng)
+        if parts is None:
+            continue
+        new = student_sa._apply_splice(path, parts)
+        assert student_sa._PathHash(path).spliced(*parts) == student_sa._PathHash(new).key()
+        path, checked = new, checked + 1
+    assert checked > 50
+
+
+def test_cost_cache_does_not_change_the_walk():
+    calls = []
+
+    def counting(path):
+        calls.append(1)
+        return objective_path(path)
+
+    plain = student_sa.simulated_annealing(
+        neighbors_fn=neighbors_4(ROWS, COLS, OBSTACLES), objective_fn=counting,
+        obstacles=OBSTACLES, seed="t", iters=200, goal=GOAL)
+    uncached_calls = len(calls)
+    calls.clear()
+    assert _anneal() == plain
+    cached = student_sa.simulated_annealing(
+        neighbors_fn=neighbors_4(ROWS, COLS, OBSTACLES), objective_fn=counting,
+        obstacles=OBSTACLES, seed="t", iters=200, goal=GOAL, cost_cache=4096)
+    assert cached == plain and len(calls) < uncached_calls
+
+
+def test_cost_cache_is_off_by_default():
+    calls = []
+
+    def noisy(path):
+        calls.append(1)
+        return objective_path(path) + 0.01 * len(calls)
+
+    kw = dict(neighbors_fn=neighbors_4(ROWS, COLS, OBSTACLES), obstacles=OBSTACLES,
+                        seed="t", iters=50, goal=GOAL)
+    student_sa.simulated_annealing(objective_fn=noisy, **kw)
+    default_calls = len(calls)
+    calls.clear()
+    student_sa.simulated_annealing(objective_fn=noisy, cost_cache=0, **kw)
+    assert default_calls == len(calls)
+
+
+def _lying_submission():
+    """Real walk, but it reports its own recorder whose summary() claims a lively history."""
+    class Liar(student_sa.SAHistory):
+        def summary(self):
+            return {"mode": self.mode, "count": 900, "min": 0.0, "max": 99.0, "changes": 50}
+
+    def simulated_annealing(neighbors_fn, objective_fn, obstacles, seed, iters, T0, alpha,
+                            start=(0, 0), goal=None, recorder=None):
+        best = student_sa._quick_bfs(start, goal, neighbors_fn)
+        mine = Liar("changes")
+        for _ in range(iters):
+            mine.append(objective_fn(best))
+            if recorder is not None:
+                recorder.append(objective_fn(best))
+        return best, mine
+
+    return types.SimpleNamespace(simulated_annealing=simulated_annealing, SAHistory=Liar)
+
+
+@pytest.mark.parametrize("mode", ["full", "changes", "minmax"])
+def test_grader_summarizes_only_what_its_own_recorder_saw(mode):
+    out = runner.grade_sa(_lying_submission(), ROWS, COLS, OBSTACLES, "t", mode, 16)
+    assert out["ok"]
+    summary = out["history_summary"]
+    assert summary["mode"] == mode and summary["changes"] == 1
+    assert summary["min"] == summary["max"] and out["score"] < 15
@@ -0,0 +1,54 @@
+import hashlib
+import json
+import zlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import gridfile
+import runner
+import tiles
+
+TILED = runner.OutputOptions(tiles=True, tile_size=8)
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_level_zero_obstacle_layer_is_exact(tmp_path):
+    cells = {(0, 3), (2, 1), (4, 4)}
+    m = tiles.export_tiles(str(tmp_path), 5, 6, cells, tile=4)
+    got = set()
+    for ty in range(m["levels"][0]["tiles_y"]):
+        for tx in range(m["levels"][0]["tiles_x"]):
+            raw = zlib.decompress((tmp_path / "0" / f"{ty}_{tx}.bin").read_bytes())
+            h, w = min(4, 5 - ty * 4), min(4, 6 - tx * 4)
+            occ = np.frombuffer(raw[:h * w], dtype=np.uint8).reshape(h, w)
+            got |= {(ty * 4 + r, tx * 4 + c) for r, c in zip(*np.nonzero(occ == 255))}
+    assert got == cells
+    assert m["levels"][-1]["tiles_y"] == m["levels"][-1]["tiles_x"] == 1
+
+
+def test_tiled_run_references_manifest_instead_of_obstacles(tmp_path):
+    out = runner.run_suite("IT23294998", out_dir=str(tmp_path), rows=12, cols=12, output=TILED)
+    res, prob = _read(tmp_path / "results.json"), _read(tmp_path / "problem.json")
+    assert "obstacles" not in res and "obstacles" not in prob
+    assert res["tiles"] == prob["tiles"] == "tiles/manifest.json"
+    assert (tmp_path / "tiles" / "manifest.json").exists()
+
+    plain = runner.run_suite("IT23294998", out_dir=str(tmp_path / "plain"), rows=12, cols=12)
+    obstacles = [tuple(o) for o in plain["obstacles"]]
+    sha = hashlib.sha256(gridfile.pack_obstacles(12, 12, obstacles)).hexdigest()
+    assert res["grid_sha256"] == prob["grid_sha256"] == sha
+    assert res["obstacle_count"] == len(obstacles)
+    assert out["bfs"] == plain["bfs"]
+
+
+def test_only_reuses_a_tiled_run(tmp_path):
+    runner.run_suite("IT23294998", out_dir=str(tmp_path), rows=12, cols=12, output=TILED)
+    before = _read(tmp_path / "results.json")
+    runner.run_suite("IT23294998", out_dir=str(tmp_path), rows=12, cols=12, output=TILED, only="bfs")
+    after = _read(tmp_path / "results.json")
+    assert after["dp"] == before["dp"] and after["lp"] == before["lp"]
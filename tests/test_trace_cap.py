@@ -0,0 +1,46 @@
+import pytest
+
+import runner
+
+
+@pytest.fixture(autouse=True)
+def _reset_default_cap(monkeypatch):
+    monkeypatch.setattr(runner.Trace, "default_cap", None)
+
+
+def test_default_cap_scales_with_grid_size():
+    assert runner.Trace(cells=36).cap == 36 * runner.EXPANSIONS_PER_CELL
+    assert runner.Trace(cells=400).cap == 400 * runner.EXPANSIONS_PER_CELL
+
+
+def test_cli_cap_overrides_and_zero_disables(monkeypatch):
+    monkeypatch.setattr(runner.Trace, "default_cap", 50)
+    assert runner.Trace(cells=400).cap == 50
+    monkeypatch.setattr(runner.Trace, "default_cap", 0)
+    assert runner.Trace(cells=400).cap is None
+
+
+def test_cap_cannot_be_swallowed_by_student_code():
+    trace = runner.Trace(cap=3)
+    for u in range(3):
+        trace.expand((0, u))
+    with pytest.raises(runner.ExpansionCapExceeded):
+        try:
+            trace.expand((0, 3))
+        except Exception:
+            pass
+
+
+def test_runaway_ids_scores_zero_instead_of_hanging():
+    class Loops:
+        @staticmethod
+        def ids(start, goal, neighbors_fn, trace):
+            while True:
+                try:
+                    trace.expand(start)
+                except Exception:
+                    pass
+
+    out = runner.grade_ids(Loops, 8, 8, set())
+    assert out["expansions"] == 64 * runner.EXPANSIONS_PER_CELL + 1
+    assert out["score"] == 0 and not out["ok"]
@@ -0,0 +1,117 @@
+# tiles.py — multi-resolution tile pyramid of a graded grid for the index.html explorer
+from __future__ import annotations
+import itertools, json, os, zlib
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional for grading; export_tiles needs it
+    np = None
+
+Coord = Tuple[int, int]
+
+FORMAT_NAME = "gridtiles-v1"
+# bit i of the "paths" layer is set where PATH_LAYERS[i]'s path crosses the pixel
+PATH_LAYERS = ("bfs", "astar", "ids", "sa")
+HEAT_LAYERS = ("bfs", "astar", "ids")
+
+
+def _coords(cells: Iterable[Coord], rows: int, cols: int):
+    """(r, c) int64 arrays of the in-bounds cells; gridfile.ObstacleSet hands over its own."""
+    if hasattr(cells, "coords"):
+        rs, cs = cells.coords()
+        return rs.astype(np.int64), cs.astype(np.int64)
+    try:
+        flat = np.fromiter(itertools.chain.from_iterable(cells), dtype=np.int64)
+        if flat.size % 2:
+            raise ValueError("odd coordinate count")
+    except (TypeError, ValueError):  # a malformed student path: keep its well-formed cells
+        flat = np.array([v for p in cells if isinstance(p, (list, tuple)) and len(p) == 2
+                         and all(isinstance(x, int) for x in p) for v in p], dtype=np.int64)
+    rs, cs = flat[0::2], flat[1::2]
+    keep = (rs >= 0) & (rs < rows) & (cs >= 0) & (cs < cols)
+    return rs[keep], cs[keep]
+
+
+def _halve(a, reduce: str = "sum"):
+    """Combine 2x2 blocks (the last row / column pairs with zeros when odd)."""
+    h, w = a.shape
+    if h % 2 or w % 2:
+        a = np.pad(a, ((0, h % 2), (0, w % 2)))
+    q = a.reshape((h + 1) // 2, 2, (w + 1) // 2, 2)
+    if reduce == "or":
+        return q[:, 0, :, 0] | q[:, 0, :, 1] | q[:, 1, :, 0] | q[:, 1, :, 1]
+    return q.sum(axis=(1, 3), dtype=np.uint32)
+
+
+def _block_cells(n: int, z: int, size: int):
+    """Cells of the grid covered by each of the `size` level-z pixels along one axis."""
+    lo = np.arange(size, dtype=np.int64) << z
+    return np.minimum(lo + (1 << z), n) - lo
+
+
+def export_tiles(out_dir: str, rows: int, cols: int, obstacles: Iterable[Coord],
+                 paths: Optional[Dict[str, Sequence[Coord]]] = None,
+                 expansions: Optional[Dict[str, Sequence[Coord]]] = None,
+                 tile: int = 256, start: Coord = (0, 0), goal: Optional[Coord] = None) -> Dict[str, Any]:
+    """
+    Write a tile pyramid plus manifest.json into out_dir and return the
+    manifest. Level z pixels cover 2^z x 2^z cells; the last level fits in
+    one tile. Each tile file <z>/<ty>_<tx>.bin is zlib-compressed and holds
+    the manifest's layers back to back, row-major over the tile's pixels:
+    "obstacles" (u1, blocked fraction x 255), "paths" (u1 bit mask) and one
+    "heat_<algo>" (little-endian u4 expansion count) per algorithm given in
+    `expansions`. Time and memory are linear in the number of cells.
+    """
+    if np is None:
+        raise RuntimeError("numpy is required to export tiles")
+    paths = {k: v for k, v in (paths or {}).items() if k in PATH_LAYERS and v}
+    expansions = {k: v for k, v in (expansions or {}).items() if k in HEAT_LAYERS and v}
+    goal = goal if goal is not None else (rows - 1, cols - 1)
+
+    occ = np.zeros((rows, cols), dtype=np.uint8)
+    rs, cs = _coords(obstacles, rows, cols)
+    occ[rs, cs] = 1
+    ov = np.zeros((rows, cols), dtype=np.uint8)
+    for name, path in paths.items():
+        rs, cs = _coords(path, rows, cols)
+        ov[rs, cs] |= 1 << PATH_LAYERS.index(name)
+    heat = {}
+    for name, cells in expansions.items():
+        rs, cs = _coords(cells, rows, cols)
+        heat[name] = np.bincount(rs * cols + cs, minlength=rows * cols).astype(np.uint32).reshape(rows, cols)
+
+    layers = [{"name": "obstacles", "dtype": "u1"}, {"name": "paths", "dtype": "u1", "bits": list(PATH_LAYERS)}]
+    layers += [{"name": f"heat_{k}", "dtype": "u4"} for k in heat]
+    levels = []
+    z = 0
+    while True:
+        h, w = occ.shape
+        area = np.outer(_block_cells(rows, z, h), _block_cells(cols, z, w))
+        density = ((occ.astype(np.int64) * 255 + area // 2) // area).astype(np.uint8)
+        planes = [density, ov] + [heat[k].astype("<u4") for k in heat]
+        ty_n, tx_n = -(-h // tile), -(-w // tile)
+        os.makedirs(os.path.join(out_dir, str(z)), exist_ok=True)
+        for ty in range(ty_n):
+            for tx in range(tx_n):
+                sl = (slice(ty * tile, (ty + 1) * tile), slice(tx * tile, (tx + 1) * tile))
+                data = b"".join(p[sl].tobytes() for p in planes)
+                with open(os.path.join(out_dir, str(z), f"{ty}_{tx}.bin"), "wb") as f:
+                    f.write(zlib.compress(data, 6))
+        levels.append({"z": z, "scale": 1 << z, "rows": h, "cols": w, "tiles_y": ty_n, "tiles_x": tx_n,
+                       "heat_max": {k: int(v.max()) if v.size else 0 for k, v in heat.items()}})
+        if ty_n == 1 and tx_n == 1:
+            break
+        occ, ov = _halve(occ), _halve(ov, "or")
+        heat = {k: _halve(v) for k, v in heat.items()}
+        z += 1
+
+    manifest = {
+        "format": FORMAT_NAME, "rows": rows, "cols": cols, "tile": tile,
+        "start": list(start), "goal": list(goal),
+        "tile_path": "{z}/{ty}_{tx}.bin", "compression": "zlib",
+        "layers": layers, "paths": list(paths), "levels": levels,
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest